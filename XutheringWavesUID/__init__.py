@@ -8,7 +8,10 @@ from gsuid_core.sv import Plugins
 from gsuid_core.logger import logger
 from gsuid_core.data_store import get_res_path
 
+from .utils.import_profile import install_import_profiler
+
 Plugins(name="XutheringWavesUID", force_prefix=["ww"], allow_empty_prefix=False)
+install_import_profiler(__name__)
 
 
 DATA_PATH = get_res_path()
@@ -0,0 +1,75 @@
+import time
+from typing import Tuple, Optional
+from collections import OrderedDict
+
+
+def get_account_validate_ttl() -> int:
+    from ...wutheringwaves_config import WutheringWavesConfig
+
+    return WutheringWavesConfig.get_config("AccountContextTTL").data or 0
+
+
+class AccountContext:
+    __slots__ = ("owner", "did", "bat", "validated_until", "expire")
+
+    def __init__(self, owner: str, did: str, bat: str, expire: float):
+        # did / b-at 所属账号的uid，用随机 cookie 查询时与查询的uid不同
+        self.owner = owner
+        self.did = did
+        self.bat = bat
+        # login_log + refresh_data 校验通过的有效期
+        self.validated_until = 0.0
+        self.expire = expire
+
+
+class AccountContextCache:
+    """按 (uid, cookie, game_id) 缓存请求头需要的 did / b-at 和 token 校验结果
+
+    连续的命令不用每次都查数据库、走 login_log + refresh_data；
+    刷新 bat、token 失效和重新登录时按 uid 失效，查询的uid或 did / b-at 所属的uid匹配都会删除。
+    """
+
+    def __init__(self, timeout: int = 3600, maxsize: int = 10000):
+        self.cache: OrderedDict[Tuple[str, str, int], AccountContext] = OrderedDict()
+        self.timeout = timeout
+        self.maxsize = maxsize
+
+    def get(self, uid: str, cookie: str, game_id: int) -> Optional[AccountContext]:
+        key = (uid, cookie, game_id)
+        ctx = self.cache.get(key)
+        if ctx is None:
+            return None
+        if ctx.expire < time.time():
+            del self.cache[key]
+            return None
+        self.cache.move_to_end(key)
+        return ctx
+
+    def set(
+        self, uid: str, cookie: str, game_id: int, did: str, bat: str, owner: Optional[str] = None
+    ) -> AccountContext:
+        key = (uid, cookie, game_id)
+        ctx = AccountContext(owner or uid, did, bat, time.time() + self.timeout)
+        self.cache[key] = ctx
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.maxsize:
+            self.cache.popitem(last=False)
+        return ctx
+
+    def is_validated(self, uid: str, cookie: str, game_id: int) -> bool:
+        ctx = self.get(uid, cookie, game_id)
+        return ctx is not None and ctx.validated_until > time.time()
+
+    def mark_validated(self, uid: str, cookie: str, game_id: int):
+        ttl = get_account_validate_ttl()
+        ctx = self.get(uid, cookie, game_id)
+        if ttl <= 0 or ctx is None:
+            return
+        ctx.validated_until = time.time() + ttl
+
+    def invalidate(self, uid: str):
+        for key in [k for k, ctx in self.cache.items() if k[0] == uid or ctx.owner == uid]:
+            del self.cache[key]
+
+
+account_context = AccountContextCache()
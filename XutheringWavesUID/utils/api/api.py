@@ -1,4 +1,5 @@
 # waves
+from typing import Optional
 
 SERVER_ID = "76402e5b20be2c39f095a152090afddc"
 SERVER_ID_NET = "919752ae5ea09c1ced910dd668a63ffb"
@@ -119,3 +120,109 @@ def get_need_proxy_func():
     if NeedProxyFunc:
         return NeedProxyFunc
     return []
+
+
+# 接口路由名，与 NeedProxyFunc 中的函数名对应
+API_ROUTES = {
+    ROLE_LIST_URL: "get_kuro_role_list",
+    MR_REFRESH_URL: "get_daily_info",
+    REFRESH_URL: "refresh_data",
+    LOGIN_LOG_URL: "login_log",
+    BASE_DATA_URL: "get_base_info",
+    ROLE_DATA_URL: "get_role_info",
+    WIKI_TREE_URL: "get_tree",
+    WIKI_DETAIL_URL: "get_wiki",
+    ROLE_DETAIL_URL: "get_role_detail_info",
+    CALABASH_DATA_URL: "get_calabash_data",
+    EXPLORE_DATA_URL: "get_explore_data",
+    CHALLENGE_DATA_URL: "get_challenge_data",
+    TOWER_DETAIL_URL: "get_abyss_data",
+    TOWER_INDEX_URL: "get_abyss_index",
+    SLASH_INDEX_URL: "get_slash_index",
+    SLASH_DETAIL_URL: "get_slash_detail",
+    MORE_ACTIVITY_URL: "get_more_activity",
+    REQUEST_TOKEN: "get_request_token",
+    CALCULATOR_REFRESH_DATA_URL: "calculator_refresh_data",
+    ONLINE_LIST_ROLE: "get_online_list_role",
+    ONLINE_LIST_WEAPON: "get_online_list_weapon",
+    ONLINE_LIST_PHANTOM: "get_online_list_phantom",
+    QUERY_OWNED_ROLE: "get_owned_role",
+    ROLE_CULTIVATE_STATUS: "get_develop_role_cultivate_status",
+    BATCH_ROLE_COST: "get_batch_role_cost",
+    PERIOD_LIST_URL: "get_period_list",
+    MONTH_LIST_URL: "get_period_detail",
+    WEEK_LIST_URL: "get_period_detail",
+    VERSION_LIST_URL: "get_period_detail",
+    GACHA_LOG_URL: "get_gacha_log",
+    GACHA_NET_LOG_URL: "get_gacha_log",
+    ANN_LIST_URL: "get_ann_list_by_type",
+    ANN_CONTENT_URL: "get_ann_detail",
+    BBS_LIST: "get_bbs_list",
+    WIKI_HOME_URL: "get_wiki_home",
+    WIKI_ENTRY_DETAIL_URL: "get_entry_detail",
+    LOGIN_URL: "login",
+}
+
+# 不做请求合并的路由（登录、换取token）
+NO_COALESCE_ROUTES = frozenset({"login", "get_request_token"})
+
+# 只读的数据接口，可以短时间复用结果
+READONLY_ROUTES = frozenset(
+    {
+        "get_kuro_role_list",
+        "get_base_info",
+        "get_role_info",
+        "get_tree",
+        "get_wiki",
+        "get_role_detail_info",
+        "get_calabash_data",
+        "get_explore_data",
+        "get_challenge_data",
+        "get_abyss_data",
+        "get_abyss_index",
+        "get_slash_index",
+        "get_slash_detail",
+        "get_more_activity",
+        "get_online_list_role",
+        "get_online_list_weapon",
+        "get_online_list_phantom",
+        "get_period_list",
+        "get_period_detail",
+        "get_ann_list_by_type",
+        "get_ann_detail",
+        "get_wiki_home",
+        "get_entry_detail",
+    }
+)
+
+
+def get_kuro_coalesce_ttl() -> int:
+    from ...wutheringwaves_config import WutheringWavesConfig
+
+    return WutheringWavesConfig.get_config("KuroCoalesceTTL").data or 0
+
+
+_proxy_table_config: tuple = ()
+_proxy_table: tuple = (False, frozenset())
+
+
+def get_route_proxy(url: str, route: str = "") -> Optional[str]:
+    """按路由名查出该请求使用的代理
+
+    NeedProxyFunc 变化时重新编译需要代理的路由表，修改配置后立即生效。
+    """
+    global _proxy_table_config, _proxy_table
+
+    proxy_url = get_local_proxy_url()
+    if not proxy_url:
+        return None
+
+    config = tuple(get_need_proxy_func())
+    if config != _proxy_table_config:
+        _proxy_table = ("all" in config, frozenset(config))
+        _proxy_table_config = config
+
+    proxy_all, proxy_routes = _proxy_table
+    if proxy_all or (route or API_ROUTES.get(url, "")) in proxy_routes:
+        return proxy_url
+    return None
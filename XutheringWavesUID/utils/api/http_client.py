@@ -0,0 +1,98 @@
+import asyncio
+import threading
+import importlib.util
+from typing import Dict, Tuple, Optional, AsyncIterator
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+
+import httpx
+
+from gsuid_core.logger import logger
+
+# 装了 h2 才能开启 HTTP/2
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def get_http_host_concurrency() -> int:
+    from ...wutheringwaves_config import WutheringWavesConfig
+
+    return WutheringWavesConfig.get_config("HttpHostConcurrency").data or 8
+
+
+# (所属事件循环, 客户端, 并发信号量)
+ClientItem = Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient, asyncio.Semaphore]
+
+
+class HttpClientRegistry:
+    """库街区以外的上游（wwapi、登录服务、兑换码等）共用的 httpx 客户端
+
+    按 (事件循环, host) 复用客户端，保持长连接。上传队列在独立线程的事件循环中运行，所以客户端要区分事件循环。
+    每个 host 的并发由信号量限制，超出的请求排队等待，而不是在连接池中等待超时。
+    """
+
+    def __init__(self):
+        self._clients: Dict[Tuple[int, str], ClientItem] = {}
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Tuple[httpx.AsyncClient, asyncio.Semaphore]:
+        loop = asyncio.get_running_loop()
+        key = (id(loop), urlsplit(url).netloc)
+        item = self._clients.get(key)
+        if item is None or item[1].is_closed:
+            concurrency = get_http_host_concurrency()
+            client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(
+                    max_connections=concurrency,
+                    max_keepalive_connections=concurrency,
+                    keepalive_expiry=60,
+                ),
+                # 并发已由信号量限制，等待连接不计入超时
+                timeout=httpx.Timeout(10, pool=None),
+            )
+            item = (loop, client, asyncio.Semaphore(concurrency))
+            with self._lock:
+                self._clients[key] = item
+        return item[1], item[2]
+
+    def _pop(self, loop_id: Optional[int] = None):
+        with self._lock:
+            keys = [k for k in self._clients if loop_id is None or k[0] == loop_id]
+            return [(k[1], *self._clients.pop(k)[:2]) for k in keys]
+
+    @staticmethod
+    async def _aclose(host: str, client: httpx.AsyncClient):
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.debug(f"[鸣潮] 关闭http客户端失败 {host}: {e}")
+
+    async def close_loop(self):
+        """关闭当前事件循环中创建的客户端，在线程中的事件循环结束前调用"""
+        for host, _, client in self._pop(id(asyncio.get_running_loop())):
+            await self._aclose(host, client)
+
+    async def close(self, timeout: float = 5):
+        """关闭全部客户端，其他线程的事件循环中创建的客户端交给所属事件循环关闭"""
+        current = asyncio.get_running_loop()
+        for host, loop, client in self._pop():
+            if loop is current:
+                await self._aclose(host, client)
+            elif loop.is_running():
+                future = asyncio.run_coroutine_threadsafe(self._aclose(host, client), loop)
+                try:
+                    await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+                except Exception as e:
+                    logger.debug(f"[鸣潮] 关闭http客户端失败 {host}: {e}")
+            # 事件循环已经结束时连接也随之关闭，只需丢弃引用
+
+
+http_clients = HttpClientRegistry()
+
+
+@asynccontextmanager
+async def http_client(url: str) -> AsyncIterator[httpx.AsyncClient]:
+    """代替 async with httpx.AsyncClient()，退出时不关闭连接，供下次请求复用"""
+    client, semaphore = http_clients.get(url)
+    async with semaphore:
+        yield client
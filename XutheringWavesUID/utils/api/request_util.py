@@ -154,8 +154,10 @@ class KuroApiResp(BaseModel, Generic[T]):
     async def mark_cookie_invalid(self, uid: str, cookie: str):
         if not self.is_token_invalid:
             return
+        from .account_context import account_context
         from ...utils.database.models import WavesUser
 
+        account_context.invalidate(uid)
         await WavesUser.mark_cookie_invalid(uid, cookie, "无效")
 
     def throw_msg(self) -> str:
@@ -1,12 +1,16 @@
 import json
+import time
 import random
 import string
 import asyncio
-import inspect
-from typing import Any, Dict, List, Union, Literal, Mapping, Optional
+from typing import Any, Dict, List, Tuple, Union, Literal, Mapping, Optional
+from collections import OrderedDict
+from urllib.parse import urlsplit
 
 import aiohttp
-from aiohttp import ClientTimeout, ContentTypeError
+import msgspec
+from aiohttp import ClientTimeout
+from msgspec import json as msgjson
 
 from gsuid_core.logger import logger
 
@@ -14,6 +18,7 @@ from .api import (
     BBS_LIST,
     LOGIN_URL,
     SERVER_ID,
+    API_ROUTES,
     REFRESH_URL,
     ANN_LIST_URL,
     BASE_DATA_URL,
@@ -31,6 +36,7 @@ from .api import (
     ANN_CONTENT_URL,
     BATCH_ROLE_COST,
     PERIOD_LIST_URL,
+    READONLY_ROUTES,
     ROLE_DETAIL_URL,
     SLASH_INDEX_URL,
     TOWER_INDEX_URL,
@@ -46,25 +52,30 @@ from .api import (
     MORE_ACTIVITY_URL,
     NET_SERVER_ID_MAP,
     CHALLENGE_DATA_URL,
+    NO_COALESCE_ROUTES,
     ONLINE_LIST_WEAPON,
     ONLINE_LIST_PHANTOM,
     ROLE_CULTIVATE_STATUS,
     WIKI_ENTRY_DETAIL_URL,
     CALCULATOR_REFRESH_DATA_URL,
-    get_local_proxy_url,
-    get_need_proxy_func,
+    get_route_proxy,
+    get_kuro_coalesce_ttl,
 )
-from ..util import timed_async_cache
+from ..util import async_cache
 from .captcha import get_solver
+from .throttle import backoff_delay, kuro_throttle
 from ..error_reply import WAVES_CODE_999
 from .captcha.base import CaptchaResult
 from .request_util import (
     KURO_VERSION,
+    RespCode,
+    ThrowMsg,
     KuroApiResp,
     get_base_header,
     get_community_header,
 )
 from .captcha.errors import CaptchaError
+from .account_context import account_context
 from ...utils.constants import WAVES_GAME_ID
 from ...utils.database.models import WavesUser
 from ...wutheringwaves_config import WutheringWavesConfig
@@ -89,6 +100,11 @@ class WavesApi:
     _sessions: Dict[str, aiohttp.ClientSession] = {}
     _session_lock = asyncio.Lock()
 
+    # 合并中的请求和只读接口的短期结果
+    _inflight: Dict[Tuple, "asyncio.Future[KuroApiResp[Any]]"] = {}
+    _response_cache: "OrderedDict[Tuple, Tuple[float, KuroApiResp[Any]]]" = OrderedDict()
+    coalesced = 0
+
     def __init__(self):
         self.captcha_solver = get_solver()
         if self.captcha_solver:
@@ -111,6 +127,13 @@ class WavesApi:
             self._sessions[key] = session
             return session
 
+    async def close_sessions(self):
+        async with self._session_lock:
+            for session in self._sessions.values():
+                if not session.closed:
+                    await session.close()
+            self._sessions.clear()
+
     def is_net(self, roleId):
         _temp = int(roleId)
         return _temp >= 200000000
@@ -128,6 +151,7 @@ class WavesApi:
             return waves_user
 
         waves_user.bat = access_token
+        account_context.invalidate(waves_user.uid)
         await WavesUser.update_data_by_data(
             select_data={
                 # "user_id": waves_user.user_id,
@@ -149,19 +173,30 @@ class WavesApi:
         }
         if needToken:
             headers["token"] = cookie
-        waves_user: Optional[WavesUser] = await WavesUser.select_data_by_cookie_and_uid(
-            cookie=cookie,
-            uid=uid,
-            game_id=game_id,
-        ) or await WavesUser.select_data_by_cookie(
-            cookie=cookie,
-        )
+        ctx = account_context.get(uid, cookie, game_id or WAVES_GAME_ID)
+        if ctx is None:
+            waves_user: Optional[WavesUser] = await WavesUser.select_data_by_cookie_and_uid(
+                cookie=cookie,
+                uid=uid,
+                game_id=game_id,
+            ) or await WavesUser.select_data_by_cookie(
+                cookie=cookie,
+            )
+
+            if not waves_user:
+                return headers
 
-        if not waves_user:
-            return headers
+            ctx = account_context.set(
+                uid,
+                cookie,
+                game_id or WAVES_GAME_ID,
+                waves_user.did or "",
+                waves_user.bat or "",
+                owner=waves_user.uid,
+            )
 
-        headers["did"] = waves_user.did or ""
-        headers["b-at"] = waves_user.bat or ""
+        headers["did"] = ctx.did
+        headers["b-at"] = ctx.bat
         return headers
 
     async def get_ck_result(self, uid, user_id, bot_id) -> tuple[bool, Optional[str]]:
@@ -184,6 +219,10 @@ class WavesApi:
         if waves_user.status == "无效":
             return ""
 
+        # 刚校验过的token跳过 login_log + refresh_data
+        if account_context.is_validated(uid, waves_user.cookie, WAVES_GAME_ID):
+            return waves_user.cookie
+
         data = await self.login_log(uid, waves_user.cookie)
         if not data.success:
             await data.mark_cookie_invalid(uid, waves_user.cookie)
@@ -198,6 +237,7 @@ class WavesApi:
                 await data.mark_cookie_invalid(uid, waves_user.cookie)
             return ""
 
+        account_context.mark_validated(uid, waves_user.cookie, WAVES_GAME_ID)
         return waves_user.cookie
 
     async def get_waves_random_cookie(self, uid: str, user_id: str) -> Optional[str]:
@@ -213,6 +253,10 @@ class WavesApi:
             if not await WavesUser.cookie_validate(user.uid):
                 continue
 
+            if account_context.is_validated(user.uid, user.cookie, WAVES_GAME_ID):
+                ck_list.append(user.cookie)
+                break
+
             data = await self.login_log(user.uid, user.cookie)
             if not data.success:
                 await data.mark_cookie_invalid(user.uid, user.cookie)
@@ -228,6 +272,7 @@ class WavesApi:
                 times -= 1
                 continue
 
+            account_context.mark_validated(user.uid, user.cookie, WAVES_GAME_ID)
             ck_list.append(user.cookie)
             break
 
@@ -632,7 +677,7 @@ class WavesApi:
         }
         return await self._waves_request(CALCULATOR_REFRESH_DATA_URL, "POST", header, data=data)
 
-    @timed_async_cache(
+    @async_cache(
         86400,
         lambda x: x.success and isinstance(x.data, (dict, list)),
     )
@@ -643,7 +688,7 @@ class WavesApi:
         data = {}
         return await self._waves_request(ONLINE_LIST_ROLE, "POST", header, data=data)
 
-    @timed_async_cache(
+    @async_cache(
         86400,
         lambda x: x.success and isinstance(x.data, (dict, list)),
     )
@@ -654,7 +699,7 @@ class WavesApi:
         data = {}
         return await self._waves_request(ONLINE_LIST_WEAPON, "POST", header, data=data)
 
-    @timed_async_cache(
+    @async_cache(
         86400,
         lambda x: x.success and isinstance(x.data, (dict, list)),
     )
@@ -889,15 +934,77 @@ class WavesApi:
         data: Optional[Dict[str, Any]] = None,
         max_retries: int = 3,
         retry_delay: float = 1.0,
+        route: str = "",
+    ) -> KuroApiResp[Union[str, Dict[str, Any], List[Any]]]:
+        """route 为空时按 url 从 API_ROUTES 查找路由名
+
+        路由、参数和 token 都相同的请求同时只发出一次，并发的调用共享结果；
+        只读接口的成功结果在 KuroCoalesceTTL 秒内直接复用。
+        """
+        route = route or API_ROUTES.get(url, "")
+        if route in NO_COALESCE_ROUTES:
+            return await self._send_waves_request(
+                url, method, header, params, json_data, data, max_retries, retry_delay, route
+            )
+
+        key = (
+            id(asyncio.get_running_loop()),
+            route or url,
+            method,
+            header.get("token", "") if header else "",
+            header.get("b-at", "") if header else "",
+            json.dumps([params, json_data, data], sort_keys=True, ensure_ascii=False, default=str),
+        )
+        ttl = get_kuro_coalesce_ttl() if route in READONLY_ROUTES else 0
+        if ttl > 0:
+            cached = self._response_cache.get(key)
+            if cached and cached[0] > time.time():
+                self.coalesced += 1
+                return cached[1].model_copy(deep=True)
+
+        task = self._inflight.get(key)
+        leader = task is None
+        if task is None:
+            task = asyncio.ensure_future(
+                self._send_waves_request(url, method, header, params, json_data, data, max_retries, retry_delay, route)
+            )
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+
+        # shield: 发起者被取消时请求继续完成，其他等待者不受影响
+        response = await asyncio.shield(task)
+        if not leader:
+            return response.model_copy(deep=True)
+
+        if ttl > 0 and response.success:
+            self._response_cache[key] = (time.time() + ttl, response.model_copy(deep=True))
+            self._response_cache.move_to_end(key)
+            while len(self._response_cache) > 1000:
+                self._response_cache.popitem(last=False)
+        return response
+
+    async def _send_waves_request(
+        self,
+        url: str,
+        method: Literal["GET", "POST"] = "GET",
+        header: Optional[Mapping[str, str]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        json_data: Optional[Dict[str, Any]] = None,
+        data: Optional[Dict[str, Any]] = None,
+        max_retries: int = 3,
+        retry_delay: float = 1.0,
+        route: str = "",
     ) -> KuroApiResp[Union[str, Dict[str, Any], List[Any]]]:
         if header is None:
             header = await get_base_header()
 
-        proxy_func = get_need_proxy_func()
-        if inspect.stack()[1].function in proxy_func or "all" in proxy_func:
-            proxy_url = get_local_proxy_url()
-        else:
-            proxy_url = None
+        proxy_url = get_route_proxy(url, route)
+        host = urlsplit(url).netloc
+        breaker = kuro_throttle.breaker(host, proxy_url)
+        req_data = data or json_data or params or {}
+        account = str(req_data.get("roleId") or req_data.get("playerId") or header.get("token") or "")
 
         async def do_request(req_data, client_session: aiohttp.ClientSession) -> KuroApiResp[Any]:
             async with client_session.request(
@@ -910,16 +1017,17 @@ class WavesApi:
                 proxy=proxy_url,
                 timeout=ClientTimeout(total=10),
             ) as resp:
+                body = await resp.read()
                 try:
-                    raw_data = await resp.json()
-                except ContentTypeError:
-                    _raw_data = await resp.text()
-                    raw_data = {"code": WAVES_CODE_999, "data": _raw_data}
+                    raw_data = msgjson.decode(body)
+                except msgspec.DecodeError:
+                    raw_data = {"code": WAVES_CODE_999, "data": body.decode(resp.get_encoding(), "replace")}
 
-                if isinstance(raw_data, dict):
+                # data 是 json 字符串，同样用 msgspec 解码
+                if isinstance(raw_data, dict) and isinstance(raw_data.get("data"), str):
                     try:
-                        raw_data["data"] = json.loads(raw_data.get("data", ""))
-                    except Exception:
+                        raw_data["data"] = msgjson.decode(raw_data["data"])
+                    except msgspec.DecodeError:
                         pass
 
                 # logger.debug(f"url:[{url}] params:[{params}] headers:[{header}] data:[{req_data}] raw_data:{raw_data}")
@@ -938,13 +1046,20 @@ class WavesApi:
             return {"code": WAVES_CODE_999, "data": "验证码破解失败"}
 
         for attempt in range(max_retries):
+            if not breaker.allow():
+                kuro_throttle.rejected += 1
+                # 不走校验，避免熔断期间重复通知主人
+                return KuroApiResp[Any].model_construct(code=breaker.last_code, msg=breaker.last_msg, data=None)
+
             try:
+                await kuro_throttle.acquire(host, account)
                 client = await self.get_session(proxy=proxy_url)
                 if not client:
                     logger.warning(f"url:[{url}] 获取session失败")
                     continue
 
                 response = await do_request(data, client)
+                breaker.record(response.code, response.msg)
 
                 res_data = response.data or {}
                 if self.captcha_solver and isinstance(res_data, dict) and res_data.get("geeTest") is True:
@@ -964,11 +1079,13 @@ class WavesApi:
 
             except aiohttp.ClientError as e:
                 logger.warning(f"url:[{url}] 网络请求失败, 尝试次数 {attempt + 1}", e)
+                breaker.record(RespCode.ERROR.value, ThrowMsg.SERVER_ERROR)
                 if attempt < max_retries - 1:
-                    await asyncio.sleep(retry_delay)
+                    await asyncio.sleep(backoff_delay(retry_delay, attempt))
             except Exception as e:
                 logger.warning(f"url:[{url}] 发生未知错误, 尝试次数 {attempt + 1}", e)
+                breaker.record(RespCode.ERROR.value, ThrowMsg.SERVER_ERROR)
                 if attempt < max_retries - 1:
-                    await asyncio.sleep(retry_delay)
+                    await asyncio.sleep(backoff_delay(retry_delay, attempt))
 
         raise TypeError("请求服务器失败，已达最大重试次数")
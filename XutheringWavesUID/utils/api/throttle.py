@@ -0,0 +1,194 @@
+import time
+import random
+import asyncio
+from typing import Any, Dict, Tuple, Optional
+from collections import OrderedDict
+
+from gsuid_core.logger import logger
+
+from .request_util import RespCode
+
+
+def get_kuro_qps() -> float:
+    from ...wutheringwaves_config import WutheringWavesConfig
+
+    return WutheringWavesConfig.get_config("KuroQPS").data or 0
+
+
+def get_kuro_account_qps() -> float:
+    from ...wutheringwaves_config import WutheringWavesConfig
+
+    return WutheringWavesConfig.get_config("KuroAccountQPS").data or 0
+
+
+def get_kuro_breaker_cooldown() -> int:
+    from ...wutheringwaves_config import WutheringWavesConfig
+
+    return WutheringWavesConfig.get_config("KuroBreakerCooldown").data or 0
+
+
+# 连续出现多少次后熔断
+BREAKER_THRESHOLDS = {
+    RespCode.DANGER_ENV.value: 3,  # ip被风控，继续请求只会更糟
+    RespCode.SERVER_EXTERNAL_ERROR.value: 5,
+    RespCode.ERROR.value: 5,  # 网络错误
+}
+# 半开状态下探测请求的超时
+PROBE_TIMEOUT = 30
+
+
+def backoff_delay(retry_delay: float, attempt: int, max_delay: float = 10) -> float:
+    """指数退避加随机抖动"""
+    return min(max_delay, retry_delay * 2**attempt) * random.uniform(0.5, 1.5)
+
+
+class TokenBucket:
+    __slots__ = ("rate", "tokens", "updated")
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = max(rate, 1)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(max(self.rate, 1), self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> float:
+        """取一个令牌，返回等待的秒数"""
+        waited = 0.0
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return waited
+            wait = (1 - self.tokens) / self.rate
+            waited += wait
+            await asyncio.sleep(wait)
+
+    @property
+    def idle(self) -> bool:
+        self._refill()
+        return self.tokens >= max(self.rate, 1)
+
+
+class CircuitBreaker:
+    """按上游（域名 + 代理）熔断
+
+    命中 BREAKER_THRESHOLDS 中的返回码达到次数后打开，冷却期内直接返回上次的错误；
+    冷却结束后放行一个探测请求，成功则关闭，失败重新计时。
+    """
+
+    __slots__ = ("failures", "opened_at", "probe_at", "last_code", "last_msg", "trips")
+
+    def __init__(self):
+        self.failures: Dict[int, int] = {}
+        self.opened_at = 0.0
+        self.probe_at = 0.0
+        self.last_code = 0
+        self.last_msg = ""
+        self.trips = 0
+
+    @property
+    def state(self) -> str:
+        if not self.opened_at:
+            return "closed"
+        if time.monotonic() - self.opened_at < get_kuro_breaker_cooldown():
+            return "open"
+        return "half_open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        # 探测请求超时没有结果时再放行一个
+        if state == "half_open" and time.monotonic() - self.probe_at > PROBE_TIMEOUT:
+            self.probe_at = time.monotonic()
+            return True
+        return False
+
+    def record(self, code: int, msg: str = ""):
+        self.probe_at = 0.0
+        threshold = BREAKER_THRESHOLDS.get(code)
+        if threshold is None:
+            self.failures.clear()
+            self.opened_at = 0.0
+            return
+        self.failures[code] = self.failures.get(code, 0) + 1
+        if self.failures[code] >= threshold and get_kuro_breaker_cooldown() > 0:
+            if not self.opened_at:
+                self.trips += 1
+                logger.warning(f"[鸣潮] 库街区请求熔断 code: {code} msg: {msg}")
+            self.opened_at = time.monotonic()
+            self.last_code = code
+            self.last_msg = msg
+
+
+class KuroThrottle:
+    """库街区请求的限流和熔断
+
+    上游和每个账号各一个令牌桶，速率随配置变化；熔断按上游区分。
+    """
+
+    def __init__(self, max_accounts: int = 10000):
+        self.upstreams: Dict[str, TokenBucket] = {}
+        self.accounts: OrderedDict[str, TokenBucket] = OrderedDict()
+        self.breakers: Dict[Tuple[str, Optional[str]], CircuitBreaker] = {}
+        self.max_accounts = max_accounts
+        self.throttled = 0
+        self.throttled_seconds = 0.0
+        self.rejected = 0
+
+    def breaker(self, host: str, proxy: Optional[str]) -> CircuitBreaker:
+        key = (host, proxy)
+        if key not in self.breakers:
+            self.breakers[key] = CircuitBreaker()
+        return self.breakers[key]
+
+    def _bucket(self, buckets: Dict[str, TokenBucket], key: str, rate: float) -> TokenBucket:
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = TokenBucket(rate)
+        bucket.rate = rate
+        return bucket
+
+    async def acquire(self, host: str, account: str):
+        waited = 0.0
+        qps = get_kuro_qps()
+        if qps > 0:
+            waited += await self._bucket(self.upstreams, host, qps).acquire()
+
+        account_qps = get_kuro_account_qps()
+        if account_qps > 0 and account:
+            bucket = self._bucket(self.accounts, account, account_qps)
+            self.accounts.move_to_end(account)
+            waited += await bucket.acquire()
+            # 只淘汰已经回满的桶，避免绕过限流
+            while len(self.accounts) > self.max_accounts:
+                key, oldest = next(iter(self.accounts.items()))
+                if not oldest.idle:
+                    break
+                del self.accounts[key]
+
+        if waited > 0:
+            self.throttled += 1
+            self.throttled_seconds += waited
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "throttled": self.throttled,
+            "throttled_seconds": round(self.throttled_seconds, 1),
+            "rejected": self.rejected,
+            "breakers": {
+                f"{host}|{proxy or ''}": {
+                    "state": b.state,
+                    "trips": b.trips,
+                    "last_code": b.last_code,
+                }
+                for (host, proxy), b in self.breakers.items()
+            },
+        }
+
+
+kuro_throttle = KuroThrottle()
@@ -49,3 +49,15 @@ def percent_to_float(value: Union[str, float]) -> float:
     if isinstance(value, str):
         return float(value.rstrip("%")) * 0.01
     return value
+
+
+def stat_to_float(value: Union[str, float, int]) -> float:
+    """'12.5%' -> 12.5, '100' -> 100.0"""
+    if isinstance(value, str):
+        return float(value.rstrip("%"))
+    return float(value)
+
+
+def sum_percent_values(*args: float) -> float:
+    """sum_percentages 的浮点版本，结果同样保留1位小数"""
+    return round(sum(args), 1)
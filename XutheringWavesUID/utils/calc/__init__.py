@@ -1,4 +1,3 @@
-import copy
 from typing import Any, Dict, List, Union, Optional
 
 from gsuid_core.logger import logger
@@ -10,7 +9,7 @@ from ...utils.api.model import Props, RoleDetailData
 from ..ascension.sonata import WavesSonataResult, get_sonata_detail
 from ..ascension.weapon import WavesWeaponResult, get_weapon_detail
 from ..resource.constant import card_sort_map as card_sort_map_back
-from ..ascension.constant import sum_numbers, sum_percentages, percent_to_float
+from ..ascension.constant import stat_to_float, percent_to_float, sum_percent_values
 from ...utils.damage.utils import (
     SONATA_ANCIENT,
     SONATA_TIDEBREAKING,
@@ -19,6 +18,8 @@ from ...utils.damage.utils import (
 from ...utils.api.model_other import EnemyDetailData
 from ...utils.map.damage.damage import check_if_ph_3, check_if_ph_5
 
+card_sort_stats = {name: stat_to_float(value) for name, value in card_sort_map_back.items()}
+
 
 class WuWaCalc(object):
     def __init__(
@@ -75,6 +76,8 @@ class WuWaCalc(object):
     def sum_phantom_value(self, result: Dict[str, str], prop_list: List[Props]) -> Dict:
         name_per = ["攻击", "生命", "防御"]
 
+        # 先用浮点数累加，最后每个属性只格式化一次
+        totals: Dict[str, float] = {}
         for prop in prop_list:
             per = "%" in prop.attributeValue
             name = prop.attributeName
@@ -87,14 +90,19 @@ class WuWaCalc(object):
                 result[name] = prop.attributeValue
                 continue
 
+            total = totals.get(name)
+            if total is None:
+                total = float(result[name].rstrip("%"))
             if per:
-                old = float(result[name].replace("%", ""))
-                new = float(prop.attributeValue.replace("%", ""))
-                result[name] = f"{old + new:.1f}%"
+                totals[name] = round(total + float(prop.attributeValue.rstrip("%")), 1)
+            else:
+                totals[name] = total + int(prop.attributeValue)
+
+        for name, total in totals.items():
+            if result[name].endswith("%"):
+                result[name] = f"{total:.1f}%"
             else:
-                old = int(result[name])
-                new = int(prop.attributeValue)
-                result[name] = f"{old + new:d}"
+                result[name] = f"{int(total):d}"
 
         return result
 
@@ -106,12 +114,12 @@ class WuWaCalc(object):
         if not equipPhantomList:
             return result
         temp_result = {}
+        prop_list: List[Props] = []
         for i, _phantom in enumerate(equipPhantomList):
             if _phantom and _phantom.phantomProp:
                 if i == 0:
                     result["echo_id"] = _phantom.phantomProp.phantomId
-                props = _phantom.get_props()
-                result = self.sum_phantom_value(result, props)
+                prop_list.extend(_phantom.get_props())
                 sonata_result: WavesSonataResult = get_sonata_detail(_phantom.fetterDetail.name)
                 if sonata_result.name not in temp_result:
                     temp_result[sonata_result.name] = {
@@ -120,6 +128,7 @@ class WuWaCalc(object):
                     }
                 else:
                     temp_result[sonata_result.name]["phantomIds"].append(_phantom.phantomProp.phantomId)
+        result = self.sum_phantom_value(result, prop_list)
 
         for key, value in temp_result.items():
             num = len(value["phantomIds"])
@@ -238,10 +247,19 @@ class WuWaCalc(object):
         weapon_reson_level = weaponData.resonLevel
 
         shuxing = f"{role_attr}伤害加成"
-        card_sort_map: Dict[str, Any] = copy.deepcopy(card_sort_map_back)
+        # 百分比属性全程用浮点数累加，最后统一格式化为字符串
+        card_sort_map: Dict[str, Any] = dict(card_sort_map_back)
+        stats: Dict[str, float] = dict(card_sort_stats)
         char_result: WavesCharResult = get_char_detail(role_id, role_level, role_breach)
         weapon_result: WavesWeaponResult = get_weapon_detail(weapon_id, weapon_level, weapon_breach, weapon_reson_level)
 
+        def add_stat(name: str, *values: float):
+            if name not in stats:
+                # 占位，保持与原来一致的键顺序
+                card_sort_map[name] = "0%"
+                stats[name] = 0.0
+            stats[name] = sum_percent_values(*values, stats[name])
+
         # 基础生命
         _life = char_result.stats["life"]
         # 基础攻击
@@ -257,25 +275,25 @@ class WuWaCalc(object):
         # 武器副词条
         weapon_sub_name = weapon_result.stats[1]["name"]
         weapon_sub_value = weapon_result.stats[1]["value"]
-        card_sort_map[weapon_sub_name] = sum_percentages(weapon_sub_value, card_sort_map[weapon_sub_name])
+        stats[weapon_sub_name] = sum_percent_values(stat_to_float(weapon_sub_value), stats[weapon_sub_name])
 
         # 武器谐振
         if weapon_result.sub_effect:
             # sub_name = ["生命提升", "共鸣效率提升", "攻击提升", "全属性伤害加成提升"]
             sub_effect_name = weapon_result.sub_effect["name"]
-            card_sort_map[sub_effect_name] = sum_percentages(
-                weapon_result.sub_effect["value"], card_sort_map[sub_effect_name]
+            stats[sub_effect_name] = sum_percent_values(
+                stat_to_float(weapon_result.sub_effect["value"]), stats[sub_effect_name]
             )
 
         # 角色固有技能
         for name, value in char_result.fixed_skill.items():
-            if name not in card_sort_map:
-                card_sort_map[name] = "0%"
-            card_sort_map[name] = sum_percentages(value, card_sort_map[name])
+            add_stat(name, stat_to_float(value))
 
-        char_regen = "100%"
-        card_sort_map["共鸣效率"] = sum_percentages(char_regen, result.get("共鸣效率", "0%"), card_sort_map["共鸣效率"])
-        card_sort_map["energy_regen"] = percent_to_float(card_sort_map["共鸣效率"])
+        char_regen = 100.0
+        stats["共鸣效率"] = sum_percent_values(
+            char_regen, stat_to_float(result.get("共鸣效率", "0%")), stats["共鸣效率"]
+        )
+        card_sort_map["energy_regen"] = stats["共鸣效率"] * 0.01
 
         card_sort_map["ph_detail"] = result.get("ph_detail", [])
 
@@ -288,100 +306,76 @@ class WuWaCalc(object):
                 # 角色攻击提升15%，共鸣效率达到250%后，当前角色全属性伤害提升30%
                 result["atk_percent"] += 0.15
                 if card_sort_map["energy_regen"] >= 2.5:
-                    card_sort_map["属性伤害加成"] = sum_percentages(
-                        "30%",
-                        card_sort_map["属性伤害加成"],
-                    )
+                    stats["属性伤害加成"] = sum_percent_values(30.0, stats["属性伤害加成"])
                 card_sort_map["ph_result"] = True
 
             # 失序彼岸之梦
             if role_id in Ancient_Role_Ids and check_if_ph_3(ph_detail["ph_name"], ph_detail["ph_num"], SONATA_ANCIENT):
                 # 角色共鸣能量为0时，暴击率提升35%
-                card_sort_map["暴击"] = sum_percentages(
-                    "20%",
-                    card_sort_map["暴击"],
-                )
+                stats["暴击"] = sum_percent_values(20.0, stats["暴击"])
                 card_sort_map["ph_result"] = True
 
-        base_atk = float(sum_numbers(_atk, _weapon_atk))
+        base_atk = float(_atk) + float(_weapon_atk)
         # 各种攻击百分比 = 武器副词条+武器谐振+固有技能
-        per_temp = percent_to_float(card_sort_map["攻击"])
+        per_temp = stats.pop("攻击") * 0.01
         card_sort_map["atk_percent"] = per_temp + result.get("atk_percent", 0)
         card_sort_map["atk_flat"] = float(result.get("atk_flat", 0))
-        card_sort_map["攻击"] = sum_numbers(base_atk, result.get("攻击", 0), round(base_atk * per_temp))
-        card_sort_map["攻击"] = f"{card_sort_map['攻击'].split('.')[0]}"
+        card_sort_map["攻击"] = f"{int(base_atk + stat_to_float(result.get('攻击', 0)) + round(base_atk * per_temp))}"
 
         base_life = float(_life)
-        per_life = percent_to_float(card_sort_map["生命"])
+        per_life = stats.pop("生命") * 0.01
         card_sort_map["life_percent"] = per_life + result.get("life_percent", 0)
         card_sort_map["life_flat"] = float(result.get("life_flat", 0))
-        card_sort_map["生命"] = sum_numbers(_life, result.get("生命", 0), round(base_life * per_life))
-        card_sort_map["生命"] = f"{card_sort_map['生命'].split('.')[0]}"
+        card_sort_map["生命"] = f"{int(base_life + stat_to_float(result.get('生命', 0)) + round(base_life * per_life))}"
 
         base_def = float(_def)
-        per_def = percent_to_float(card_sort_map["防御"])
+        per_def = stats.pop("防御") * 0.01
         card_sort_map["def_percent"] = per_def + result.get("def_percent", 0)
         card_sort_map["def_flat"] = float(result.get("def_flat", 0))
-        card_sort_map["防御"] = sum_numbers(_def, result.get("防御", 0), round(base_def * per_def))
-        card_sort_map["防御"] = f"{card_sort_map['防御'].split('.')[0]}"
+        card_sort_map["防御"] = f"{int(base_def + stat_to_float(result.get('防御', 0)) + round(base_def * per_def))}"
 
         # 固定暴击
-        char_crit_rate = "5%"
+        char_crit_rate = 5.0
         # 固定爆伤
-        char_crit_dmg = "150%"
+        char_crit_dmg = 150.0
 
-        card_sort_map["暴击"] = sum_percentages(char_crit_rate, result.get("暴击", "0%"), card_sort_map["暴击"])
-        card_sort_map["crit_rate"] = percent_to_float(card_sort_map["暴击"])
-        card_sort_map["暴击伤害"] = sum_percentages(
-            char_crit_dmg, result.get("暴击伤害", "0%"), card_sort_map["暴击伤害"]
+        stats["暴击"] = sum_percent_values(char_crit_rate, stat_to_float(result.get("暴击", "0%")), stats["暴击"])
+        card_sort_map["crit_rate"] = stats["暴击"] * 0.01
+        stats["暴击伤害"] = sum_percent_values(
+            char_crit_dmg, stat_to_float(result.get("暴击伤害", "0%")), stats["暴击伤害"]
         )
-        card_sort_map["crit_dmg"] = percent_to_float(card_sort_map["暴击伤害"])
-
-        card_sort_map[shuxing] = sum_percentages(
-            result.get(shuxing, "0%"),
-            card_sort_map.get(shuxing, "0%"),
-            card_sort_map.get("属性伤害加成", "0%"),
+        card_sort_map["crit_dmg"] = stats["暴击伤害"] * 0.01
+
+        if shuxing not in stats:
+            card_sort_map[shuxing] = "0%"
+        stats[shuxing] = sum_percent_values(
+            stat_to_float(result.get(shuxing, "0%")),
+            stats.get(shuxing, 0.0),
+            stats.get("属性伤害加成", 0.0),
         )
-        card_sort_map["shuxing_bonus"] = percent_to_float(card_sort_map[shuxing])
+        card_sort_map["shuxing_bonus"] = stats[shuxing] * 0.01
         card_sort_map["char_attr"] = role_attr
 
         if "属性伤害加成" in card_sort_map:
             del card_sort_map["属性伤害加成"]
-
-        card_sort_map["普攻伤害加成"] = sum_percentages(
-            result.get("普攻伤害加成", "0%"), card_sort_map.get("普攻伤害加成", "0%")
-        )
-        card_sort_map["attack_damage"] = percent_to_float(card_sort_map["普攻伤害加成"])
-
-        card_sort_map["重击伤害加成"] = sum_percentages(
-            result.get("重击伤害加成", "0%"), card_sort_map.get("重击伤害加成", "0%")
-        )
-        card_sort_map["hit_damage"] = percent_to_float(card_sort_map["重击伤害加成"])
-
-        card_sort_map["共鸣技能伤害加成"] = sum_percentages(
-            result.get("共鸣技能伤害加成", "0%"),
-            card_sort_map.get("共鸣技能伤害加成", "0%"),
-        )
-        card_sort_map["skill_damage"] = percent_to_float(card_sort_map["共鸣技能伤害加成"])
-
-        card_sort_map["共鸣解放伤害加成"] = sum_percentages(
-            result.get("共鸣解放伤害加成", "0%"),
-            card_sort_map.get("共鸣解放伤害加成", "0%"),
-        )
-        card_sort_map["liberation_damage"] = percent_to_float(card_sort_map["共鸣解放伤害加成"])
-
-        card_sort_map["声骸技能伤害加成"] = sum_percentages(
-            result.get("声骸技能伤害加成", "0%"),
-            card_sort_map.get("声骸技能伤害加成", "0%"),
-        )
-        card_sort_map["phantom_damage"] = percent_to_float(card_sort_map["声骸技能伤害加成"])
-
-        card_sort_map["治疗效果加成"] = sum_percentages(
-            result.get("治疗效果加成", "0%"), card_sort_map.get("治疗效果加成", "0%")
-        )
-        card_sort_map["heal_bonus"] = percent_to_float(card_sort_map["治疗效果加成"])
+            del stats["属性伤害加成"]
+
+        for name, key in (
+            ("普攻伤害加成", "attack_damage"),
+            ("重击伤害加成", "hit_damage"),
+            ("共鸣技能伤害加成", "skill_damage"),
+            ("共鸣解放伤害加成", "liberation_damage"),
+            ("声骸技能伤害加成", "phantom_damage"),
+            ("治疗效果加成", "heal_bonus"),
+        ):
+            add_stat(name, stat_to_float(result.get(name, "0%")))
+            card_sort_map[key] = stats[name] * 0.01
 
         card_sort_map["echo_id"] = result.get("echo_id")
+
+        # 只在输出时格式化
+        for name, value in stats.items():
+            card_sort_map[name] = f"{value:.1f}%"
         # logger.debug(f"面板数据: {card_sort_map}")
         return card_sort_map
 
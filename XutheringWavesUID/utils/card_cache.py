@@ -0,0 +1,225 @@
+import os
+import json
+import time
+import shutil
+import asyncio
+import hashlib
+import threading
+from typing import Any, Dict, Tuple, Union, Callable, Optional, Awaitable
+from pathlib import Path
+from collections import OrderedDict
+
+from gsuid_core.logger import logger
+
+from ..version import XutheringWavesUID_version
+from .resource.RESOURCE_PATH import CACHE_PATH
+
+CARD_CACHE_PATH = CACHE_PATH / "card"
+
+
+def get_card_cache_size() -> int:
+    from ..wutheringwaves_config import WutheringWavesConfig
+
+    return (WutheringWavesConfig.get_config("CardCacheSize").data or 0) * 1024 * 1024
+
+
+def get_card_cache_ttl() -> int:
+    from ..wutheringwaves_config import WutheringWavesConfig
+
+    return WutheringWavesConfig.get_config("CardCacheTTL").data or 0
+
+
+def get_show_config_version() -> Tuple[Any, ...]:
+    """影响卡片背景的显示配置，自定义背景图片替换后修改时间也会变化"""
+    from ..wutheringwaves_config.wutheringwaves_config import ShowConfig
+
+    bg_mtime = 0.0
+    if ShowConfig.get_config("CardBg").data:
+        try:
+            bg_mtime = Path(ShowConfig.get_config("CardBgPath").data).stat().st_mtime
+        except OSError:
+            pass
+    return (
+        ShowConfig.get_config("BlurRadius").data,
+        ShowConfig.get_config("BlurBrightness").data,
+        ShowConfig.get_config("BlurContrast").data,
+        ShowConfig.get_config("CardBg").data,
+        ShowConfig.get_config("CardBgPath").data,
+        bg_mtime,
+    )
+
+
+def get_dir_version(path: Path) -> float:
+    """目录及其子目录的最新修改时间，子目录中上传、删除图片后会变化"""
+    try:
+        with os.scandir(path) as it:
+            mtimes = [entry.stat().st_mtime for entry in it if entry.is_dir()]
+        return max([path.stat().st_mtime, *mtimes])
+    except OSError:
+        return 0.0
+
+
+def get_files_version(*paths: Path) -> Tuple[Any, ...]:
+    """数据文件的 (修改时间, 大小)，目录取其下全部文件的最新修改时间和文件数，资源更新后会变化"""
+    version = []
+    for path in paths:
+        try:
+            if path.is_dir():
+                stats = [p.stat() for p in path.rglob("*") if p.is_file()]
+                version.append((max((st.st_mtime_ns for st in stats), default=0), len(stats)))
+            else:
+                stat = path.stat()
+                version.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            version.append(None)
+    return tuple(version)
+
+
+class CardCache:
+    """渲染结果缓存
+
+    key 为渲染输入（卡片名、参数、数据版本、资源版本）的摘要，命中时直接返回编码好的图片。
+    内存中按字节数做 LRU；静态卡片（wiki、深塔等）同时写入 cache/card，重启后仍可命中。
+    """
+
+    def __init__(self, cache_path=CARD_CACHE_PATH):
+        self.cache_path = cache_path
+        # key -> (过期时间, 图片)，过期时间为0表示不过期
+        self.cache: OrderedDict[str, Tuple[float, bytes]] = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(name: str, *parts: Any) -> str:
+        from .role_snapshot import get_calc_resource_version
+
+        raw = json.dumps(
+            [name, XutheringWavesUID_version, get_calc_resource_version(), parts],
+            ensure_ascii=False,
+            default=str,
+        )
+        return f"{name}_{hashlib.sha1(raw.encode()).hexdigest()}"
+
+    def _get_memory(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            item = self.cache.get(key)
+            if item is None:
+                return None
+            expire, data = item
+            if expire and expire < time.time():
+                del self.cache[key]
+                self.nbytes -= len(data)
+                return None
+            self.cache.move_to_end(key)
+            return data
+
+    def _set_memory(self, key: str, data: bytes, expire: float, max_bytes: int):
+        if len(data) > max_bytes:
+            return
+        with self._lock:
+            old = self.cache.pop(key, None)
+            if old is not None:
+                self.nbytes -= len(old[1])
+            self.cache[key] = (expire, data)
+            self.nbytes += len(data)
+            while self.nbytes > max_bytes and self.cache:
+                _, (_, old_data) = self.cache.popitem(last=False)
+                self.nbytes -= len(old_data)
+
+    def _get_disk(self, key: str) -> Optional[bytes]:
+        path = self.cache_path / key
+        try:
+            return path.read_bytes()
+        except OSError:
+            return None
+
+    def _set_disk(self, key: str, data: bytes, max_bytes: int):
+        try:
+            self.cache_path.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_path / f"{key}.tmp"
+            tmp.write_bytes(data)
+            tmp.replace(self.cache_path / key)
+
+            # 超出大小时按访问时间淘汰
+            files = [(p.stat(), p) for p in self.cache_path.iterdir() if p.is_file()]
+            total = sum(stat.st_size for stat, _ in files)
+            for stat, p in sorted(files, key=lambda x: x[0].st_atime):
+                if total <= max_bytes:
+                    break
+                p.unlink(missing_ok=True)
+                total -= stat.st_size
+        except OSError as e:
+            logger.debug(f"[鸣潮] 写入卡片缓存失败 {key}: {e}")
+
+    async def get_or_render(
+        self,
+        name: str,
+        parts: Tuple[Any, ...],
+        render: Callable[[], Awaitable[Union[bytes, str, Any]]],
+        ttl: Optional[int] = None,
+        persist: bool = False,
+        cacheable: bool = True,
+    ) -> Union[bytes, str, Any]:
+        """命中缓存直接返回，否则调用 render 并缓存 bytes 结果
+
+        ttl 为None时使用配置的过期时间，0为不过期（仅靠版本失效）；
+        persist 为True时同时写入磁盘，仅用于不过期的静态卡片。返回 str 的提示信息不会被缓存。
+        cacheable 为False时（比如随机选取背景、立绘）直接渲染。
+        """
+        if not cacheable:
+            return await render()
+        max_bytes = get_card_cache_size()
+        if ttl is None:
+            ttl = get_card_cache_ttl()
+            if ttl <= 0:
+                return await render()
+        if max_bytes <= 0:
+            return await render()
+
+        key = self.make_key(name, *parts)
+        data = self._get_memory(key)
+        if data is None and persist:
+            data = await asyncio.to_thread(self._get_disk, key)
+            if data is not None:
+                self._set_memory(key, data, 0, max_bytes)
+        if data is not None:
+            self.hits += 1
+            return data
+
+        self.misses += 1
+        result = await render()
+        if isinstance(result, bytes):
+            self._set_memory(key, result, time.time() + ttl if ttl else 0, max_bytes)
+            if persist:
+                await asyncio.to_thread(self._set_disk, key, result, max_bytes)
+        return result
+
+    def clear_name(self, name: str):
+        """删除某种卡片的全部缓存"""
+        prefix = f"{name}_"
+        with self._lock:
+            for key in [k for k in self.cache if k.startswith(prefix)]:
+                self.nbytes -= len(self.cache.pop(key)[1])
+        if self.cache_path.exists():
+            for path in self.cache_path.glob(f"{prefix}*"):
+                path.unlink(missing_ok=True)
+
+    def clear(self, persist: bool = True):
+        with self._lock:
+            self.cache.clear()
+            self.nbytes = 0
+        if persist:
+            shutil.rmtree(self.cache_path, ignore_errors=True)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self.cache),
+            "bytes": self.nbytes,
+        }
+
+
+card_cache = CardCache()
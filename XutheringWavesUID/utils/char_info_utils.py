@@ -1,31 +1,117 @@
-import json
-from typing import Any, Dict, Union, Generator
+from typing import Any, Dict, List, Tuple, Union, Optional, Generator
+from collections import OrderedDict
 
-import aiofiles
+from pydantic import TypeAdapter
 
 from gsuid_core.logger import logger
 
+from .player_store import get_player_store
 from ..utils.api.model import RoleDetailData
-from .resource.RESOURCE_PATH import PLAYER_PATH
+
+# 直接从 json 字符串校验，省去 json.loads 再逐个校验的一遍遍历
+ROLE_DETAIL_LIST = TypeAdapter(List[RoleDetailData])
 
 PATTERN = r"[\u4e00-\u9fa5a-zA-Z0-9\U0001F300-\U0001FAFF\U00002600-\U000027BF-—·()（）]+"
 
 
-async def get_all_role_detail_info_list(
-    uid: str,
-) -> Union[Generator[RoleDetailData, Any, None], None]:
-    path = PLAYER_PATH / uid / "rawData.json"
-    if not path.exists():
+def get_role_detail_cache_size() -> int:
+    from ..wutheringwaves_config import WutheringWavesConfig
+
+    return (WutheringWavesConfig.get_config("RoleDetailCacheSize").data or 0) * 1024 * 1024
+
+
+class RoleDetailCache:
+    """按uid缓存解析后的RoleDetailData
+
+    以存储的版本号（文件mtime/写入计数）判断失效，按原始数据字节数限制总大小。
+    缓存中的对象是共享的，需要修改时请先 model_copy(deep=True)。
+    """
+
+    def __init__(self):
+        self.cache: OrderedDict[Tuple[str, str], Tuple[Any, int, List[RoleDetailData]]] = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Tuple[str, str], version: Any) -> Optional[List[RoleDetailData]]:
+        item = self.cache.get(key)
+        if item is None or item[0] != version:
+            self.misses += 1
+            return None
+        self.cache.move_to_end(key)
+        self.hits += 1
+        return item[2]
+
+    def set(self, key: Tuple[str, str], version: Any, size: int, value: List[RoleDetailData]):
+        max_bytes = get_role_detail_cache_size()
+        self.invalidate(key)
+        if size > max_bytes:
+            return
+        self.cache[key] = (version, size, value)
+        self.nbytes += size
+        while self.nbytes > max_bytes and self.cache:
+            _, (_, old_size, _) = self.cache.popitem(last=False)
+            self.nbytes -= old_size
+            self.evictions += 1
+
+    def invalidate(self, key: Tuple[str, str]):
+        item = self.cache.pop(key, None)
+        if item is not None:
+            self.nbytes -= item[1]
+
+    def invalidate_uid(self, uid: str):
+        for key in [k for k in self.cache if k[1] == uid]:
+            self.invalidate(key)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self.cache),
+            "bytes": self.nbytes,
+        }
+
+
+role_detail_cache = RoleDetailCache()
+
+
+async def _load_role_detail_list(uid: str) -> Optional[List[RoleDetailData]]:
+    store = get_player_store()
+    key = (store.name, uid)
+    version = store.version(uid)
+    if version is None:
+        role_detail_cache.invalidate(key)
         return None
+
+    if get_role_detail_cache_size() > 0:
+        cached = role_detail_cache.get(key, version)
+        if cached is not None:
+            return cached
+
     try:
-        async with aiofiles.open(path, mode="r", encoding="utf-8") as f:
-            player_data = json.loads(await f.read())
+        raw = await store.load_raw(uid)
+        if raw is None:
+            return None
+        role_details = ROLE_DETAIL_LIST.validate_json(raw)
     except Exception as e:
-        logger.exception(f"get role detail info failed {path}:", e)
-        path.unlink(missing_ok=True)
+        logger.exception(f"get role detail info failed uid={uid}:", e)
+        return None
+
+    if get_role_detail_cache_size() > 0:
+        role_detail_cache.set(key, version, len(raw), role_details)
+    return role_details
+
+
+async def get_all_role_detail_info_list(
+    uid: str,
+) -> Union[Generator[RoleDetailData, Any, None], None]:
+    role_details = await _load_role_detail_list(uid)
+    if role_details is None:
         return None
 
-    return iter(RoleDetailData(**r) for r in player_data)
+    return iter(role_details)
 
 
 async def get_all_role_detail_info(uid: str) -> Union[Dict[str, RoleDetailData], None]:
@@ -1,13 +1,39 @@
-from typing import List, Union, Optional
+import threading
+from typing import List, Union, Callable, Optional
 
 from ...utils.damage.damage import DamageAttribute
 
 
 class WavesRegister(object):
     _id_cls_map = {}
+    # 首次查找时才执行的注册函数，避免启动时导入大量计算模块
+    _loader: Optional[Callable[[], None]] = None
+    _loading = False
+    _load_lock = threading.RLock()
+
+    @classmethod
+    def set_loader(cls, loader: Callable[[], None]):
+        cls._loader = loader
+
+    @classmethod
+    def _ensure_loaded(cls):
+        if cls._loader is None:
+            return
+        with WavesRegister._load_lock:
+            loader = cls._loader
+            # 注册函数内部再查找同一个注册表时直接返回
+            if loader is None or cls._loading:
+                return
+            cls._loading = True
+            try:
+                loader()
+            finally:
+                cls._loader = None
+                cls._loading = False
 
     @classmethod
     def find_class(cls, _id):
+        cls._ensure_loaded()
         return cls._id_cls_map.get(_id)
 
     @classmethod
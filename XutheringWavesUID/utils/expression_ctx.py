@@ -1,4 +1,4 @@
-from typing import Dict, Optional
+from typing import Dict, List, Tuple, Optional
 
 from pydantic import BaseModel
 
@@ -26,6 +26,7 @@ class WavesCharRank(BaseModel):
     weaponResonLevel: int  # 武器共鸣等级
     sonataName: str  # 合鸣效果
     expected_name: str  # 期望伤害名字
+    phantom_scores: List[Optional[Tuple[float, str]]] = []  # 每个声骸的评分和背景，与 equipPhantomList 一一对应
 
     def to_rank_dict(self):
         return {
@@ -62,6 +63,7 @@ async def get_waves_char_rank(uid, all_role_detail, need_expected_damage=False):
 
         sonataName = ""
         expected_name = ""
+        phantom_scores = []
         if role_detail.phantomData and role_detail.phantomData.equipPhantomList:
             equipPhantomList = role_detail.phantomData.equipPhantomList
 
@@ -77,6 +79,9 @@ async def get_waves_char_rank(uid, all_role_detail, need_expected_damage=False):
                     props = _phantom.get_props()
                     _score, _bg = calc_phantom_score(role_detail.role.roleId, props, _phantom.cost, calc.calc_temp)
                     phantom_score += _score
+                    phantom_scores.append((_score, _bg))
+                else:
+                    phantom_scores.append(None)
 
             if need_expected_damage:
                 rankDetail = DamageRankRegister.find_class(str(role_detail.role.roleId))
@@ -123,6 +128,7 @@ async def get_waves_char_rank(uid, all_role_detail, need_expected_damage=False):
                 "weaponResonLevel": role_detail.weaponData.resonLevel,
                 "sonataName": sonataName,
                 "expected_name": expected_name,
+                "phantom_scores": phantom_scores,
             }
         )
         waves_char_rank.append(wcr)
@@ -1,7 +1,7 @@
 import os
 import random
 from io import BytesIO
-from typing import Tuple, Union, Literal, Optional
+from typing import List, Tuple, Union, Literal, Optional
 from pathlib import Path
 
 from PIL import (
@@ -18,6 +18,8 @@ from gsuid_core.models import Event
 from gsuid_core.utils.image.utils import sget
 from gsuid_core.utils.image.image_tools import crop_center_img
 
+from .image_cache import open_image
+from .render_executor import render_executor
 from ..utils.resource.RESOURCE_PATH import (
     AVATAR_PATH,
     WEAPON_PATH,
@@ -105,23 +107,35 @@ WEAPON_RESONLEVEL_COLOR = {
 }
 
 
-def _random_image_from_dir(directory: str) -> Optional[str]:
-    """Return a random image filename from a directory, skipping hidden/non-image files."""
-    valid_files = [
+def _list_images(directory: Union[str, Path]) -> List[str]:
+    return [
         f
         for f in os.listdir(directory)
         if not f.startswith(".") and f.lower().endswith((".png", ".jpg", ".jpeg", ".webp"))
     ]
+
+
+def _random_image_from_dir(directory: str) -> Optional[str]:
+    """Return a random image filename from a directory, skipping hidden/non-image files."""
+    valid_files = _list_images(directory)
     return random.choice(valid_files) if valid_files else None
 
 
+def has_random_image(directory: Union[str, Path]) -> bool:
+    """目录中有多张图片时每次随机选取一张，这样的渲染结果不能缓存"""
+    try:
+        return len(_list_images(directory)) > 1
+    except OSError:
+        return False
+
+
 def get_ICON():
-    return Image.open(ICON)
+    return open_image(ICON)
 
 
 async def get_random_share_bg():
     path = random.choice(os.listdir(f"{SHARE_BG_PATH}"))
-    return Image.open(f"{SHARE_BG_PATH}/{path}").convert("RGBA")
+    return open_image(f"{SHARE_BG_PATH}/{path}", "RGBA")
 
 
 async def get_random_share_bg_path():
@@ -134,7 +148,7 @@ async def get_random_waves_role_pile(char_id: Optional[str] = None, force_not_us
         return await get_role_pile_default(char_id, custom=not force_not_use_custom)
 
     path = random.choice(os.listdir(f"{ROLE_PILE_PATH}"))
-    return Image.open(f"{ROLE_PILE_PATH}/{path}").convert("RGBA")
+    return open_image(f"{ROLE_PILE_PATH}/{path}", "RGBA")
 
 
 async def get_random_waves_bg(char_id: Optional[str] = None, force_not_use_custom: bool = False):
@@ -143,12 +157,12 @@ async def get_random_waves_bg(char_id: Optional[str] = None, force_not_use_custo
         if not force_not_use_custom and os.path.isdir(custom_dir) and len(os.listdir(custom_dir)) > 0:
             path = _random_image_from_dir(custom_dir)
             if path:
-                return Image.open(f"{custom_dir}/{path}").convert("RGBA"), True
+                return open_image(f"{custom_dir}/{path}", "RGBA"), True
         else:
             name = f"{char_id}.webp"
             path = ROLE_BG_PATH / name
             if os.path.exists(path):
-                return Image.open(path).convert("RGBA"), True
+                return open_image(path, "RGBA"), True
 
     else:
         bg_list = [f for f in os.listdir(f"{CUSTOM_MR_BG_PATH}") if os.path.isdir(f"{CUSTOM_MR_BG_PATH}/{f}")]
@@ -158,13 +172,13 @@ async def get_random_waves_bg(char_id: Optional[str] = None, force_not_use_custo
             if os.path.isdir(custom_dir) and len(os.listdir(custom_dir)) > 0:
                 path = _random_image_from_dir(custom_dir)
                 if path:
-                    return Image.open(f"{custom_dir}/{path}").convert("RGBA"), True
+                    return open_image(f"{custom_dir}/{path}", "RGBA"), True
 
         else:
             name = random.choice(os.listdir(f"{ROLE_BG_PATH}"))
             path = ROLE_BG_PATH / name
             if os.path.exists(path):
-                return Image.open(path).convert("RGBA"), True
+                return open_image(path, "RGBA"), True
 
     return await get_random_waves_role_pile(char_id, force_not_use_custom), False
 
@@ -175,11 +189,11 @@ async def get_role_pile(resource_id: Union[int, str], custom: bool = False) -> t
         if os.path.isdir(custom_dir) and len(os.listdir(custom_dir)) > 0:
             path = _random_image_from_dir(custom_dir)
             if path:
-                return True, Image.open(f"{custom_dir}/{path}").convert("RGBA")
+                return True, open_image(f"{custom_dir}/{path}", "RGBA")
 
     name = f"role_pile_{resource_id}.png"
     path = ROLE_PILE_PATH / name
-    return False, Image.open(path).convert("RGBA")
+    return False, open_image(path, "RGBA")
 
 
 async def get_role_pile_default(resource_id: Union[int, str], custom: bool = False) -> Image.Image:
@@ -188,19 +202,19 @@ async def get_role_pile_default(resource_id: Union[int, str], custom: bool = Fal
         if os.path.isdir(custom_dir) and len(os.listdir(custom_dir)) > 0:
             path = _random_image_from_dir(custom_dir)
             if path:
-                return Image.open(f"{custom_dir}/{path}").convert("RGBA")
+                return open_image(f"{custom_dir}/{path}", "RGBA")
 
     name = f"role_pile_{resource_id}.png"
     path = ROLE_PILE_PATH / name
     if not os.path.exists(path):
         path = ROLE_PILE_PATH / "role_pile_1503.png"
-    return Image.open(path).convert("RGBA")
+    return open_image(path, "RGBA")
 
 
 async def get_square_avatar(resource_id: Union[int, str]) -> Image.Image:
     name = f"role_head_{resource_id}.png"
     path = AVATAR_PATH / name
-    return Image.open(path).convert("RGBA")
+    return open_image(path, "RGBA")
 
 
 async def cropped_square_avatar(item_icon: Image.Image, size: int) -> Image.Image:
@@ -231,9 +245,9 @@ async def get_square_weapon(resource_id: Union[int, str]) -> Image.Image:
     name = f"weapon_{resource_id}.png"
     path = WEAPON_PATH / name
     if os.path.exists(path):
-        return Image.open(path).convert("RGBA")
+        return open_image(path, "RGBA")
     else:
-        return Image.open(WEAPON_PATH / "weapon_21010063.png").convert("RGBA")
+        return open_image(WEAPON_PATH / "weapon_21010063.png", "RGBA")
 
 
 async def get_attribute(name: str = "", is_simple: bool = False) -> Image.Image:
@@ -241,29 +255,29 @@ async def get_attribute(name: str = "", is_simple: bool = False) -> Image.Image:
         name = f"attribute/attr_simple_{name}.png"
     else:
         name = f"attribute/attr_{name}.png"
-    return Image.open(TEXT_PATH / name).convert("RGBA")
+    return open_image(TEXT_PATH / name, "RGBA")
 
 
 async def get_attribute_prop(name: str = "") -> Image.Image:
     if (TEXT_PATH / "attribute_prop" / f"attr_prop_{name}.png").exists():
-        return Image.open(TEXT_PATH / "attribute_prop" / f"attr_prop_{name}.png").convert("RGBA")
+        return open_image(TEXT_PATH / "attribute_prop" / f"attr_prop_{name}.png", "RGBA")
     else:
-        return Image.open(TEXT_PATH / "attribute_prop" / "attr_prop_攻击.png").convert("RGBA")
+        return open_image(TEXT_PATH / "attribute_prop" / "attr_prop_攻击.png", "RGBA")
 
 
 async def get_attribute_effect(name: str = "") -> Image.Image:
     if (TEXT_PATH / "attribute_effect" / f"attr_{name}.png").exists():
-        return Image.open(TEXT_PATH / "attribute_effect" / f"attr_{name}.png").convert("RGBA")
+        return open_image(TEXT_PATH / "attribute_effect" / f"attr_{name}.png", "RGBA")
     else:
-        return Image.open(TEXT_PATH / "attribute_effect" / "attr_不绝余音.png").convert("RGBA")
+        return open_image(TEXT_PATH / "attribute_effect" / "attr_不绝余音.png", "RGBA")
 
 
 async def get_weapon_type(name: str = "") -> Image.Image:  # 出新武器改这里
-    return Image.open(TEXT_PATH / f"weapon_type/weapon_type_{name}.png").convert("RGBA")
+    return open_image(TEXT_PATH / f"weapon_type/weapon_type_{name}.png", "RGBA")
 
 
 def get_waves_bg(w: int, h: int, bg: str = "bg") -> Image.Image:
-    img = Image.open(TEXT_PATH / f"{bg}.jpg").convert("RGBA")
+    img = open_image(TEXT_PATH / f"{bg}.jpg", "RGBA")
     return crop_center_img(img, w, h)
 
 
@@ -276,7 +290,7 @@ def get_custom_waves_bg(  # 不是所有地方都适合替换为custom，函数
     if ShowConfig.get_config("CardBg").data:
         bg_path = Path(ShowConfig.get_config("CardBgPath").data)
         if bg_path.exists():
-            img = Image.open(bg_path).convert("RGBA")
+            img = open_image(bg_path, "RGBA")
             img = crop_center_img(img, w, h)
 
     if not img:
@@ -287,7 +301,7 @@ def get_custom_waves_bg(  # 不是所有地方都适合替换为custom，函数
 
 
 def get_crop_waves_bg(w: int, h: int, bg: str = "bg") -> Image.Image:
-    img = Image.open(TEXT_PATH / f"{bg}.jpg").convert("RGBA")
+    img = open_image(TEXT_PATH / f"{bg}.jpg", "RGBA")
 
     width, height = img.size
 
@@ -349,7 +363,7 @@ async def get_event_avatar(
         pic_path_list = list(avatar_path.iterdir())
         if pic_path_list:
             path = random.choice(pic_path_list)
-            img = Image.open(path).convert("RGBA")
+            img = open_image(path, "RGBA")
 
     if img is None:
         img = await get_square_avatar(1203)
@@ -358,11 +372,11 @@ async def get_event_avatar(
 
 
 def get_small_logo(logo_num=1):
-    return Image.open(TEXT_PATH / f"logo_small_{logo_num}.png")
+    return open_image(TEXT_PATH / f"logo_small_{logo_num}.png")
 
 
 def get_footer(color: Literal["white", "black", "hakush"] = "white"):
-    return Image.open(TEXT_PATH / f"footer_{color}.png")
+    return open_image(TEXT_PATH / f"footer_{color}.png")
 
 
 def add_footer(
@@ -496,7 +510,7 @@ async def draw_avatar_with_star(
         img = Image.new("RGBA", (item_width, item_width), img_color)
 
     # 144*144
-    star_bg = Image.open(TEXT_PATH / f"star_{star_level}.png")
+    star_bg = open_image(TEXT_PATH / f"star_{star_level}.png")
     avatar = avatar.resize((item_width, item_width))
 
     img.alpha_composite(avatar, (0, 0))
@@ -505,7 +519,7 @@ async def draw_avatar_with_star(
 
 
 async def get_star_bg(star_level: int = 5) -> Image.Image:
-    return Image.open(TEXT_PATH / f"star_{star_level}.png")
+    return open_image(TEXT_PATH / f"star_{star_level}.png")
 
 
 async def pic_download_from_url(
@@ -521,33 +535,46 @@ async def pic_download_from_url(
 
         await download(pic_url, path, name, tag="[鸣潮]")
 
-    return Image.open(_path).convert("RGBA")
+    return open_image(_path, "RGBA")
 
 
 async def get_custom_gaussian_blur(img: Image.Image) -> Image.Image:
-    return _get_custom_gaussian_blur(img)
+    """毛玻璃在渲染池中执行"""
+    radius, brightness, contrast = _get_blur_config()
+    if radius <= 0:
+        return img
+    return await render_executor.run("blur", _gaussian_blur, img, radius, brightness, contrast)
 
 
 def _get_custom_gaussian_blur(img: Image.Image) -> Image.Image:
+    radius, brightness, contrast = _get_blur_config()
+    if radius <= 0:
+        return img
+    return _gaussian_blur(img, radius, brightness, contrast)
+
+
+def _get_blur_config() -> Tuple[int, float, float]:
     from ..wutheringwaves_config.wutheringwaves_config import ShowConfig
 
     radius = ShowConfig.get_config("BlurRadius").data
-    if radius > 0:
-        # 应用高斯模糊
-        img = img.filter(ImageFilter.GaussianBlur(radius=radius))
-        # 调整亮度和对比度
-        brightness = ShowConfig.get_config("BlurBrightness").data
-        try:
-            brightness = float(brightness)
-        except Exception:
-            brightness = 1
-        contrast = ShowConfig.get_config("BlurContrast").data
-        try:
-            contrast = float(contrast)
-        except Exception:
-            contrast = 1
-
-        img = ImageEnhance.Brightness(img).enhance(brightness)
-        # 调整对比度
-        img = ImageEnhance.Contrast(img).enhance(contrast)
+    brightness = ShowConfig.get_config("BlurBrightness").data
+    try:
+        brightness = float(brightness)
+    except Exception:
+        brightness = 1
+    contrast = ShowConfig.get_config("BlurContrast").data
+    try:
+        contrast = float(contrast)
+    except Exception:
+        contrast = 1
+    return radius, brightness, contrast
+
+
+def _gaussian_blur(img: Image.Image, radius: int, brightness: float, contrast: float) -> Image.Image:
+    # 应用高斯模糊
+    img = img.filter(ImageFilter.GaussianBlur(radius=radius))
+    # 调整亮度
+    img = ImageEnhance.Brightness(img).enhance(brightness)
+    # 调整对比度
+    img = ImageEnhance.Contrast(img).enhance(contrast)
     return img
@@ -0,0 +1,99 @@
+import os
+import threading
+from typing import Dict, Tuple, Union, Optional
+from pathlib import Path
+from collections import OrderedDict
+
+from PIL import Image
+
+
+def get_image_cache_size() -> int:
+    from ..wutheringwaves_config import WutheringWavesConfig
+
+    return (WutheringWavesConfig.get_config("ImageCacheSize").data or 0) * 1024 * 1024
+
+
+class ImageCache:
+    """按 (路径, 修改时间, mode, size) 缓存解码后的图片
+
+    按像素数据大小限制总内存，取出时返回副本，调用方可以随意修改。
+    """
+
+    def __init__(self):
+        self.cache: OrderedDict[Tuple, Tuple[int, Image.Image]] = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def _load(self, path: str, mode: Optional[str], size: Optional[Tuple[int, int]]) -> Image.Image:
+        img = Image.open(path)
+        if mode and img.mode != mode:
+            img = img.convert(mode)
+        else:
+            img.load()
+        if size and img.size != size:
+            img = img.resize(size)
+        return img
+
+    def open(
+        self,
+        path: Union[str, Path],
+        mode: Optional[str] = None,
+        size: Optional[Tuple[int, int]] = None,
+    ) -> Image.Image:
+        path = str(path)
+        max_bytes = get_image_cache_size()
+        if max_bytes <= 0:
+            return self._load(path, mode, size)
+
+        key = (path, os.stat(path).st_mtime_ns, mode, size)
+        with self._lock:
+            item = self.cache.get(key)
+            if item is not None:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                return item[1].copy()
+            self.misses += 1
+
+        img = self._load(path, mode, size)
+        nbytes = img.width * img.height * len(img.getbands())
+        if nbytes > max_bytes:
+            return img
+
+        with self._lock:
+            if key not in self.cache:
+                self.cache[key] = (nbytes, img)
+                self.nbytes += nbytes
+            while self.nbytes > max_bytes and self.cache:
+                _, (old_size, _) = self.cache.popitem(last=False)
+                self.nbytes -= old_size
+                self.evictions += 1
+        return img.copy()
+
+    def clear(self):
+        with self._lock:
+            self.cache.clear()
+            self.nbytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self.cache),
+            "bytes": self.nbytes,
+        }
+
+
+image_cache = ImageCache()
+
+
+def open_image(
+    path: Union[str, Path],
+    mode: Optional[str] = None,
+    size: Optional[Tuple[int, int]] = None,
+) -> Image.Image:
+    """代替 Image.open(path).convert(mode)，静态资源只解码一次"""
+    return image_cache.open(path, mode, size)
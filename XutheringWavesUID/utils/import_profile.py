@@ -0,0 +1,97 @@
+"""插件导入耗时统计
+
+设置环境变量 XWUID_IMPORT_PROFILE=1 后启动，记录插件内每个模块的导入耗时（含子模块），
+启动完成时输出最慢的模块，用于跟踪每个版本的冷启动时间。未开启时不做任何处理。
+"""
+
+import os
+import sys
+import time
+from typing import Any, Dict, List, Tuple, Optional
+from importlib.abc import Loader, MetaPathFinder
+from importlib.machinery import ModuleSpec
+
+from gsuid_core.logger import logger
+
+IMPORT_PROFILE_ENV = "XWUID_IMPORT_PROFILE"
+
+
+class _TimingLoader(Loader):
+    def __init__(self, loader: Loader, profiler: "ImportProfiler"):
+        self.loader = loader
+        self.profiler = profiler
+
+    def create_module(self, spec: ModuleSpec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        start = time.perf_counter()
+        try:
+            self.loader.exec_module(module)
+        finally:
+            self.profiler.cost[module.__name__] = time.perf_counter() - start
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.loader, name)
+
+
+class ImportProfiler(MetaPathFinder):
+    def __init__(self, package: str):
+        self.package = package
+        self.cost: Dict[str, float] = {}
+        self.start = time.perf_counter()
+        self._finding = False
+
+    def find_spec(self, fullname: str, path, target=None) -> Optional[ModuleSpec]:
+        if self._finding or not fullname.startswith(f"{self.package}."):
+            return None
+        # 交给其余的 finder 查找，只替换 loader
+        self._finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._finding = False
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimingLoader(spec.loader, self)
+        return spec
+
+    def top(self, n: int = 20) -> List[Tuple[str, float]]:
+        return sorted(self.cost.items(), key=lambda x: x[1], reverse=True)[:n]
+
+
+_profiler: Optional[ImportProfiler] = None
+
+
+def install_import_profiler(package: str):
+    global _profiler
+    if not os.environ.get(IMPORT_PROFILE_ENV) or _profiler is not None:
+        return
+    _profiler = ImportProfiler(package)
+    sys.meta_path.insert(0, _profiler)
+
+
+def report_import_profile():
+    """卸载统计并输出结果"""
+    global _profiler
+    if _profiler is None:
+        return
+    from ..version import XutheringWavesUID_version
+
+    profiler, _profiler = _profiler, None
+    if profiler in sys.meta_path:
+        sys.meta_path.remove(profiler)
+
+    total = time.perf_counter() - profiler.start
+    prefix = len(profiler.package) + 1
+    lines = [f"{name[prefix:]}: {cost * 1000:.1f}ms" for name, cost in profiler.top()]
+    logger.info(
+        f"[鸣潮] v{XutheringWavesUID_version} 导入 {len(profiler.cost)} 个模块，"
+        f"启动总耗时 {total * 1000:.0f}ms，最慢的模块（含子模块）:\n" + "\n".join(lines)
+    )
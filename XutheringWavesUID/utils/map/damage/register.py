@@ -2,7 +2,13 @@ import importlib
 
 from gsuid_core.logger import logger
 
-from ....utils.damage.abstract import DamageRankRegister, DamageDetailRegister
+from ....utils.damage.abstract import (
+    WavesCharRegister,
+    WavesEchoRegister,
+    DamageRankRegister,
+    WavesWeaponRegister,
+    DamageDetailRegister,
+)
 
 ID_MAPPING = {
     "1102": "1102",
@@ -84,20 +90,33 @@ def register_rank(reload=False):
     _dynamic_load_and_register(attr_name="rank", register_cls=DamageRankRegister, force_reload=reload)
 
 
-def reload_all_register():
-    # 注册
-    from ...queues import init_queues
-    from ...damage.register_char import register_char
-    from ...damage.register_echo import register_echo
+def _load_weapon():
     from ...damage.register_weapon import register_weapon
 
     register_weapon()
+
+
+def _load_echo():
+    from ...damage.register_echo import register_echo
+
     register_echo()
 
-    register_damage(reload=True)
-    register_rank(reload=True)
+
+def _load_char():
+    from ...damage.register_char import register_char
 
     register_char()
 
+
+def reload_all_register():
+    # 注册，计算模块在第一次查找时才导入
+    from ...queues import init_queues
+
+    WavesWeaponRegister.set_loader(_load_weapon)
+    WavesEchoRegister.set_loader(_load_echo)
+    DamageDetailRegister.set_loader(lambda: register_damage(reload=True))
+    DamageRankRegister.set_loader(lambda: register_rank(reload=True))
+    WavesCharRegister.set_loader(_load_char)
+
     # 初始化任务队列
     init_queues()
@@ -0,0 +1,329 @@
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import threading
+from typing import Any, Dict, List, Tuple, Iterable, Optional
+
+import aiofiles
+
+from gsuid_core.logger import logger
+
+from .resource.RESOURCE_PATH import MAIN_PATH, PLAYER_PATH
+
+PLAYER_DB_PATH = MAIN_PATH / "player_data.db"
+
+
+def get_player_store_backend() -> str:
+    from ..wutheringwaves_config import WutheringWavesConfig
+
+    return WutheringWavesConfig.get_config("PlayerDataStore").data or "json"
+
+
+class JsonPlayerStore:
+    """players/<uid>/rawData.json 整文件存储"""
+
+    name = "json"
+
+    @staticmethod
+    def _path(uid: str):
+        return PLAYER_PATH / uid / "rawData.json"
+
+    def version(self, uid: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self._path(uid))
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    async def load_raw(self, uid: str) -> Optional[str]:
+        path = self._path(uid)
+        if not path.exists():
+            return None
+        async with aiofiles.open(path, mode="r", encoding="utf-8") as f:
+            return await f.read()
+
+    async def load_roles(self, uid: str) -> Optional[List[Dict[str, Any]]]:
+        path = self._path(uid)
+        try:
+            raw = await self.load_raw(uid)
+            if raw is None:
+                return None
+            return json.loads(raw)
+        except Exception as e:
+            logger.exception(f"load player roles failed {path}:", e)
+            path.unlink(missing_ok=True)
+            return None
+
+    async def load_many(self, uids: Iterable[str]) -> Dict[str, List[Dict[str, Any]]]:
+        result = {}
+        for uid in uids:
+            roles = await self.load_roles(uid)
+            if roles is not None:
+                result[uid] = roles
+        return result
+
+    async def upsert_roles(
+        self,
+        uid: str,
+        all_roles: List[Dict[str, Any]],
+        changed: List[Dict[str, Any]],
+        deleted: Iterable[int] = (),
+    ):
+        if not changed and not deleted:
+            return
+        # json 只能整文件重写
+        _dir = PLAYER_PATH / uid
+        _dir.mkdir(parents=True, exist_ok=True)
+        path = _dir / "rawData.json"
+        try:
+            async with aiofiles.open(path, "w", encoding="utf-8") as file:
+                await file.write(json.dumps(all_roles, ensure_ascii=False))
+        except Exception as e:
+            logger.exception(f"save player roles failed {path}:", e)
+
+    @staticmethod
+    def _fingerprint_path(uid: str):
+        return PLAYER_PATH / uid / "refreshFingerprint.json"
+
+    async def load_fingerprints(self, uid: str) -> Dict[str, Dict[str, Any]]:
+        """{roleId: {"fp": 上次获取详情时的指纹, "time": 获取时间}}"""
+        path = self._fingerprint_path(uid)
+        if not path.exists():
+            return {}
+        try:
+            async with aiofiles.open(path, "r", encoding="utf-8") as f:
+                return json.loads(await f.read())
+        except Exception as e:
+            logger.debug(f"load refresh fingerprints failed {path}: {e}")
+            return {}
+
+    async def save_fingerprints(self, uid: str, changed: Dict[str, Dict[str, Any]]):
+        if not changed:
+            return
+        path = self._fingerprint_path(uid)
+        fingerprints = await self.load_fingerprints(uid)
+        fingerprints.update(changed)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            async with aiofiles.open(path, "w", encoding="utf-8") as f:
+                await f.write(json.dumps(fingerprints, ensure_ascii=False))
+        except Exception as e:
+            logger.debug(f"save refresh fingerprints failed {path}: {e}")
+
+
+class SqlitePlayerStore:
+    """(uid, roleId) 为主键的 sqlite 存储，刷新单个角色只重写一行"""
+
+    name = "sqlite"
+
+    def __init__(self, db_path=PLAYER_DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._migrated: set = set()
+        # uid -> (最后写入时间ns, 写入次数)，持久化在 uid_version 表，重启后快照等仍能判断是否过期
+        self._versions: Dict[str, Tuple[int, int]] = {}
+        self._write_lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS role_data ("
+                "uid TEXT NOT NULL, role_id INTEGER NOT NULL, data TEXT NOT NULL, "
+                "PRIMARY KEY (uid, role_id))"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS migrated_uid (uid TEXT PRIMARY KEY)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS uid_version ("
+                "uid TEXT PRIMARY KEY, updated_at INTEGER NOT NULL, revision INTEGER NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS role_fingerprint ("
+                "uid TEXT NOT NULL, role_id INTEGER NOT NULL, data TEXT NOT NULL, "
+                "PRIMARY KEY (uid, role_id))"
+            )
+            self._migrated.update(r[0] for r in conn.execute("SELECT uid FROM migrated_uid"))
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _migrate_uid(self, uid: str):
+        """首次访问时把 rawData.json 导入数据库，原文件保留作备份"""
+        if uid in self._migrated:
+            return
+        path = PLAYER_PATH / uid / "rawData.json"
+        rows = []
+        if path.exists():
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    rows = [(uid, int(r["role"]["roleId"]), json.dumps(r, ensure_ascii=False)) for r in json.load(f)]
+            except Exception as e:
+                logger.warning(f"[鸣潮] 迁移面板数据失败 {path}: {e}")
+                rows = []
+        with self._write_lock:
+            conn = self._connect()
+            with conn:
+                if rows:
+                    conn.executemany("INSERT OR IGNORE INTO role_data (uid, role_id, data) VALUES (?, ?, ?)", rows)
+                    version = self._bump_version(conn, uid)
+                conn.execute("INSERT OR IGNORE INTO migrated_uid (uid) VALUES (?)", (uid,))
+            if rows:
+                self._versions[uid] = version
+        self._migrated.add(uid)
+
+    def _load_raw_many(self, uids: List[str]) -> Dict[str, List[str]]:
+        for uid in uids:
+            self._migrate_uid(uid)
+        result: Dict[str, List[str]] = {}
+        conn = self._connect()
+        # sqlite 默认单条语句最多 999 个参数
+        for i in range(0, len(uids), 500):
+            chunk = uids[i : i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for uid, data in conn.execute(
+                f"SELECT uid, data FROM role_data WHERE uid IN ({placeholders}) ORDER BY rowid",
+                chunk,
+            ):
+                result.setdefault(uid, []).append(data)
+        return result
+
+    def _upsert(self, uid: str, changed: List[Dict[str, Any]], deleted: List[int]):
+        self._migrate_uid(uid)
+        with self._write_lock:
+            conn = self._connect()
+            with conn:
+                if deleted:
+                    conn.executemany(
+                        "DELETE FROM role_data WHERE uid = ? AND role_id = ?",
+                        [(uid, int(i)) for i in deleted],
+                    )
+                if changed:
+                    conn.executemany(
+                        "INSERT INTO role_data (uid, role_id, data) VALUES (?, ?, ?) "
+                        "ON CONFLICT(uid, role_id) DO UPDATE SET data = excluded.data",
+                        [(uid, int(r["role"]["roleId"]), json.dumps(r, ensure_ascii=False)) for r in changed],
+                    )
+                version = self._bump_version(conn, uid)
+            self._versions[uid] = version
+
+    @staticmethod
+    def _bump_version(conn: sqlite3.Connection, uid: str) -> Tuple[int, int]:
+        """在写入数据的同一事务内更新版本，调用方持有 _write_lock"""
+        conn.execute(
+            "INSERT INTO uid_version (uid, updated_at, revision) VALUES (?, ?, 1) "
+            "ON CONFLICT(uid) DO UPDATE SET updated_at = excluded.updated_at, revision = revision + 1",
+            (uid, time.time_ns()),
+        )
+        row = conn.execute("SELECT updated_at, revision FROM uid_version WHERE uid = ?", (uid,)).fetchone()
+        return row[0], row[1]
+
+    def version(self, uid: str) -> Optional[Tuple[int, int]]:
+        version = self._versions.get(uid)
+        if version is None:
+            # 与写入互斥，避免把提交前读到的旧版本写回缓存
+            with self._write_lock:
+                row = (
+                    self._connect()
+                    .execute("SELECT updated_at, revision FROM uid_version WHERE uid = ?", (uid,))
+                    .fetchone()
+                )
+                version = self._versions[uid] = (row[0], row[1]) if row else (0, 0)
+        return version
+
+    async def load_raw(self, uid: str) -> Optional[str]:
+        result = await asyncio.to_thread(self._load_raw_many, [uid])
+        if uid not in result:
+            return None
+        return f"[{','.join(result[uid])}]"
+
+    async def load_roles(self, uid: str) -> Optional[List[Dict[str, Any]]]:
+        result = await self.load_many([uid])
+        return result.get(uid)
+
+    async def load_many(self, uids: Iterable[str]) -> Dict[str, List[Dict[str, Any]]]:
+        uids = list(dict.fromkeys(uids))
+        if not uids:
+            return {}
+        result = await asyncio.to_thread(self._load_raw_many, uids)
+        return {uid: [json.loads(d) for d in datas] for uid, datas in result.items()}
+
+    async def upsert_roles(
+        self,
+        uid: str,
+        all_roles: List[Dict[str, Any]],
+        changed: List[Dict[str, Any]],
+        deleted: Iterable[int] = (),
+    ):
+        deleted = list(deleted)
+        if not changed and not deleted:
+            return
+        try:
+            await asyncio.to_thread(self._upsert, uid, changed, deleted)
+        except Exception as e:
+            logger.exception(f"save player roles failed uid={uid}:", e)
+
+    def _load_fingerprints(self, uid: str) -> Dict[str, Dict[str, Any]]:
+        rows = self._connect().execute("SELECT role_id, data FROM role_fingerprint WHERE uid = ?", (uid,))
+        return {f"{role_id}": json.loads(data) for role_id, data in rows}
+
+    def _save_fingerprints(self, uid: str, changed: Dict[str, Dict[str, Any]]):
+        with self._write_lock:
+            conn = self._connect()
+            with conn:
+                conn.executemany(
+                    "INSERT INTO role_fingerprint (uid, role_id, data) VALUES (?, ?, ?) "
+                    "ON CONFLICT(uid, role_id) DO UPDATE SET data = excluded.data",
+                    [(uid, int(role_id), json.dumps(fp)) for role_id, fp in changed.items()],
+                )
+
+    async def load_fingerprints(self, uid: str) -> Dict[str, Dict[str, Any]]:
+        """{roleId: {"fp": 上次获取详情时的指纹, "time": 获取时间}}"""
+        try:
+            return await asyncio.to_thread(self._load_fingerprints, uid)
+        except Exception as e:
+            logger.debug(f"load refresh fingerprints failed uid={uid}: {e}")
+            return {}
+
+    async def save_fingerprints(self, uid: str, changed: Dict[str, Dict[str, Any]]):
+        if not changed:
+            return
+        try:
+            await asyncio.to_thread(self._save_fingerprints, uid, changed)
+        except Exception as e:
+            logger.debug(f"save refresh fingerprints failed uid={uid}: {e}")
+
+    def migrate_all(self) -> int:
+        count = 0
+        if not PLAYER_PATH.exists():
+            return count
+        for player_dir in PLAYER_PATH.iterdir():
+            if not player_dir.is_dir() or player_dir.name in self._migrated:
+                continue
+            self._migrate_uid(player_dir.name)
+            count += 1
+        return count
+
+
+_stores: Dict[str, Any] = {}
+
+
+def get_player_store():
+    backend = get_player_store_backend()
+    if backend not in _stores:
+        if backend == "sqlite":
+            _stores[backend] = SqlitePlayerStore()
+        else:
+            _stores[backend] = JsonPlayerStore()
+    return _stores[backend]
+
+
+async def migrate_all_player_data() -> int:
+    """将所有 rawData.json 一次性导入 sqlite"""
+    store = _stores.get("sqlite") or SqlitePlayerStore()
+    _stores["sqlite"] = store
+    return await asyncio.to_thread(store.migrate_all)
@@ -5,62 +5,52 @@ import httpx
 from gsuid_core.logger import logger
 
 from .const import QUEUE_SCORE_RANK, QUEUE_ABYSS_RECORD, QUEUE_SLASH_RECORD
-from .queues import event_handler, start_dispatcher
+from .queues import start_dispatcher
 from ..api.wwapi import (
     UPLOAD_URL,
     UPLOAD_ABYSS_RECORD_URL,
     UPLOAD_SLASH_RECORD_URL,
 )
+from .upload_queue import upload_queue, upload_handler
+from ..api.http_client import http_client
 
 
-@event_handler(QUEUE_SCORE_RANK)
-async def send_score_rank(item: Any):
-    if not item:
-        return
-    if not isinstance(item, dict):
-        return
+def get_waves_token() -> str:
     from ...wutheringwaves_config import WutheringWavesConfig
 
-    WavesToken = WutheringWavesConfig.get_config("WavesToken").data
+    return WutheringWavesConfig.get_config("WavesToken").data
 
-    if not WavesToken:
-        return
 
-    async with httpx.AsyncClient() as client:
-        res = None
-        try:
-            res = await client.post(
-                UPLOAD_URL,
-                json=item,
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {WavesToken}",
-                },
-                timeout=httpx.Timeout(10),
-            )
-            logger.info(f"上传面板结果: {res.status_code} - {res.text}")
-        except Exception as e:
-            logger.exception(f"上传面板失败: {res.text if res else ''} {e}")
+def has_waves_token() -> bool:
+    return bool(get_waves_token())
 
 
-@event_handler(QUEUE_ABYSS_RECORD)
-async def send_abyss_record(item: Any):
-    if not item:
-        return
-    if not isinstance(item, dict):
-        return
-    from ...wutheringwaves_config import WutheringWavesConfig
+def score_rank_key(item: Any) -> str:
+    # 单角色刷新只覆盖同一角色的数据，全量刷新覆盖整个账号
+    if item.get("single_refresh") and item.get("char_info"):
+        return f"{item['waves_id']}_{item['char_info'][0]['char_id']}"
+    return f"{item['waves_id']}"
+
+
+def record_key(item: Any) -> str:
+    # 深塔记录为 waves_id，冥海记录为 wavesId
+    return f"{item.get('waves_id') or item.get('wavesId')}"
 
-    WavesToken = WutheringWavesConfig.get_config("WavesToken").data
 
+async def post_item(url: str, item: Any, name: str) -> bool:
+    """上传成功或不可重试的失败返回 True，网络错误、限流和服务端错误返回 False 稍后重试"""
+    if not item or not isinstance(item, dict):
+        return True
+
+    WavesToken = get_waves_token()
     if not WavesToken:
-        return
+        return True
 
-    async with httpx.AsyncClient() as client:
+    async with http_client(url) as client:
         res = None
         try:
             res = await client.post(
-                UPLOAD_ABYSS_RECORD_URL,
+                url,
                 json=item,
                 headers={
                     "Content-Type": "application/json",
@@ -68,41 +58,29 @@ async def send_abyss_record(item: Any):
                 },
                 timeout=httpx.Timeout(10),
             )
-            logger.info(f"上传深渊结果: {res.status_code} - {res.text}")
+            logger.info(f"上传{name}结果: {res.status_code} - {res.text}")
         except Exception as e:
-            logger.exception(f"上传深渊失败: {res.text if res else ''} {e}")
+            logger.warning(f"上传{name}失败: {res.text if res else ''} {e}")
+            return False
+    return res.status_code != 429 and res.status_code < 500
 
 
-@event_handler(QUEUE_SLASH_RECORD)
-async def send_slash_record(item: Any):
-    if not item:
-        return
-    if not isinstance(item, dict):
-        return
-    from ...wutheringwaves_config import WutheringWavesConfig
+@upload_handler(QUEUE_SCORE_RANK, score_rank_key, has_waves_token)
+async def send_score_rank(item: Any) -> bool:
+    return await post_item(UPLOAD_URL, item, "面板")
 
-    WavesToken = WutheringWavesConfig.get_config("WavesToken").data
 
-    if not WavesToken:
-        return
+@upload_handler(QUEUE_ABYSS_RECORD, record_key, has_waves_token)
+async def send_abyss_record(item: Any) -> bool:
+    return await post_item(UPLOAD_ABYSS_RECORD_URL, item, "深渊")
 
-    async with httpx.AsyncClient() as client:
-        res = None
-        try:
-            res = await client.post(
-                UPLOAD_SLASH_RECORD_URL,
-                json=item,
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {WavesToken}",
-                },
-                timeout=httpx.Timeout(10),
-            )
-            logger.info(f"上传冥海结果: {res.status_code} - {res.text}")
-        except Exception as e:
-            logger.exception(f"上传冥海失败: {res.text if res else ''} {e}")
+
+@upload_handler(QUEUE_SLASH_RECORD, record_key, has_waves_token)
+async def send_slash_record(item: Any) -> bool:
+    return await post_item(UPLOAD_SLASH_RECORD_URL, item, "冥海")
 
 
 def init_queues():
-    # 启动任务分发器
+    # 启动任务分发器和上传队列
     start_dispatcher(daemon=True)
+    upload_queue.start(daemon=True)
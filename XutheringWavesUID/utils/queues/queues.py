@@ -1,15 +1,22 @@
 import asyncio
 import threading
-from typing import Any, Dict, List, Union, Callable, Coroutine
+from typing import Any, Set, Dict, List, Union, Callable, Optional, Coroutine
 
 from gsuid_core.logger import logger
 
 
 class TaskDispatcher:
+    """在独立线程的事件循环中执行本地任务处理器（event_handler）
+
+    emit 可以在任意线程调用，数据通过 call_soon_threadsafe 交给分发器的事件循环。
+    """
+
     def __init__(self):
-        self.queue = asyncio.Queue()
         self.running = False
         self.handlers: Dict[str, List[Callable]] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
 
     def register_handler(
         self,
@@ -25,40 +32,23 @@ class TaskDispatcher:
         logger.info(f"注册任务处理器: {task_type} -> {handler.__name__}")
 
     def emit(self, task_type: str, data: Any) -> None:
-        if not self.running:
-            logger.warning("任务分发器未启动或已关闭")
-            return
         if task_type not in self.handlers:
             return
+        if not self.running or self._loop is None:
+            logger.warning("任务分发器未启动或已关闭")
+            return
 
         try:
-            loop = asyncio.get_event_loop()
-            asyncio.run_coroutine_threadsafe(self.queue.put((task_type, data)), loop)
+            self._loop.call_soon_threadsafe(self._dispatch, task_type, data)
         except RuntimeError:
-            # 如果没有事件循环，创建一个新的
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(self.queue.put((task_type, data)))
-
-    async def _process(self) -> None:
-        while True:
-            try:
-                if not self.running:
-                    break
-
-                task_type, data = await asyncio.wait_for(self.queue.get(), timeout=3.0)
-
-                # 获取所有处理器并依次执行
-                handlers = self.handlers.get(task_type, [])
-                for handler in handlers:
-                    asyncio.create_task(self._run_task(handler, data, task_type))
+            logger.warning("任务分发器已关闭")
 
-                self.queue.task_done()
-
-            except asyncio.TimeoutError:
-                continue
-            except Exception as e:
-                logger.exception(f"任务处理异常: {e}")
+    def _dispatch(self, task_type: str, data: Any) -> None:
+        # 获取所有处理器并依次执行
+        for handler in self.handlers.get(task_type, []):
+            task = asyncio.create_task(self._run_task(handler, data, task_type))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
 
     async def _run_task(self, handler: Callable, data: Any, task_type: str) -> None:
         try:
@@ -68,12 +58,48 @@ class TaskDispatcher:
         except Exception as e:
             logger.exception(f"任务执行错误 ({task_type}): {e}")
 
+    def _run_loop(self, ready: threading.Event) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+            self._loop = None
+
     def start(self, daemon: bool = True) -> None:
         if self.running:
             return
 
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run_loop, args=(ready,), daemon=daemon)
+        self._thread.start()
+        ready.wait()
         self.running = True
-        threading.Thread(target=lambda: asyncio.run(self._process()), daemon=daemon).start()
+
+    async def _drain(self, timeout: float) -> None:
+        if not self._tasks:
+            return
+        _, pending = await asyncio.wait(list(self._tasks), timeout=timeout)
+        if pending:
+            logger.warning(f"任务分发器关闭超时，未完成任务: {len(pending)}")
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def stop(self, timeout: float = 10) -> None:
+        """不再接收新任务，等待执行中的任务完成（最多 timeout 秒）后关闭事件循环"""
+        loop = self._loop
+        if not self.running or loop is None:
+            return
+        self.running = False
+        future = asyncio.run_coroutine_threadsafe(self._drain(timeout), loop)
+        try:
+            await asyncio.wrap_future(future)
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
 
 
 # 创建全局任务分发器实例
@@ -91,8 +117,12 @@ def start_dispatcher(daemon: bool = True) -> None:
     dispatcher.start(daemon=daemon)
 
 
-def push_item(queue_name: str, item: Any) -> None:
+async def push_item(queue_name: str, item: Any) -> None:
+    from .upload_queue import upload_queue
+
     dispatcher.emit(queue_name, item)
+    # 注册了上传函数的队列写入持久化上传队列
+    await upload_queue.put(queue_name, item)
 
 
 def event_handler(task_type: str) -> Callable:
@@ -0,0 +1,288 @@
+import json
+import time
+import asyncio
+import sqlite3
+import threading
+from typing import Any, Dict, List, Tuple, Callable, Optional, Awaitable
+
+from gsuid_core.logger import logger
+
+from ..api.throttle import backoff_delay
+from ..api.http_client import http_clients
+from ..resource.RESOURCE_PATH import MAIN_PATH
+
+UPLOAD_QUEUE_DB_PATH = MAIN_PATH / "upload_queue.db"
+
+# 失败重试的基础间隔和上限（秒）
+RETRY_DELAY = 5
+MAX_RETRY_DELAY = 600
+# 超过次数仍失败则丢弃
+MAX_ATTEMPTS = 10
+# 没有新数据时的轮询间隔
+POLL_INTERVAL = 10
+
+
+def get_upload_batch_size() -> int:
+    from ...wutheringwaves_config import WutheringWavesConfig
+
+    return WutheringWavesConfig.get_config("UploadBatchSize").data or 1
+
+
+def get_upload_max_inflight() -> int:
+    from ...wutheringwaves_config import WutheringWavesConfig
+
+    return WutheringWavesConfig.get_config("UploadMaxInflight").data or 1
+
+
+def get_upload_queue_max_size() -> int:
+    from ...wutheringwaves_config import WutheringWavesConfig
+
+    return WutheringWavesConfig.get_config("UploadQueueMaxSize").data or 0
+
+
+# 上传函数返回 True 表示处理完成（成功或不可重试的失败），False 或抛出异常则稍后重试
+UploadHandler = Callable[[Any], Awaitable[bool]]
+DedupKey = Callable[[Any], str]
+Enabled = Callable[[], bool]
+
+
+class UploadQueue:
+    """持久化的上传队列
+
+    push_item 时写入 sqlite（WAL），由独立线程中的事件循环批量取出上传，
+    成功后才删除，重启后未完成的数据会重新上传（至少一次）。
+    同一队列中去重 key 相同的数据只保留最新的一条。
+    """
+
+    def __init__(self, db_path=UPLOAD_QUEUE_DB_PATH):
+        self.db_path = db_path
+        self.handlers: Dict[str, Tuple[UploadHandler, DedupKey, Enabled]] = {}
+        self.running = False
+        self.inflight = 0
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        with self._connect() as conn:
+            # AUTOINCREMENT 保证被替换的数据不会复用 id，确认时不会误删新数据
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS upload_queue ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, queue TEXT NOT NULL, dedup_key TEXT NOT NULL, "
+                "data TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, "
+                "next_at REAL NOT NULL, created_at REAL NOT NULL, "
+                "UNIQUE (queue, dedup_key))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_upload_queue_next_at ON upload_queue (next_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def register(self, queue: str, handler: UploadHandler, dedup_key: DedupKey, enabled: Enabled):
+        self.handlers[queue] = (handler, dedup_key, enabled)
+        logger.info(f"注册上传队列: {queue} -> {handler.__name__}")
+
+    async def put(self, queue: str, item: Any) -> bool:
+        if queue not in self.handlers or not item:
+            return False
+        _, dedup_key, enabled = self.handlers[queue]
+        if not enabled():
+            return False
+        try:
+            key = dedup_key(item)
+            data = json.dumps(item, ensure_ascii=False)
+        except Exception as e:
+            logger.warning(f"[鸣潮] 上传数据无法序列化 {queue}: {e}")
+            return False
+
+        await asyncio.to_thread(self._put, queue, key, data)
+        self._notify()
+        return True
+
+    def _put(self, queue: str, key: str, data: str):
+        now = time.time()
+        max_size = get_upload_queue_max_size()
+        with self._write_lock:
+            conn = self._connect()
+            with conn:
+                # 替换时换新的 id（确认时不会误删新数据），入队时间保留最早的一次
+                conn.execute(
+                    "INSERT OR REPLACE INTO upload_queue (queue, dedup_key, data, next_at, created_at) "
+                    "VALUES (?, ?, ?, ?, COALESCE("
+                    "(SELECT created_at FROM upload_queue WHERE queue = ? AND dedup_key = ?), ?))",
+                    (queue, key, data, now, queue, key, now),
+                )
+                if max_size > 0:
+                    # 积压过多时丢弃最旧的数据
+                    cur = conn.execute(
+                        "DELETE FROM upload_queue WHERE id IN ("
+                        "SELECT id FROM upload_queue ORDER BY id DESC LIMIT -1 OFFSET ?)",
+                        (max_size,),
+                    )
+                    if cur.rowcount > 0:
+                        self.dropped += cur.rowcount
+                        logger.warning(f"[鸣潮] 上传队列已满，丢弃 {cur.rowcount} 条最旧的数据")
+
+    def _notify(self):
+        loop, wakeup = self._loop, self._wakeup
+        if loop is None or wakeup is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(wakeup.set)
+        except RuntimeError:
+            pass
+
+    def _claim(self, queues: List[str], limit: int) -> List[Tuple[int, str, str, int]]:
+        # 只取已注册上传函数的队列，其余的保留到下次注册
+        placeholders = ",".join("?" * len(queues))
+        conn = self._connect()
+        return conn.execute(
+            f"SELECT id, queue, data, attempts FROM upload_queue "
+            f"WHERE queue IN ({placeholders}) AND next_at <= ? ORDER BY id LIMIT ?",
+            (*queues, time.time(), limit),
+        ).fetchall()
+
+    def _finish(self, done: List[int], retry: List[Tuple[int, int]], drop: List[int]):
+        now = time.time()
+        with self._write_lock:
+            conn = self._connect()
+            with conn:
+                conn.executemany("DELETE FROM upload_queue WHERE id = ?", [(i,) for i in done + drop])
+                conn.executemany(
+                    "UPDATE upload_queue SET attempts = ?, next_at = ? WHERE id = ?",
+                    [
+                        (attempts, now + backoff_delay(RETRY_DELAY, attempts - 1, MAX_RETRY_DELAY), i)
+                        for i, attempts in retry
+                    ],
+                )
+
+    def _next_due(self, queues: List[str]) -> Optional[float]:
+        placeholders = ",".join("?" * len(queues))
+        row = (
+            self._connect()
+            .execute(f"SELECT MIN(next_at) FROM upload_queue WHERE queue IN ({placeholders})", queues)
+            .fetchone()
+        )
+        return row[0] if row else None
+
+    async def _send(self, semaphore: asyncio.Semaphore, queue: str, data: str) -> bool:
+        handler, _, _ = self.handlers[queue]
+        async with semaphore:
+            self.inflight += 1
+            try:
+                return bool(await handler(json.loads(data)))
+            except Exception as e:
+                logger.warning(f"[鸣潮] 上传失败 {queue}: {e}")
+                return False
+            finally:
+                self.inflight -= 1
+
+    async def _process_batch(self) -> int:
+        queues = list(self.handlers)
+        if not queues:
+            return 0
+        rows = await asyncio.to_thread(self._claim, queues, get_upload_batch_size())
+        if not rows:
+            return 0
+
+        semaphore = asyncio.Semaphore(get_upload_max_inflight())
+        results = await asyncio.gather(*[self._send(semaphore, queue, data) for _, queue, data, _ in rows])
+
+        done, retry, drop = [], [], []
+        for (row_id, queue, _, attempts), ok in zip(rows, results):
+            if ok:
+                done.append(row_id)
+            elif attempts + 1 >= MAX_ATTEMPTS:
+                logger.warning(f"[鸣潮] 上传失败次数过多，丢弃 {queue} id: {row_id}")
+                drop.append(row_id)
+            else:
+                retry.append((row_id, attempts + 1))
+        self.sent += len(done)
+        self.failed += len(retry)
+        self.dropped += len(drop)
+        await asyncio.to_thread(self._finish, done, retry, drop)
+        return len(rows)
+
+    async def _run(self):
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        while self.running:
+            try:
+                self._wakeup.clear()
+                if await self._process_batch():
+                    continue
+                # 队列为空或都在等待重试，等到下一条到期或有新数据
+                next_due = await asyncio.to_thread(self._next_due, list(self.handlers)) if self.handlers else None
+                timeout = POLL_INTERVAL if next_due is None else max(0.1, min(POLL_INTERVAL, next_due - time.time()))
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+            except Exception as e:
+                logger.exception(f"[鸣潮] 上传队列处理异常: {e}")
+                await asyncio.sleep(POLL_INTERVAL)
+        # 事件循环结束前关闭本线程中创建的 http 客户端
+        await http_clients.close_loop()
+
+    def start(self, daemon: bool = True):
+        if self.running:
+            return
+        self.running = True
+        self._thread = threading.Thread(target=lambda: asyncio.run(self._run()), daemon=daemon)
+        self._thread.start()
+
+    async def stop(self, timeout: float = 10):
+        """不再取出新数据，等待正在上传的一批完成；未上传的数据留在数据库中，下次启动继续上传"""
+        thread = self._thread
+        if not self.running or thread is None:
+            return
+        self.running = False
+        self._notify()
+        await asyncio.to_thread(thread.join, timeout)
+        if thread.is_alive():
+            logger.warning("[鸣潮] 上传队列关闭超时")
+        self._thread = None
+
+    def _stats(self) -> Tuple[Dict[str, int], Optional[float]]:
+        conn = self._connect()
+        depth: Dict[str, int] = {}
+        for queue, count in conn.execute("SELECT queue, COUNT(*) FROM upload_queue GROUP BY queue"):
+            depth[queue] = count
+        row = conn.execute("SELECT MIN(created_at) FROM upload_queue").fetchone()
+        return depth, row[0] if row else None
+
+    async def stats(self) -> Dict[str, Any]:
+        depth, oldest = await asyncio.to_thread(self._stats)
+        return {
+            "depth": depth,
+            "lag": round(time.time() - oldest, 1) if oldest else 0,
+            "inflight": self.inflight,
+            "sent": self.sent,
+            "failed": self.failed,
+            "dropped": self.dropped,
+        }
+
+
+upload_queue = UploadQueue()
+
+
+def upload_handler(queue: str, dedup_key: DedupKey, enabled: Enabled = lambda: True) -> Callable:
+    """注册持久化上传函数，push_item 到该队列的数据会写入上传队列
+
+    dedup_key 返回去重用的 key，enabled 返回 False 时不入队（比如没有配置上传token）
+    """
+
+    def decorator(func: UploadHandler) -> UploadHandler:
+        upload_queue.register(queue, func, dedup_key, enabled)
+        return func
+
+    return decorator
@@ -0,0 +1,245 @@
+import json
+import asyncio
+import sqlite3
+import threading
+from typing import Any, Dict, List, Tuple, Iterable, Optional, NamedTuple
+
+from gsuid_core.logger import logger
+
+from .resource.RESOURCE_PATH import MAIN_PATH
+
+RANK_INDEX_DB_PATH = MAIN_PATH / "rank_index.db"
+
+# 索引类别
+RANK_ROLE = "role"  # key=roleId value=声骸分数 extra=期望伤害
+RANK_GACHA = "gacha"  # key=0 value=加权抽数 extra=总抽数
+RANK_SLASH = "slash"  # key=0 value=无尽分数 extra=记录时间
+
+
+class RankRow(NamedTuple):
+    uid: str
+    key: int
+    value: float
+    extra: float
+    payload: Dict[str, Any]
+
+
+class RankIndex:
+    """群排行的物化索引
+
+    群成员会变动，所以按 (类别, uid, key) 存储，查询时再用群内uid过滤，
+    排行只需读取索引行，不用再逐个解析玩家文件。
+    """
+
+    def __init__(self, db_path=RANK_INDEX_DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        # 进程内的写入计数，排行卡片缓存用它判断索引是否有变化
+        self.generation = 0
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rank_index ("
+                "family TEXT NOT NULL, uid TEXT NOT NULL, key INTEGER NOT NULL, "
+                "value REAL NOT NULL, extra REAL NOT NULL DEFAULT 0, payload TEXT NOT NULL DEFAULT '{}', "
+                "PRIMARY KEY (family, uid, key))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_rank_value ON rank_index (family, key, value)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rank_indexed (family TEXT NOT NULL, uid TEXT NOT NULL, "
+                "version TEXT NOT NULL DEFAULT '', PRIMARY KEY (family, uid))"
+            )
+            columns = {r[1] for r in conn.execute("PRAGMA table_info(rank_indexed)")}
+            if "version" not in columns:
+                conn.execute("ALTER TABLE rank_indexed ADD COLUMN version TEXT NOT NULL DEFAULT ''")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _replace(
+        self,
+        family: str,
+        uid: str,
+        rows: List[Tuple[int, float, float, Dict[str, Any]]],
+        version: str,
+    ):
+        with self._write_lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM rank_index WHERE family = ? AND uid = ?", (family, uid))
+                conn.executemany(
+                    "INSERT INTO rank_index (family, uid, key, value, extra, payload) VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (family, uid, int(key), float(value), float(extra), json.dumps(payload, ensure_ascii=False))
+                        for key, value, extra, payload in rows
+                    ],
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO rank_indexed (family, uid, version) VALUES (?, ?, ?)",
+                    (family, uid, version),
+                )
+            self.generation += 1
+
+    def _query(
+        self,
+        family: str,
+        uids: List[str],
+        keys: Optional[List[int]],
+        min_value: Optional[float],
+    ) -> List[RankRow]:
+        conn = self._connect()
+        result = []
+        for i in range(0, len(uids), 500):
+            chunk = uids[i : i + 500]
+            sql = f"SELECT uid, key, value, extra, payload FROM rank_index WHERE family = ? AND uid IN ({','.join('?' * len(chunk))})"
+            args: List[Any] = [family, *chunk]
+            if keys:
+                sql += f" AND key IN ({','.join('?' * len(keys))})"
+                args.extend(keys)
+            if min_value is not None:
+                sql += " AND value >= ?"
+                args.append(min_value)
+            for uid, key, value, extra, payload in conn.execute(sql, args):
+                result.append(RankRow(uid, key, value, extra, json.loads(payload)))
+        return result
+
+    def _missing(self, family: str, uids: List[str], version: str) -> List[str]:
+        conn = self._connect()
+        indexed = set()
+        for i in range(0, len(uids), 500):
+            chunk = uids[i : i + 500]
+            indexed.update(
+                r[0]
+                for r in conn.execute(
+                    f"SELECT uid FROM rank_indexed WHERE family = ? AND version = ? "
+                    f"AND uid IN ({','.join('?' * len(chunk))})",
+                    [family, version, *chunk],
+                )
+            )
+        return [uid for uid in uids if uid not in indexed]
+
+    async def replace(
+        self,
+        family: str,
+        uid: str,
+        rows: List[Tuple[int, float, float, Dict[str, Any]]],
+        version: str = "",
+    ):
+        try:
+            await asyncio.to_thread(self._replace, family, uid, rows, version)
+        except Exception as e:
+            logger.warning(f"[鸣潮] 更新排行索引失败 {family} uid={uid}: {e}")
+
+    async def query(
+        self,
+        family: str,
+        uids: Iterable[str],
+        keys: Optional[Iterable[int]] = None,
+        min_value: Optional[float] = None,
+    ) -> List[RankRow]:
+        uids = list(dict.fromkeys(uids))
+        if not uids:
+            return []
+        return await asyncio.to_thread(self._query, family, uids, [int(k) for k in keys] if keys else None, min_value)
+
+    async def missing(self, family: str, uids: Iterable[str], version: str = "") -> List[str]:
+        """没有索引或索引版本不一致的uid"""
+        uids = list(dict.fromkeys(uids))
+        if not uids:
+            return []
+        return await asyncio.to_thread(self._missing, family, uids, version)
+
+
+_rank_index: Optional[RankIndex] = None
+
+
+def get_rank_index() -> RankIndex:
+    global _rank_index
+    if _rank_index is None:
+        _rank_index = RankIndex()
+    return _rank_index
+
+
+async def update_role_rank_index(uid: str, waves_char_rank: Optional[List[Any]]):
+    """面板刷新后写入角色分数/伤害，waves_char_rank 需包含该uid的全部角色"""
+    from .role_snapshot import get_calc_resource_version
+
+    if waves_char_rank is None:
+        return
+    rows = [
+        (
+            r.roleId,
+            r.score,
+            r.expected_damage or 0,
+            {"level": r.level, "chain": r.chain},
+        )
+        for r in waves_char_rank
+    ]
+    await get_rank_index().replace(RANK_ROLE, uid, rows, get_calc_resource_version())
+
+
+async def ensure_role_rank_index(uids: Iterable[str]):
+    """为还没有索引的uid（功能上线前刷新的面板）补建索引，计算资源更新后也会重建"""
+    from .role_snapshot import get_role_snapshot, get_calc_resource_version
+
+    version = get_calc_resource_version()
+    for uid in await get_rank_index().missing(RANK_ROLE, uids, version):
+        waves_char_rank = await get_role_snapshot(uid)
+        if waves_char_rank is None:
+            await get_rank_index().replace(RANK_ROLE, uid, [], version)
+            continue
+        await update_role_rank_index(uid, waves_char_rank)
+
+
+def get_gacha_weighted(stats: Dict) -> Tuple[float, int]:
+    """加权抽数和总抽数，与 GachaRankCard 的算法一致"""
+    char_pool = stats.get("角色精准调谐", {})
+    weapon_pool = stats.get("武器精准调谐", {})
+    char_avg = char_pool.get("avg_up", 0) or char_pool.get("avg", 0)
+    weapon_avg = weapon_pool.get("avg_up", 0) or weapon_pool.get("avg", 0)
+    total_count = char_pool.get("total", 0) + weapon_pool.get("total", 0)
+    char_gold = char_pool.get("char_gold", 0)
+    weapon_gold = weapon_pool.get("weapon_gold", 0)
+    denominator = 81 * char_gold + 54 * weapon_gold
+    if denominator > 0:
+        weighted = (char_avg * char_gold + weapon_avg * weapon_gold) / denominator * 100
+    else:
+        weighted = 1000
+    return weighted, total_count
+
+
+async def update_gacha_rank_index(uid: str, stats: Optional[Dict]):
+    if not stats:
+        await get_rank_index().replace(RANK_GACHA, uid, [])
+        return
+    weighted, total_count = get_gacha_weighted(stats)
+    await get_rank_index().replace(RANK_GACHA, uid, [(0, weighted, total_count, stats)])
+
+
+async def ensure_gacha_rank_index(uids: Iterable[str]):
+    from ..wutheringwaves_gachalog.draw_gachalogs import get_gacha_stats
+
+    for uid in await get_rank_index().missing(RANK_GACHA, uids):
+        await update_gacha_rank_index(uid, await get_gacha_stats(uid))
+
+
+def get_slash_rank_score(slash_data: Any) -> int:
+    """无尽排行分数：难度12（difficulty=2）首个挑战的上下半总分，未解锁为0"""
+    if not slash_data or not slash_data.isUnlock or not slash_data.difficultyList:
+        return 0
+    difficulty_12 = next((k for k in slash_data.difficultyList if k.difficulty == 2), None)
+    if not difficulty_12 or not difficulty_12.challengeList:
+        return 0
+    challenge = difficulty_12.challengeList[0]
+    return sum(half.score for half in challenge.halfList or [])
+
+
+async def update_slash_rank_index(uid: str, score: int, record_time: int):
+    rows = [(0, score, record_time, {})] if score > 0 else []
+    await get_rank_index().replace(RANK_SLASH, uid, rows)
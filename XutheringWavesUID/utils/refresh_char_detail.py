@@ -1,23 +1,24 @@
-import json
+import time
 import asyncio
 from typing import Dict, List, Union, Optional
 
-import aiofiles
-
 from gsuid_core.logger import logger
 from gsuid_core.models import Event
 
 from ..utils.hint import error_reply
 from ..utils.util import get_version
-from ..utils.api.model import RoleList, AccountBaseInfo
+from ..utils.api.model import Role, RoleList, AccountBaseInfo
 from ..utils.waves_api import waves_api
+from ..utils.rank_index import update_role_rank_index
 from .resource.constant import SPECIAL_CHAR_INT_ALL
 from ..utils.error_reply import WAVES_CODE_101, WAVES_CODE_102
+from ..utils.player_store import get_player_store
 from ..utils.queues.const import QUEUE_SCORE_RANK
 from ..utils.queues.queues import push_item
+from ..utils.role_snapshot import save_role_snapshot, get_waves_char_rank_incremental
 from ..utils.expression_ctx import WavesCharRank, get_waves_char_rank
+from ..utils.char_info_utils import role_detail_cache
 from ..wutheringwaves_config import WutheringWavesConfig
-from ..utils.resource.RESOURCE_PATH import PLAYER_PATH
 
 
 def is_use_global_semaphore() -> bool:
@@ -28,6 +29,19 @@ def get_refresh_card_concurrency() -> int:
     return WutheringWavesConfig.get_config("RefreshCardConcurrency").data or 2
 
 
+def is_refresh_incremental() -> bool:
+    return WutheringWavesConfig.get_config("RefreshIncremental").data or False
+
+
+def get_refresh_incremental_max_age() -> int:
+    return (WutheringWavesConfig.get_config("RefreshIncrementalMaxAge").data or 0) * 3600
+
+
+def role_fingerprint(role: Role) -> List:
+    """角色列表中就能拿到的信号，变化了说明一定要重新获取详情"""
+    return [role.level, role.breach, role.chainUnlockNum, role.starLevel]
+
+
 class SemaphoreManager:
     def __init__(self):
         self._last_config: int = get_refresh_card_concurrency()
@@ -63,12 +77,11 @@ async def send_card(
     token: Optional[str] = "",
     role_info: Optional[RoleList] = None,
     waves_data: Optional[List] = None,
+    waves_char_rank: Optional[List[WavesCharRank]] = None,
 ):
-    waves_char_rank: Optional[List[WavesCharRank]] = None
-
     WavesToken = WutheringWavesConfig.get_config("WavesToken").data
 
-    if WavesToken:
+    if WavesToken and waves_char_rank is None:
         waves_char_rank = await get_waves_char_rank(uid, save_data, True)
 
     if is_self_ck and token and waves_char_rank and WavesToken and role_info and waves_data and user_id:
@@ -100,7 +113,7 @@ async def send_card(
             "role_num": account_info.roleNum,
             "single_refresh": 1 if len(waves_data) == 1 else 0,
         }
-        push_item(QUEUE_SCORE_RANK, metadata)
+        await push_item(QUEUE_SCORE_RANK, metadata)
 
 
 async def save_card_info(
@@ -114,23 +127,15 @@ async def save_card_info(
 ):
     if len(waves_data) == 0:
         return
-    _dir = PLAYER_PATH / uid
-    _dir.mkdir(parents=True, exist_ok=True)
-    path = _dir / "rawData.json"
+    store = get_player_store()
 
-    old_data = {}
-    if path.exists():
-        try:
-            async with aiofiles.open(path, mode="r", encoding="utf-8") as f:
-                old = json.loads(await f.read())
-                old_data = {d["role"]["roleId"]: d for d in old}
-        except Exception as e:
-            logger.exception(f"save_card_info get failed {path}:", e)
-            path.unlink(missing_ok=True)
+    old = await store.load_roles(uid) or []
+    old_data = {d["role"]["roleId"]: d for d in old}
 
     #
     refresh_update = {}
     refresh_unchanged = {}
+    deleted = []
     for item in waves_data:
         role_id = item["role"]["roleId"]
 
@@ -142,6 +147,7 @@ async def save_card_info(
                     continue
                 if piaobo_id != role_id:
                     del old_data[piaobo_id]
+                    deleted.append(piaobo_id)
 
         old = old_data.get(role_id)
         if old != item:
@@ -153,57 +159,24 @@ async def save_card_info(
 
     save_data = list(old_data.values())
 
-    await send_card(uid, user_id, save_data, is_self_ck, token, role_info, waves_data)
+    # 评分和期望伤害只在刷新时计算一次，上传排行、快照和排行索引共用
+    # 未变化的角色直接复用快照，只对变化的角色评分
+    unchanged_ids = [role_id for role_id in old_data if role_id not in refresh_update]
+    waves_char_rank = await get_waves_char_rank_incremental(uid, save_data, unchanged_ids)
 
-    try:
-        async with aiofiles.open(path, "w", encoding="utf-8") as file:
-            await file.write(json.dumps(save_data, ensure_ascii=False))
-    except Exception as e:
-        logger.exception(f"save_card_info save failed {path}:", e)
+    await send_card(uid, user_id, save_data, is_self_ck, token, role_info, waves_data, waves_char_rank)
+
+    await store.upsert_roles(uid, save_data, list(refresh_update.values()), deleted)
+    role_detail_cache.invalidate_uid(uid)
 
-    # 保存charListData.json（角色评分缓存）
-    waves_char_rank = await get_waves_char_rank(uid, save_data, True)
-    await save_char_list_cache(uid, waves_char_rank)
+    await save_role_snapshot(uid, waves_char_rank)
+    await update_role_rank_index(uid, waves_char_rank)
 
     if waves_map:
         waves_map["refresh_update"] = refresh_update
         waves_map["refresh_unchanged"] = refresh_unchanged
 
 
-async def save_char_list_cache(uid: str, waves_char_rank: Optional[List[WavesCharRank]]):
-    """保存角色评分数据到charListData.json供练度排行使用
-
-    只更新改动的角色，而不是重写整个文件。
-
-    Args:
-        uid: 用户uid
-        waves_char_rank: WavesCharRank列表（只包含改动的角色）
-    """
-    if not waves_char_rank:
-        return
-
-    try:
-        from ..wutheringwaves_rank.draw_rank_list_card import (
-            load_char_list_data,
-            save_char_list_data,
-        )
-
-        # 加载现有的角色评分数据
-        existing_char_list_data = await load_char_list_data(uid)
-        if not existing_char_list_data:
-            existing_char_list_data = {}
-
-        # 只更新改动的角色
-        for char_rank in waves_char_rank:
-            existing_char_list_data[str(char_rank.roleId)] = char_rank.score
-
-        # 保存更新后的数据
-        if existing_char_list_data:
-            await save_char_list_data(uid, existing_char_list_data)
-    except Exception as e:
-        logger.debug(f"保存charListData.json失败 uid={uid}: {e}")
-
-
 async def refresh_char(
     ev: Event,
     uid: str,
@@ -237,25 +210,51 @@ async def refresh_char(
             return await waves_api.get_role_detail_info(role_id, uid, ck)
 
     if is_self_ck:
-        tasks = [
-            limited_get_role_detail_info(f"{r.roleId}", uid, ck)
+        role_ids = [
+            r.roleId
             for r in role_info.roleList
             if refresh_type == "all" or (isinstance(refresh_type, list) and f"{r.roleId}" in refresh_type)
         ]
     else:
         if role_info.showRoleIdList:
-            tasks = [
-                limited_get_role_detail_info(f"{r}", uid, ck)
+            role_ids = [
+                r
                 for r in role_info.showRoleIdList
                 if refresh_type == "all" or (isinstance(refresh_type, list) and f"{r}" in refresh_type)
             ]
         else:
-            tasks = [
-                limited_get_role_detail_info(f"{r.roleId}", uid, ck)
+            role_ids = [
+                r.roleId
                 for r in role_info.roleList
                 if refresh_type == "all" or (isinstance(refresh_type, list) and f"{r.roleId}" in refresh_type)
             ]
-    results = await asyncio.gather(*tasks)
+
+    # 增量刷新：列表信号没变且不久前获取过详情的角色直接沿用本地数据
+    role_map = {r.roleId: r for r in role_info.roleList}
+    incremental = is_refresh_incremental()
+    # 本次获取到详情的角色的新指纹
+    new_fingerprints: Dict[str, Dict] = {}
+    if refresh_type == "all" and incremental:
+        fingerprints = await get_player_store().load_fingerprints(uid)
+        stored = {d["role"]["roleId"]: d for d in await get_player_store().load_roles(uid) or []}
+        deadline = time.time() - get_refresh_incremental_max_age()
+        fetch_ids = []
+        for role_id in role_ids:
+            fp = fingerprints.get(f"{role_id}")
+            if (
+                role_id in stored
+                and role_id in role_map
+                and fp
+                and fp["fp"] == role_fingerprint(role_map[role_id])
+                and fp["time"] > deadline
+            ):
+                waves_datas.append(stored[role_id])
+            else:
+                fetch_ids.append(role_id)
+        logger.debug(f"[鸣潮] {uid} 增量刷新 获取{len(fetch_ids)}个 跳过{len(role_ids) - len(fetch_ids)}个")
+        role_ids = fetch_ids
+
+    results = await asyncio.gather(*[limited_get_role_detail_info(f"{r}", uid, ck) for r in role_ids])
 
     charId2chainNum: Dict[int, int] = {
         r.roleId: r.chainUnlockNum for r in role_info.roleList if isinstance(r.chainUnlockNum, int)
@@ -306,6 +305,9 @@ async def refresh_char(
             logger.exception(f"{uid} 合鸣效果修正失败", e)
 
         waves_datas.append(role_detail_info)
+        role_id = role_detail_info["role"]["roleId"]
+        if incremental and role_id in role_map:
+            new_fingerprints[f"{role_id}"] = {"fp": role_fingerprint(role_map[role_id]), "time": int(time.time())}
 
     await save_card_info(
         uid,
@@ -316,6 +318,8 @@ async def refresh_char(
         token=ck,
         role_info=role_info,
     )
+    if new_fingerprints:
+        await get_player_store().save_fingerprints(uid, new_fingerprints)
 
     if not waves_datas:
         if refresh_type == "all":
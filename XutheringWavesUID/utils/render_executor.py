@@ -0,0 +1,120 @@
+import time
+import asyncio
+from typing import Any, Dict, Union, Callable, Optional
+from pathlib import Path
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+
+from PIL import Image
+
+from gsuid_core.logger import logger
+from gsuid_core.utils.image.convert import convert_img as _convert_img
+
+
+def get_render_workers() -> int:
+    from ..wutheringwaves_config import WutheringWavesConfig
+
+    return WutheringWavesConfig.get_config("RenderWorkers").data or 0
+
+
+def is_render_use_process() -> bool:
+    from ..wutheringwaves_config import WutheringWavesConfig
+
+    return WutheringWavesConfig.get_config("RenderUseProcess").data or False
+
+
+def _convert_img_sync(img: Image.Image, is_base64: bool):
+    # 在工作线程/进程中用独立的事件循环执行编码
+    return asyncio.run(_convert_img(img, is_base64))
+
+
+class RenderStat:
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, cost: float):
+        self.count += 1
+        self.total += cost
+        self.max = max(self.max, cost)
+
+
+class RenderExecutor:
+    """把PIL模糊、缩放、编码等CPU密集的同步函数放到线程池或进程池执行
+
+    调用方用 run(name, func, *args) 显式指定统计名，目前包括背景毛玻璃(blur)、
+    自定义面板立绘缩放(char_pile)和最终的图片编码(encode)。
+
+    PIL 的大部分操作会释放GIL，默认使用线程池即可让事件循环保持响应；
+    开启进程池时，函数和参数需要可以 pickle。
+    """
+
+    def __init__(self):
+        self._executor: Optional[Executor] = None
+        self._config = (0, False)
+        self.inflight = 0
+        self.stats: Dict[str, RenderStat] = {}
+
+    def _get_executor(self) -> Optional[Executor]:
+        config = (get_render_workers(), is_render_use_process())
+        if config != self._config:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+            workers, use_process = config
+            if workers > 0:
+                if use_process:
+                    self._executor = ProcessPoolExecutor(max_workers=workers)
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="waves_render")
+            self._config = config
+        return self._executor
+
+    @property
+    def depth(self) -> int:
+        """排队中（还没有工作者处理）的任务数"""
+        return max(0, self.inflight - self._config[0])
+
+    async def run(self, name: str, func: Callable, *args) -> Any:
+        executor = self._get_executor()
+        start = time.perf_counter()
+        self.inflight += 1
+        try:
+            if executor is None:
+                return func(*args)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, func, *args)
+        finally:
+            self.inflight -= 1
+            cost = time.perf_counter() - start
+            self.stats.setdefault(name, RenderStat()).add(cost)
+            logger.debug(f"[鸣潮] 渲染 {name} 耗时 {cost * 1000:.1f}ms")
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "depth": self.depth,
+            "inflight": self.inflight,
+            "tasks": {
+                name: {
+                    "count": s.count,
+                    "avg_ms": round(s.total / s.count * 1000, 1),
+                    "max_ms": round(s.max * 1000, 1),
+                }
+                for name, s in self.stats.items()
+            },
+        }
+
+
+render_executor = RenderExecutor()
+
+
+async def convert_img(
+    img: Union[Image.Image, str, Path, bytes],
+    is_base64: bool = False,
+):
+    """gsuid_core convert_img 的替代，图片编码在渲染池中执行"""
+    if not isinstance(img, Image.Image) or get_render_workers() <= 0:
+        return await _convert_img(img, is_base64)
+    return await render_executor.run("encode", _convert_img_sync, img, is_base64)
@@ -122,7 +122,9 @@ async def download_all_resource(force: bool = False):
 
 def reload_all_modules():
     # 强制加载所有 map 数据
+    from ..card_cache import card_cache
     from ..name_convert import ensure_data_loaded as ensure_name_convert_loaded
+    from ..role_snapshot import reset_calc_resource_version
     from ..ascension.char import ensure_data_loaded as ensure_char_loaded
     from ..ascension.echo import ensure_data_loaded as ensure_echo_loaded
     from ..ascension.sonata import ensure_data_loaded as ensure_sonata_loaded
@@ -137,3 +139,6 @@ def reload_all_modules():
     ensure_sonata_loaded(force=True)
 
     reload_all_register()
+    # 计算资源可能已更新，评分快照需要重新校验
+    reset_calc_resource_version()
+    card_cache.clear()
@@ -0,0 +1,139 @@
+import json
+import hashlib
+from typing import Any, Dict, List, Iterable, Optional
+
+import aiofiles
+
+from gsuid_core.logger import logger
+
+from ..version import XutheringWavesUID_version
+from .player_store import get_player_store
+from .expression_ctx import WavesCharRank, get_waves_char_rank
+from .char_info_utils import get_all_role_detail_info_list
+from .resource.RESOURCE_PATH import (
+    BUILD_PATH,
+    PLAYER_PATH,
+    MAP_CHAR_PATH,
+    MAP_BUILD_PATH,
+)
+
+_calc_resource_version: Optional[str] = None
+
+
+def get_calc_resource_version() -> str:
+    """评分/伤害计算资源的版本
+
+    由 waves_build、map/waves_build 和角色 map 文件的 (路径, 大小, 修改时间) 计算，
+    资源更新后快照自动失效。
+    """
+    global _calc_resource_version
+    if _calc_resource_version is None:
+        md5 = hashlib.md5(XutheringWavesUID_version.encode())
+        for root in (BUILD_PATH, MAP_BUILD_PATH, MAP_CHAR_PATH):
+            if not root.exists():
+                continue
+            for path in sorted(root.rglob("*")):
+                if "__pycache__" in path.parts or not path.is_file():
+                    continue
+                stat = path.stat()
+                md5.update(f"{path.relative_to(root)}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+        _calc_resource_version = md5.hexdigest()
+    return _calc_resource_version
+
+
+def reset_calc_resource_version():
+    global _calc_resource_version
+    _calc_resource_version = None
+
+
+def _snapshot_path(uid: str):
+    return PLAYER_PATH / uid / "roleSnapshot.json"
+
+
+def _data_version(uid: str) -> Optional[List[Any]]:
+    store = get_player_store()
+    version = store.version(uid)
+    if version is None:
+        return None
+    return [store.name, *version]
+
+
+async def save_role_snapshot(uid: str, waves_char_rank: List[WavesCharRank]):
+    """保存刷新时算好的评分/伤害快照，需包含该uid的全部角色"""
+    data_version = _data_version(uid)
+    if data_version is None:
+        return
+    snapshot = {
+        "resource_version": get_calc_resource_version(),
+        "data_version": data_version,
+        "roles": [r.model_dump() for r in waves_char_rank],
+    }
+    try:
+        async with aiofiles.open(_snapshot_path(uid), "w", encoding="utf-8") as file:
+            await file.write(json.dumps(snapshot, ensure_ascii=False))
+    except Exception as e:
+        logger.debug(f"保存roleSnapshot.json失败 uid={uid}: {e}")
+
+
+async def load_role_snapshot(uid: str) -> Optional[List[WavesCharRank]]:
+    """读取快照，资源或面板数据版本不一致时返回None"""
+    path = _snapshot_path(uid)
+    if not path.exists():
+        return None
+    try:
+        async with aiofiles.open(path, "r", encoding="utf-8") as f:
+            snapshot = json.loads(await f.read())
+        if snapshot.get("resource_version") != get_calc_resource_version():
+            return None
+        if snapshot.get("data_version") != _data_version(uid):
+            return None
+        return [WavesCharRank(**r) for r in snapshot["roles"]]
+    except Exception as e:
+        logger.debug(f"读取roleSnapshot.json失败 uid={uid}: {e}")
+        return None
+
+
+async def get_waves_char_rank_incremental(
+    uid: str,
+    save_data: List[Dict[str, Any]],
+    unchanged_ids: Iterable[int],
+) -> List[WavesCharRank]:
+    """刷新时只为有变化的角色重新评分
+
+    未变化角色的面板数据与快照来源一致，直接复用快照中的结果。
+    需要在写入新面板数据之前调用，否则快照会因为数据版本变化而失效。
+    """
+    previous = {r.roleId: r for r in await load_role_snapshot(uid) or []}
+    reuse = {role_id: previous[role_id] for role_id in unchanged_ids if role_id in previous}
+
+    changed = [r for r in save_data if r["role"]["roleId"] not in reuse]
+    scored = {r.roleId: r for r in await get_waves_char_rank(uid, changed, True)} if changed else {}
+
+    waves_char_rank = []
+    for r in save_data:
+        role_id = r["role"]["roleId"]
+        char_rank = reuse.get(role_id) or scored.get(role_id)
+        if char_rank:
+            waves_char_rank.append(char_rank)
+    return waves_char_rank
+
+
+async def get_role_snapshot(uid: str) -> Optional[List[WavesCharRank]]:
+    """获取角色评分/伤害快照，失效时按本地面板重新计算并保存"""
+    waves_char_rank = await load_role_snapshot(uid)
+    if waves_char_rank is not None:
+        return waves_char_rank
+
+    role_details = await get_all_role_detail_info_list(uid)
+    if role_details is None:
+        return None
+    waves_char_rank = await get_waves_char_rank(uid, list(role_details), True)
+    await save_role_snapshot(uid, waves_char_rank)
+    return waves_char_rank
+
+
+async def get_role_snapshot_map(uid: str) -> Dict[int, WavesCharRank]:
+    waves_char_rank = await get_role_snapshot(uid)
+    if not waves_char_rank:
+        return {}
+    return {r.roleId: r for r in waves_char_rank}
@@ -3,55 +3,119 @@ import random
 import string
 import asyncio
 import inspect
-from typing import Any, Dict, List, TypeVar, Callable, Coroutine, overload
+from typing import Any, Dict, List, Tuple, TypeVar, Callable, Hashable, Optional, Coroutine, overload
 from functools import wraps
+from collections import OrderedDict
 
 import httpx
 
 from gsuid_core.subscribe import gs_subscribe
 
 
-def timed_async_cache(expiration, condition=lambda x: True):
+class AsyncCacheStats:
+    __slots__ = ("hits", "stale_hits", "misses", "evictions")
+
+    def __init__(self):
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {k: getattr(self, k) for k in self.__slots__}
+
+
+def _make_cache_key(args: tuple, kwargs: Dict[str, Any]) -> Hashable:
+    key = (args, tuple(sorted(kwargs.items()))) if kwargs else args
+    try:
+        hash(key)
+        return key
+    except TypeError:
+        return repr(key)
+
+
+def async_cache(
+    ttl: float,
+    condition: Callable[[Any], Any] = lambda x: True,
+    maxsize: int = 128,
+    stale_ttl: float = 0,
+    key: Optional[Callable[..., Hashable]] = None,
+):
+    """按参数缓存异步函数的结果
+
+    - 按参数计算key（类方法忽略 self/cls），LRU + TTL 淘汰，最多保留 maxsize 个结果
+    - 过期后 stale_ttl 秒内先返回旧值，后台刷新（stale-while-revalidate）
+    - 同一个key同时只执行一次，并发调用等待同一个结果
+    - condition 为假的结果不缓存；key 可自定义缓存键
+    - wrapper.cache_stats() 查看命中统计，wrapper.cache_clear() 清空
+    """
+
     def decorator(func):
-        cache = {}
-        locks = {}
+        cache: OrderedDict[Hashable, Tuple[Any, float]] = OrderedDict()
+        inflight: Dict[Tuple[int, Hashable], asyncio.Task] = {}
+        stats = AsyncCacheStats()
+
+        params = list(inspect.signature(func).parameters.keys())
+        is_cls_method = bool(params) and params[0] in ["self", "cls"]
+
+        def _store(cache_key: Hashable, value: Any):
+            if not condition(value):
+                return
+            cache[cache_key] = (value, time.time())
+            cache.move_to_end(cache_key)
+            while len(cache) > maxsize:
+                cache.popitem(last=False)
+                stats.evictions += 1
+
+        def _run(cache_key: Hashable, args: tuple, kwargs: Dict[str, Any]) -> asyncio.Task:
+            # 任务和事件循环绑定，不同事件循环各自执行
+            flight_key = (id(asyncio.get_running_loop()), cache_key)
+            task = inflight.get(flight_key)
+            if task is None:
+
+                async def _call():
+                    try:
+                        value = await func(*args, **kwargs)
+                        _store(cache_key, value)
+                        return value
+                    finally:
+                        inflight.pop(flight_key, None)
 
-        sig = inspect.signature(func)
-        params = list(sig.parameters.keys())
-        is_cls_method = params and params[0] in ["self", "cls"]
+                task = inflight[flight_key] = asyncio.ensure_future(_call())
+            return task
 
         @wraps(func)
-        async def wrapper(*args):
-            current_time = time.time()
-            if is_cls_method and args and hasattr(args[0], "__class__"):
-                cache_key = f"{args[0].__class__.__name__}.{func.__name__}"
+        async def wrapper(*args, **kwargs):
+            if key is not None:
+                cache_key = key(*args, **kwargs)
             else:
-                cache_key = func.__name__
-
-            # 为每个缓存键创建一个锁
-            if cache_key not in locks:
-                locks[cache_key] = asyncio.Lock()
-
-            # 检查缓存，如果有效则直接返回
-            if cache_key in cache:
-                value, timestamp = cache[cache_key]
-                if current_time - timestamp < expiration:
+                cache_key = _make_cache_key(args[1:] if is_cls_method else args, kwargs)
+
+            item = cache.get(cache_key)
+            if item is not None:
+                value, stored_at = item
+                age = time.time() - stored_at
+                if age < ttl:
+                    cache.move_to_end(cache_key)
+                    stats.hits += 1
                     return value
+                if age < ttl + stale_ttl:
+                    cache.move_to_end(cache_key)
+                    stats.stale_hits += 1
+                    # 后台刷新失败时保留旧值，下次再试
+                    task = _run(cache_key, args, kwargs)
+                    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+                    return value
+                del cache[cache_key]
 
-            # 获取锁以确保并发安全
-            async with locks[cache_key]:
-                # 双重检查，避免等待锁期间其他协程已经更新了缓存
-                if cache_key in cache:
-                    value, timestamp = cache[cache_key]
-                    if current_time - timestamp < expiration:
-                        return value
+            stats.misses += 1
+            return await asyncio.shield(_run(cache_key, args, kwargs))
 
-                # 执行原始函数
-                value = await func(*args)
-                if condition(value):
-                    cache[cache_key] = (value, current_time)
-                return value
+        def cache_clear():
+            cache.clear()
 
+        wrapper.cache_stats = stats.as_dict  # type: ignore[attr-defined]
+        wrapper.cache_clear = cache_clear  # type: ignore[attr-defined]
         return wrapper
 
     return decorator
@@ -119,8 +183,7 @@ def async_func_lock(
         return decorator(_func)
 
 
-# 使用示例
-@timed_async_cache(86400)
+@async_cache(86400)
 async def get_public_ip(host="127.127.127.127"):
     try:
         async with httpx.AsyncClient() as client:
@@ -203,8 +266,8 @@ filter_msg = [
 ]
 
 
-# 发送主人信息
-@timed_async_cache(300, lambda x: x)
+# 发送主人信息，5分钟内最多通知一次
+@async_cache(300, lambda x: x, key=lambda msg: "")
 async def send_master_info(msg: str):
     # 过滤
     for i in filter_msg:
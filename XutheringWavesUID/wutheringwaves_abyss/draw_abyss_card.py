@@ -4,7 +4,6 @@ from pathlib import Path
 from PIL import Image, ImageDraw
 
 from gsuid_core.models import Event
-from gsuid_core.utils.image.convert import convert_img
 
 from .period import get_tower_period_number
 from ..utils.hint import error_reply
@@ -24,6 +23,7 @@ from ..utils.error_reply import WAVES_CODE_102
 from ..utils.queues.const import QUEUE_ABYSS_RECORD
 from ..utils.queues.queues import push_item
 from ..utils.char_info_utils import get_all_roleid_detail_info
+from ..utils.render_executor import convert_img
 from ..wutheringwaves_config import PREFIX
 from ..utils.fonts.waves_fonts import (
     waves_font_18,
@@ -323,4 +323,4 @@ async def upload_abyss_record(
         }
     )
     # logger.info(f"上传深塔记录: {abyss_item.model_dump()}")
-    push_item(QUEUE_ABYSS_RECORD, abyss_item.model_dump())
+    await push_item(QUEUE_ABYSS_RECORD, abyss_item.model_dump())
@@ -5,7 +5,6 @@ from datetime import datetime, timezone, timedelta
 from PIL import Image, ImageDraw
 
 from gsuid_core.models import Event
-from gsuid_core.utils.image.convert import convert_img
 
 from ..utils.hint import error_reply
 from ..utils.image import (
@@ -21,6 +20,7 @@ from ..utils.imagetool import draw_pic, draw_pic_with_ring
 from ..utils.waves_api import waves_api
 from ..utils.error_reply import WAVES_CODE_102
 from ..utils.name_convert import char_name_to_char_id
+from ..utils.render_executor import convert_img
 from ..utils.fonts.waves_fonts import (
     waves_font_18,
     waves_font_20,
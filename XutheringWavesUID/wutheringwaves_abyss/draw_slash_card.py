@@ -8,7 +8,6 @@ from PIL import Image, ImageDraw
 
 from gsuid_core.logger import logger
 from gsuid_core.models import Event
-from gsuid_core.utils.image.convert import convert_img
 
 from .period import get_slash_period_number
 from ..utils.hint import error_reply
@@ -29,11 +28,13 @@ from ..utils.api.model import (
 from ..utils.api.wwapi import SlashDetailRequest
 from ..utils.imagetool import draw_pic, draw_pic_with_ring
 from ..utils.waves_api import waves_api
+from ..utils.rank_index import get_slash_rank_score, update_slash_rank_index
 from ..utils.error_reply import WAVES_CODE_102
 from ..utils.queues.const import QUEUE_SLASH_RECORD
 from ..utils.queues.queues import push_item
 from ..utils.ascension.char import get_char_model
 from ..utils.char_info_utils import get_all_roleid_detail_info
+from ..utils.render_executor import convert_img
 from ..utils.fonts.waves_fonts import (
     waves_font_18,
     waves_font_25,
@@ -348,12 +349,15 @@ async def save_slash_record(
         path = _dir / "slashData.json"
 
         slash_dict = slash_data.model_dump()
+        record_time = int(time.time())
         record_payload = {
-            "record_time": int(time.time()),
+            "record_time": record_time,
             "slash_data": slash_dict,
         }
         async with aiofiles.open(path, "w", encoding="utf-8") as file:
             await file.write(json.dumps(record_payload, ensure_ascii=False))
+
+        await update_slash_rank_index(uid, get_slash_rank_score(slash_data), record_time)
     except Exception as e:
         logger.warning(f"[保存无尽数据失败] uid={uid}, error={e}")
 
@@ -416,4 +420,4 @@ async def upload_slash_record(
         }
     )
     # logger.info(f"上传冥海记录: {slash_item.model_dump()}")
-    push_item(QUEUE_SLASH_RECORD, slash_item.model_dump())
+    await push_item(QUEUE_SLASH_RECORD, slash_item.model_dump())
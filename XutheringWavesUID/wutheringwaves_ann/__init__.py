@@ -10,6 +10,7 @@ from gsuid_core.subscribe import gs_subscribe
 
 from .ann_card import ann_list_card, ann_detail_card
 from ..utils.waves_api import waves_api
+from ..utils.card_cache import card_cache
 from ..wutheringwaves_config import WutheringWavesConfig
 
 sv_ann = SV("鸣潮公告")
@@ -23,7 +24,7 @@ ann_minute_check: int = WutheringWavesConfig.get_config("AnnMinuteCheck").data
 async def ann_(bot: Bot, ev: Event):
     ann_id = ev.text
     if not ann_id:
-        img = await ann_list_card()
+        img = await card_cache.get_or_render("ann_list", (), ann_list_card)
         return await bot.send(img)
 
     ann_id = ann_id.replace("#", "")
@@ -5,7 +5,6 @@ from datetime import datetime
 from PIL import Image, ImageOps, ImageDraw
 
 from gsuid_core.logger import logger
-from gsuid_core.utils.image.convert import convert_img
 from gsuid_core.utils.image.image_tools import (
     easy_paste,
     draw_text_by_line,
@@ -14,6 +13,7 @@ from gsuid_core.utils.image.image_tools import (
 
 from ..utils.image import add_footer, pic_download_from_url
 from ..utils.waves_api import waves_api
+from ..utils.render_executor import convert_img
 from ..wutheringwaves_config import PREFIX
 from ..utils.fonts.waves_fonts import (
     ww_font_18,
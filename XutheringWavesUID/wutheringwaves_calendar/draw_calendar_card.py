@@ -7,9 +7,9 @@ from PIL import Image, ImageDraw
 from PIL.ImageFile import ImageFile
 
 from gsuid_core.models import Event
-from gsuid_core.utils.image.convert import convert_img
 from gsuid_core.utils.image.image_tools import crop_center_img
 
+from ..utils.util import async_cache
 from ..utils.image import (
     SPECIAL_GOLD,
     add_footer,
@@ -20,6 +20,7 @@ from ..utils.image import (
 from .calendar_model import ImageItem, SpecialImages, VersionActivity
 from ..utils.waves_api import waves_api
 from ..utils.ascension.char import get_char_id
+from ..utils.render_executor import convert_img
 from ..utils.ascension.weapon import get_weapon_id
 from ..utils.fonts.waves_fonts import ww_font_20, ww_font_24, ww_font_30
 from ..utils.resource.RESOURCE_PATH import CALENDAR_PATH
@@ -419,15 +420,10 @@ def get_date_range(dateRange, now):
     return status, left, color
 
 
-cache = {}
-
-
+@async_cache(86400, lambda x: x is not None, maxsize=256)
 async def get_unsafe_entry_detail(entryId):
-    if entryId in cache:
-        return cache[entryId]
     item_detail = await waves_api.get_entry_detail(entryId)
     if item_detail["code"] != 200:
         return None
 
-    cache[entryId] = item_detail
     return item_detail
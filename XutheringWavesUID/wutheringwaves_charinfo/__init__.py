@@ -4,7 +4,6 @@ from gsuid_core.sv import SV
 from gsuid_core.bot import Bot
 from gsuid_core.logger import logger
 from gsuid_core.models import Event
-from gsuid_core.utils.image.convert import convert_img
 
 from ..utils.hint import error_reply
 from .upload_card import (
@@ -14,19 +13,25 @@ from .upload_card import (
     delete_all_custom_card,
     compress_all_custom_card,
 )
+from ..utils.image import has_random_image
 from ..utils.at_help import ruser_id, is_valid_at
-from .draw_char_card import draw_char_score_img, draw_char_detail_img
+from .draw_char_card import draw_char_score_img, draw_char_detail_img, parse_text_and_number
+from ..utils.card_cache import card_cache, get_dir_version, get_show_config_version
 from ..utils.error_reply import WAVES_CODE_103
 from ..utils.name_convert import char_name_to_char_id
+from ..utils.player_store import get_player_store, migrate_all_player_data
 from ..utils.char_info_utils import PATTERN
 from ..utils.database.models import WavesBind
+from ..utils.render_executor import convert_img
 from ..utils.resource.constant import SPECIAL_CHAR
+from ..utils.resource.RESOURCE_PATH import CUSTOM_CARD_PATH
 
 waves_upload_char = SV("waves上传面板图", priority=3, pm=1)
 waves_char_card_list = SV("waves面板图列表", priority=3, pm=1)
 waves_delete_char_card = SV("waves删除面板图", priority=3, pm=1)
 waves_delete_all_card = SV("waves删除全部面板图", priority=5, pm=1)
 waves_compress_card = SV("waves面板图压缩", priority=5, pm=1)
+waves_migrate_player_data = SV("waves迁移面板数据", priority=1, pm=1)
 waves_new_get_char_info = SV("waves新获取面板", priority=3)
 waves_new_get_one_char_info = SV("waves新获取单个角色面板", priority=3)
 waves_new_char_detail = SV("waves新角色面板", priority=4)
@@ -42,12 +47,32 @@ TYPE_MAP = {
 }
 
 
+def get_char_detail_version():
+    """面板图除数据外还取决于背景配置和上传的自定义面板图"""
+    return get_show_config_version(), get_dir_version(CUSTOM_CARD_PATH)
+
+
+def is_random_pile(char: str) -> bool:
+    """上传了多张面板图的角色每次随机选取立绘，不缓存"""
+    char_id = char_name_to_char_id(parse_text_and_number(char)[0])
+    if not char_id:
+        return False
+    return any(has_random_image(CUSTOM_CARD_PATH / i) for i in SPECIAL_CHAR.get(char_id, [char_id]))
+
+
+def clear_char_detail_cache(target_type: str):
+    if target_type == "card":
+        card_cache.clear_name("char_detail")
+
+
 @waves_upload_char.on_regex(rf"^上传(?P<char>{PATTERN})(?P<type>面板|面包|🍞|体力|背景)图$", block=True)
 async def upload_char_img(bot: Bot, ev: Event):
     char = ev.regex_dict.get("char")
     if not char:
         return
-    await upload_custom_card(bot, ev, char, target_type=TYPE_MAP.get(ev.regex_dict.get("type"), "card"))
+    target_type = TYPE_MAP.get(ev.regex_dict.get("type"), "card")
+    await upload_custom_card(bot, ev, char, target_type=target_type)
+    clear_char_detail_cache(target_type)
 
 
 @waves_char_card_list.on_regex(rf"^(?P<char>{PATTERN})(?P<type>面板|面包|🍞|体力|背景)图列表$", block=True)
@@ -66,7 +91,9 @@ async def delete_char_card(bot: Bot, ev: Event):
     hash_id = ev.regex_dict.get("hash_id")
     if not char or not hash_id:
         return
-    await delete_custom_card(bot, ev, char, hash_id, target_type=TYPE_MAP.get(ev.regex_dict.get("type"), "card"))
+    target_type = TYPE_MAP.get(ev.regex_dict.get("type"), "card")
+    await delete_custom_card(bot, ev, char, hash_id, target_type=target_type)
+    clear_char_detail_cache(target_type)
 
 
 @waves_delete_all_card.on_regex(rf"^删除全部(?P<char>{PATTERN})(?P<type>面板|面包|🍞|体力|背景)图$", block=True)
@@ -74,12 +101,22 @@ async def delete_all_char_card(bot: Bot, ev: Event):
     char = ev.regex_dict.get("char")
     if not char:
         return
-    await delete_all_custom_card(bot, ev, char, target_type=TYPE_MAP.get(ev.regex_dict.get("type"), "card"))
+    target_type = TYPE_MAP.get(ev.regex_dict.get("type"), "card")
+    await delete_all_custom_card(bot, ev, char, target_type=target_type)
+    clear_char_detail_cache(target_type)
 
 
 @waves_compress_card.on_fullmatch(("压缩面板图", "压缩面包图", "压缩🍞图", "压缩背景图", "压缩体力图"), block=True)
 async def compress_char_card(bot: Bot, ev: Event):
     await compress_all_custom_card(bot, ev)
+    clear_char_detail_cache("card")
+
+
+@waves_migrate_player_data.on_fullmatch("迁移面板数据", block=True)
+async def migrate_player_data(bot: Bot, ev: Event):
+    await bot.send("[鸣潮] 开始将rawData.json迁移至sqlite...")
+    count = await migrate_all_player_data()
+    await bot.send(f"[鸣潮] 面板数据迁移完成，共迁移{count}个用户\n请将【面板数据存储方式】设置为sqlite后生效")
 
 
 @waves_new_get_char_info.on_fullmatch(
@@ -159,7 +196,12 @@ async def send_char_detail_msg(bot: Bot, ev: Event):
     if not char:
         return
 
-    im = await draw_char_detail_img(ev, uid, char, user_id)
+    im = await card_cache.get_or_render(
+        "char_detail",
+        (ev.bot_id, user_id, uid, char, get_player_store().version(uid), get_char_detail_version()),
+        lambda: draw_char_detail_img(ev, uid, char, user_id),
+        cacheable=not is_random_pile(char),
+    )
     if isinstance(im, str) or isinstance(im, bytes):
         return await bot.send(im)
 
@@ -249,7 +291,21 @@ async def send_char_detail_msg2(bot: Bot, ev: Event):
         uid = await WavesBind.get_uid_by_game(user_id, ev.bot_id)
         if not uid:
             return await bot.send(error_reply(WAVES_CODE_103))
-        im = await draw_char_detail_img(ev, uid, char, user_id, waves_id, change_list_regex=change_list_regex)
+        im = await card_cache.get_or_render(
+            "char_detail",
+            (
+                ev.bot_id,
+                user_id,
+                uid,
+                char,
+                waves_id,
+                change_list_regex,
+                get_player_store().version(waves_id or uid),
+                get_char_detail_version(),
+            ),
+            lambda: draw_char_detail_img(ev, uid, char, user_id, waves_id, change_list_regex=change_list_regex),
+            cacheable=not is_random_pile(char),
+        )
         at_sender = False
         if isinstance(im, str) or isinstance(im, bytes):
             return await bot.send(im, at_sender)
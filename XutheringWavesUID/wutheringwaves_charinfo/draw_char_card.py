@@ -8,7 +8,6 @@ from PIL import Image, ImageDraw, ImageEnhance
 
 from gsuid_core.logger import logger
 from gsuid_core.models import Event
-from gsuid_core.utils.image.convert import convert_img
 from gsuid_core.utils.image.image_tools import get_qq_avatar, crop_center_img
 
 from ..utils import hint
@@ -54,12 +53,15 @@ from ..utils.calculate import (
 from ..utils.waves_api import waves_api
 from .role_info_change import change_role_detail
 from ..utils.error_reply import WAVES_CODE_102
+from ..utils.image_cache import open_image
 from ..utils.damage.utils import comma_separated_number
 from ..utils.name_convert import alias_to_char_name, char_name_to_char_id
 from ..utils.ascension.char import get_char_model
+from ..utils.api.http_client import http_client
 from ..utils.api.model_other import EnemyDetailData
 from ..utils.char_info_utils import get_all_roleid_detail_info
 from ..utils.damage.abstract import DamageRankRegister, DamageDetailRegister
+from ..utils.render_executor import convert_img, render_executor
 from ..wutheringwaves_config import PREFIX
 from ..utils.ascension.weapon import (
     WavesWeaponResult,
@@ -172,7 +174,7 @@ async def get_one_rank(item: OneRankRequest) -> Optional[OneRankResponse]:
     if not WavesToken:
         return
 
-    async with httpx.AsyncClient() as client:
+    async with http_client(ONE_RANK_URL) as client:
         try:
             res = await client.post(
                 ONE_RANK_URL,
@@ -211,11 +213,11 @@ async def ph_card_draw(
     char_name = role_detail.role.roleName
 
     phantom_temp = Image.new("RGBA", (1200, 1280 + ph_sum_value))
-    banner3 = Image.open(TEXT_PATH / "banner3.png")
+    banner3 = open_image(TEXT_PATH / "banner3.png")
     phantom_temp.alpha_composite(banner3, dest=(0, 0))
 
-    ph_0 = Image.open(TEXT_PATH / "ph_0.png")
-    ph_1 = Image.open(TEXT_PATH / "ph_1.png")
+    ph_0 = open_image(TEXT_PATH / "ph_0.png")
+    ph_1 = open_image(TEXT_PATH / "ph_1.png")
     #  phantom_sum_value = {}
     calc = WuWaCalc(role_detail, enemy_detail)
     phantom_score = 0  # 初始化声骸评分
@@ -234,14 +236,14 @@ async def ph_card_draw(
         for i, _phantom in enumerate(equipPhantomList):
             sh_temp = Image.new("RGBA", (350, 550))
             sh_temp_draw = ImageDraw.Draw(sh_temp)
-            sh_bg = Image.open(TEXT_PATH / "sh_bg.png")
+            sh_bg = open_image(TEXT_PATH / "sh_bg.png")
             sh_temp.alpha_composite(sh_bg, dest=(0, 0))
             if _phantom and _phantom.phantomProp:
                 props = _phantom.get_props()
                 _score, _bg = calc_phantom_score(role_detail.role.roleId, props, _phantom.cost, calc.calc_temp)
 
                 phantom_score += _score
-                sh_title = Image.open(TEXT_PATH / f"sh_title_{_bg}.png")
+                sh_title = open_image(TEXT_PATH / f"sh_title_{_bg}.png")
 
                 sh_temp.alpha_composite(sh_title, dest=(0, 0))
 
@@ -270,7 +272,7 @@ async def ph_card_draw(
                 sh_temp.alpha_composite(ph_score_img, (223, 58))
 
                 for index in range(0, _phantom.cost):
-                    promote_icon = Image.open(TEXT_PATH / "promote_icon.png")
+                    promote_icon = open_image(TEXT_PATH / "promote_icon.png")
                     promote_icon = promote_icon.resize((30, 30))
                     sh_temp.alpha_composite(promote_icon, dest=(128 + 30 * index, 90))
 
@@ -312,10 +314,10 @@ async def ph_card_draw(
         if phantom_score > 0:
             phantom_score = round(phantom_score, 2)
             _bg = get_total_score_bg(char_name, phantom_score, calc.calc_temp)
-            sh_score_bg_c = Image.open(TEXT_PATH / f"sh_score_bg_{_bg}.png")
+            sh_score_bg_c = open_image(TEXT_PATH / f"sh_score_bg_{_bg}.png")
             score_temp = Image.new("RGBA", sh_score_bg_c.size)
             score_temp.alpha_composite(sh_score_bg_c)
-            sh_score_c = Image.open(TEXT_PATH / f"sh_score_{_bg}.png")
+            sh_score_c = open_image(TEXT_PATH / f"sh_score_{_bg}.png")
             score_temp.alpha_composite(sh_score_c)
             score_temp_draw = ImageDraw.Draw(score_temp)
 
@@ -323,7 +325,7 @@ async def ph_card_draw(
             score_temp_draw.text((180, 380), f"{phantom_score:.2f}分", "white", waves_font_40, "mm")
             score_temp_draw.text((180, 440), "声骸评分", GREY, waves_font_40, "mm")
         else:
-            abs_bg = Image.open(TEXT_PATH / "abs.png")
+            abs_bg = open_image(TEXT_PATH / "abs.png")
             score_temp = Image.new("RGBA", abs_bg.size)
             score_temp.alpha_composite(abs_bg)
             score_temp_draw = ImageDraw.Draw(score_temp)
@@ -454,20 +456,20 @@ async def get_role_need(
 
 async def draw_fixed_img(img, avatar, account_info, role_detail):
     # 头像部分
-    avatar_ring = Image.open(TEXT_PATH / "avatar_ring.png")
+    avatar_ring = open_image(TEXT_PATH / "avatar_ring.png")
 
     img.paste(avatar, (45, 20), avatar)
     avatar_ring = avatar_ring.resize((180, 180))
     img.paste(avatar_ring, (55, 30), avatar_ring)
 
-    base_info_bg = Image.open(TEXT_PATH / "base_info_bg.png")
+    base_info_bg = open_image(TEXT_PATH / "base_info_bg.png")
     base_info_draw = ImageDraw.Draw(base_info_bg)
     base_info_draw.text((275, 120), f"{account_info.name[:7]}", "white", waves_font_30, "lm")
     base_info_draw.text((226, 173), f"特征码:  {account_info.id}", GOLD, waves_font_25, "lm")
     img.paste(base_info_bg, (35, -30), base_info_bg)
 
     if account_info.is_full:
-        title_bar = Image.open(TEXT_PATH / "title_bar.png")
+        title_bar = open_image(TEXT_PATH / "title_bar.png")
         title_bar_draw = ImageDraw.Draw(title_bar)
         title_bar_draw.text((510, 125), "账号等级", GREY, waves_font_26, "mm")
         title_bar_draw.text((510, 78), f"Lv.{account_info.level}", "white", waves_font_42, "mm")
@@ -481,8 +483,8 @@ async def draw_fixed_img(img, avatar, account_info, role_detail):
 
     # 左侧pile部分
     is_custom, role_pile = await get_role_pile(role_detail.role.roleId, True)
-    char_mask = Image.open(TEXT_PATH / "char_mask.png")
-    char_fg = Image.open(TEXT_PATH / "char_fg.png")
+    char_mask = open_image(TEXT_PATH / "char_mask.png")
+    char_fg = open_image(TEXT_PATH / "char_fg.png")
 
     role_attribute = await get_attribute(role_detail.role.attributeName)
     role_attribute = role_attribute.resize((50, 50)).convert("RGBA")
@@ -507,7 +509,10 @@ async def draw_fixed_img(img, avatar, account_info, role_detail):
 
     role_pile_image = Image.new("RGBA", (560, 1000))
 
-    role_pile = resize_and_center_image(role_pile, is_custom=is_custom)
+    if is_custom:
+        role_pile = await render_executor.run(
+            "char_pile", resize_and_center_image, role_pile, (560, 1000), (255, 255, 255, 0), True
+        )
     role_pile_image.paste(
         role_pile,
         ((560 - role_pile.size[0]) // 2, (1000 - role_pile.size[1]) // 2),
@@ -760,11 +765,11 @@ async def draw_char_detail_img(
     right_image_temp = Image.new("RGBA", (600, 1100))
 
     # 武器banner
-    banner2 = Image.open(TEXT_PATH / "banner2.png")
+    banner2 = open_image(TEXT_PATH / "banner2.png")
     right_image_temp.alpha_composite(banner2, dest=(0, 550))
 
     # 右侧属性-武器
-    weapon_bg = Image.open(TEXT_PATH / "weapon_bg.png")
+    weapon_bg = open_image(TEXT_PATH / "weapon_bg.png")
     weapon_bg_temp = Image.new("RGBA", weapon_bg.size)
     weapon_bg_temp.alpha_composite(weapon_bg, dest=(0, 0))
 
@@ -788,7 +793,7 @@ async def draw_char_detail_img(
 
     weapon_breach = get_breach(weaponData.breach, weaponData.level)
     for i in range(0, weapon_breach):  # type: ignore
-        promote_icon = Image.open(TEXT_PATH / "promote_icon.png")
+        promote_icon = open_image(TEXT_PATH / "promote_icon.png")
         weapon_bg_temp.alpha_composite(promote_icon, dest=(200 + 40 * i, 100))
 
     weapon_bg_temp.alpha_composite(weapon_icon_bg, dest=(45, 0))
@@ -817,7 +822,7 @@ async def draw_char_detail_img(
 
     shuxing_color = WAVES_SHUXING_MAP[role_detail.role.attributeName]  # type: ignore
     for i, _mz in enumerate(role_detail.chainList):
-        mz_bg = Image.open(TEXT_PATH / "mz_bg.png")
+        mz_bg = open_image(TEXT_PATH / "mz_bg.png")
         mz_bg_temp = Image.new("RGBA", mz_bg.size)
         mz_bg_temp_draw = ImageDraw.Draw(mz_bg_temp)
         chain = await get_chain_img(role_detail.role.roleId, _mz.order, _mz.iconUrl)  # type: ignore
@@ -916,9 +921,9 @@ async def draw_char_detail_img(
                 dest=(0, 2600 + ph_sum_value + jineng_len + (dindex + 1) * 60),
             )
 
-    banner1 = Image.open(TEXT_PATH / "banner4.png")
+    banner1 = open_image(TEXT_PATH / "banner4.png")
     right_image_temp.alpha_composite(banner1, dest=(0, 0))
-    sh_bg = Image.open(TEXT_PATH / "prop_bg.png")
+    sh_bg = open_image(TEXT_PATH / "prop_bg.png")
     sh_bg_draw = ImageDraw.Draw(sh_bg)
 
     shuxing = f"{role_detail.role.attributeName}伤害加成"
@@ -943,8 +948,8 @@ async def draw_char_detail_img(
     img.paste(right_image_temp, (570, 200), right_image_temp)
 
     # 技能
-    skill_bar = Image.open(TEXT_PATH / "skill_bar.png")
-    skill_bg_1 = Image.open(TEXT_PATH / "skill_bg.png")
+    skill_bar = open_image(TEXT_PATH / "skill_bar.png")
+    skill_bg_1 = open_image(TEXT_PATH / "skill_bg.png")
 
     temp_i = 0
     for _, _skill in enumerate(role_detail.get_skill_list()):
@@ -1013,8 +1018,8 @@ async def draw_char_score_img(ev: Event, uid: str, char: str, user_id: str, wave
     right_image_temp = Image.new("RGBA", (600, 1100))
     introduce_temp = Image.new("RGBA", (1500, 880), (0, 0, 0, 0))
 
-    ph_0 = Image.open(TEXT_PATH / "ph_0.png")
-    ph_1 = Image.open(TEXT_PATH / "ph_1.png")
+    ph_0 = open_image(TEXT_PATH / "ph_0.png")
+    ph_1 = open_image(TEXT_PATH / "ph_1.png")
     # phantom_sum_value = {}
     calc: WuWaCalc = WuWaCalc(role_detail)
     if role_detail.phantomData and role_detail.phantomData.equipPhantomList:
@@ -1032,14 +1037,14 @@ async def draw_char_score_img(ev: Event, uid: str, char: str, user_id: str, wave
         for i, _phantom in enumerate(equipPhantomList):
             sh_temp = Image.new("RGBA", (600, 1100))
             sh_temp_draw = ImageDraw.Draw(sh_temp)
-            sh_bg = Image.open(TEXT_PATH / "sh_bg.png")
+            sh_bg = open_image(TEXT_PATH / "sh_bg.png")
             sh_temp.alpha_composite(sh_bg, dest=(0, 0))
             if _phantom and _phantom.phantomProp:
                 props = _phantom.get_props()
                 _score, _bg = calc_phantom_score(char_id, props, _phantom.cost, calc.calc_temp)
 
                 phantom_score += _score
-                sh_title = Image.open(TEXT_PATH / f"sh_title_{_bg}.png")
+                sh_title = open_image(TEXT_PATH / f"sh_title_{_bg}.png")
 
                 sh_temp.alpha_composite(sh_title, dest=(0, 0))
 
@@ -1068,7 +1073,7 @@ async def draw_char_score_img(ev: Event, uid: str, char: str, user_id: str, wave
                 sh_temp.alpha_composite(ph_score_img, (228, 58))
 
                 for index in range(0, _phantom.cost):
-                    promote_icon = Image.open(TEXT_PATH / "promote_icon.png")
+                    promote_icon = open_image(TEXT_PATH / "promote_icon.png")
                     promote_icon = promote_icon.resize((30, 30))
                     sh_temp.alpha_composite(promote_icon, dest=(128 + 30 * index, 90))
 
@@ -1131,10 +1136,10 @@ async def draw_char_score_img(ev: Event, uid: str, char: str, user_id: str, wave
         if phantom_score > 0:
             phantom_score = round(phantom_score, 2)
             _bg = get_total_score_bg(char_name, phantom_score, calc.calc_temp)
-            sh_score_bg_c = Image.open(TEXT_PATH / f"sh_score_bg_{_bg}.png")
+            sh_score_bg_c = open_image(TEXT_PATH / f"sh_score_bg_{_bg}.png")
             score_temp = Image.new("RGBA", sh_score_bg_c.size)
             score_temp.alpha_composite(sh_score_bg_c)
-            sh_score_c = Image.open(TEXT_PATH / f"sh_score_{_bg}.png")
+            sh_score_c = open_image(TEXT_PATH / f"sh_score_{_bg}.png")
             score_temp.alpha_composite(sh_score_c)
             score_temp_draw = ImageDraw.Draw(score_temp)
 
@@ -1142,7 +1147,7 @@ async def draw_char_score_img(ev: Event, uid: str, char: str, user_id: str, wave
             score_temp_draw.text((180, 380), f"{phantom_score:.2f}分", "white", waves_font_40, "mm")
             score_temp_draw.text((180, 440), "声骸评分", GREY, waves_font_40, "mm")
         else:
-            abs_bg = Image.open(TEXT_PATH / "abs.png")
+            abs_bg = open_image(TEXT_PATH / "abs.png")
             score_temp = Image.new("RGBA", abs_bg.size)
             score_temp.alpha_composite(abs_bg)
             score_temp_draw = ImageDraw.Draw(score_temp)
@@ -1221,7 +1226,7 @@ async def draw_char_score_img(ev: Event, uid: str, char: str, user_id: str, wave
 
         await draw_weight(introduce_temp, role_detail.role.roleName, weight_list_temp, calc.calc_temp)
 
-    char_bg = Image.open(TEXT_PATH / "char.png")
+    char_bg = open_image(TEXT_PATH / "char.png")
     img.paste(char_bg, (1100, 220), char_bg)
     img.paste(phantom_temp, (0, 1050), phantom_temp)
     img.paste(right_image_temp, (605, 225), right_image_temp)
@@ -1295,7 +1300,7 @@ async def draw_pic_with_ring(ev: Event, is_force_avatar=False, force_resource_id
     else:
         pic = await get_qq_avatar(ev.user_id)
 
-    mask_pic = Image.open(TEXT_PATH / "avatar_mask.png")
+    mask_pic = open_image(TEXT_PATH / "avatar_mask.png")
     img = Image.new("RGBA", (180, 180))
     mask = mask_pic.resize((160, 160))
     resize_pic = crop_center_img(pic, 160, 160)
@@ -1307,7 +1312,7 @@ async def draw_pic_with_ring(ev: Event, is_force_avatar=False, force_resource_id
 async def draw_char_with_ring(char_id):
     pic = await get_square_avatar(char_id)
 
-    mask_pic = Image.open(TEXT_PATH / "avatar_mask.png")
+    mask_pic = open_image(TEXT_PATH / "avatar_mask.png")
     img = Image.new("RGBA", (180, 180))
     mask = mask_pic.resize((160, 160))
     resize_pic = crop_center_img(pic, 160, 160)
@@ -1320,7 +1325,7 @@ def get_weapon_icon_bg(star: int = 3) -> Image.Image:
     if star < 3:
         star = 3
     bg_path = TEXT_PATH / f"weapon_icon_bg_{star}.png"
-    bg_img = Image.open(bg_path)
+    bg_img = open_image(bg_path)
     return bg_img
 
 
@@ -1400,7 +1405,7 @@ async def get_card_bg(
     if ShowConfig.get_config("CardBg").data:
         bg_path = Path(ShowConfig.get_config("CardBgPath").data)
         if bg_path.exists():
-            img = Image.open(bg_path).convert("RGBA")
+            img = open_image(bg_path, "RGBA")
             img = crop_center_img(img, w, h)
 
     if not img:
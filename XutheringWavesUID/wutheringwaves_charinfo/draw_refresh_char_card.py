@@ -6,7 +6,6 @@ from PIL import Image, ImageDraw, ImageFilter, ImageEnhance
 
 from gsuid_core.bot import Bot
 from gsuid_core.models import Event
-from gsuid_core.utils.image.convert import convert_img
 from gsuid_core.utils.image.image_tools import crop_center_img
 
 from ..utils.hint import error_reply
@@ -28,9 +27,11 @@ from ..utils.api.model import RoleDetailData, AccountBaseInfo
 from ..utils.imagetool import draw_pic_with_ring
 from ..utils.waves_api import waves_api
 from ..utils.error_reply import WAVES_CODE_102
+from ..utils.role_snapshot import get_role_snapshot_map
 from ..utils.expression_ctx import WavesCharRank, get_waves_char_rank
 from ..utils.char_info_utils import get_all_role_detail_info_list
 from ..utils.database.models import WavesBind
+from ..utils.render_executor import convert_img
 from ..wutheringwaves_config import PREFIX, WutheringWavesConfig
 from ..utils.fonts.waves_fonts import (
     waves_font_25,
@@ -235,7 +236,12 @@ async def draw_refresh_char_detail_img(
     )
     img.alpha_composite(info_block, (500, 400))
 
-    waves_char_rank = await get_waves_char_rank(uid, role_detail_list)
+    # 刷新时已经保存了评分快照
+    snapshot = await get_role_snapshot_map(uid)
+    if all(r.role.roleId in snapshot for r in role_detail_list):
+        waves_char_rank = [snapshot[r.role.roleId] for r in role_detail_list]
+    else:
+        waves_char_rank = await get_waves_char_rank(uid, role_detail_list)
 
     map_update = []
     map_unchanged = []
@@ -40,6 +40,9 @@ async def get_remote_role_detail_info(find_char_id: List[str], waves_id, ck) ->
             (role for role in gen_temp if str(role.role.roleId) in find_char_id),
             None,
         )
+        if role_detail_info:
+            # 缓存中的对象是共享的
+            role_detail_info = role_detail_info.model_copy(deep=True)
 
     if not role_detail_info:
         for char_id in find_char_id:
@@ -531,6 +534,8 @@ async def change_role_detail(
 ) -> tuple[RoleDetailData, str]:
     parser: ChangeParser = ChangeParser(change_list_regex)
     parserResult: ReplaceResult = parser.rr
+    # 缓存中的对象是共享的，修改前先复制
+    role_detail = role_detail.model_copy(deep=True)
     if parserResult.role.skill:
         skill_list = role_detail.get_skill_list()
         for i, level in zip(skill_list[:5], parserResult.role.skill):
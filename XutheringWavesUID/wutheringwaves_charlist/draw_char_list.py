@@ -4,7 +4,6 @@ from pathlib import Path
 from PIL import Image, ImageDraw
 
 from gsuid_core.models import Event
-from gsuid_core.utils.image.convert import convert_img
 from gsuid_core.utils.image.image_tools import crop_center_img
 
 from ..utils.hint import error_reply
@@ -25,9 +24,11 @@ from ..utils.image import (
 from ..utils.api.model import WeaponData, RoleDetailData, AccountBaseInfo
 from ..utils.waves_api import waves_api
 from ..utils.error_reply import WAVES_CODE_102
+from ..utils.role_snapshot import get_role_snapshot
 from ..utils.ascension.char import char_id_data, ensure_data_loaded
 from ..utils.expression_ctx import WavesCharRank, get_waves_char_rank
 from ..utils.char_info_utils import get_all_roleid_detail_info_int
+from ..utils.render_executor import convert_img
 from ..wutheringwaves_config import WutheringWavesConfig
 from ..utils.ascension.weapon import get_breach
 from ..utils.fonts.waves_fonts import (
@@ -117,7 +118,9 @@ async def draw_char_list_img(
     if not all_role_detail:
         return error_reply(code=-111, msg="练度获取失败，请先刷新角色面板")
 
-    waves_char_rank = await get_waves_char_rank(uid, all_role_detail)
+    waves_char_rank = await get_role_snapshot(uid)
+    if not waves_char_rank:
+        waves_char_rank = await get_waves_char_rank(uid, all_role_detail)
     waves_char_rank.sort(key=lambda i: (i.score, i.starLevel, i.level, i.chain, i.roleId), reverse=True)
 
     avatar_h = 230
@@ -3,13 +3,13 @@ import json
 import time
 from datetime import datetime
 
-import httpx
-
 from gsuid_core.sv import SV
 from gsuid_core.bot import Bot
 from gsuid_core.logger import logger
 from gsuid_core.models import Event
 
+from ..utils.api.http_client import http_client
+
 sv_waves_code = SV("鸣潮兑换码")
 
 invalid_code_list = ("MINGCHAO",)
@@ -45,7 +45,7 @@ async def get_code_list():
         time_string = f"{now.year - 1900}{now.month - 1}{now.day}{now.hour}{now.minute}"
         now_time = int(time.time() * 1000)
         new_url = url.format(time_string, now_time)
-        async with httpx.AsyncClient(timeout=None) as client:
+        async with http_client(new_url) as client:
             res = await client.get(new_url, timeout=10)
             json_data = res.text.split("=", 1)[1].strip().rstrip(";")
             logger.debug(f"[获取兑换码] url:{new_url}, codeList:{json_data}")
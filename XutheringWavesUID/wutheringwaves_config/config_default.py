@@ -186,4 +186,115 @@ CONFIG_DEFAULT: Dict[str, GSC] = {
         "启用后，所有API数据（基础信息、角色信息、深渊等）都会被缓存到本地用于网络故障时兜底，每1000用户大约额外占用1GB空间。禁用则每次都从API获取最新数据",
         False,
     ),
+    "PlayerDataStore": GsStrConfig(
+        "面板数据存储方式",
+        "json为players/<uid>/rawData.json整文件存储；sqlite按(uid, 角色)分行存储，刷新单个角色只写一行，首次读取时自动从rawData.json迁移",
+        "json",
+        options=["json", "sqlite"],
+    ),
+    "RoleDetailCacheSize": GsIntConfig(
+        "面板数据内存缓存大小（单位MB）",
+        "缓存解析后的角色面板数据，按原始数据大小计算，0为关闭",
+        64,
+        1024,
+    ),
+    "ImageCacheSize": GsIntConfig(
+        "图片资源内存缓存大小（单位MB）",
+        "缓存解码后的静态图片资源，按像素数据大小计算，0为关闭",
+        128,
+        2048,
+    ),
+    "RenderWorkers": GsIntConfig(
+        "图片渲染工作者数量",
+        "背景毛玻璃、自定义立绘缩放和图片编码放到后台线程/进程中执行，避免阻塞其他命令，0为在主线程直接执行",
+        2,
+        32,
+    ),
+    "RenderUseProcess": GsBoolConfig(
+        "图片渲染使用进程池",
+        "开启后使用进程池代替线程池渲染图片（修改后立即生效）",
+        False,
+    ),
+    "CardCacheSize": GsIntConfig(
+        "卡片缓存大小（单位MB）",
+        "缓存渲染好的卡片图片，相同输入直接返回，内存和磁盘分别按此大小限制，0为关闭",
+        64,
+        1024,
+    ),
+    "CardCacheTTL": GsIntConfig(
+        "卡片缓存过期时间（单位秒）",
+        "面板、排行、公告等动态卡片的缓存时间，wiki、深塔等静态卡片在资源更新时失效，0为不缓存动态卡片",
+        60,
+        3600,
+    ),
+    "HttpHostConcurrency": GsIntConfig(
+        "外部接口单host并发数",
+        "排行、上传、持有率等非库街区接口共用长连接，每个host最多同时使用的连接数，超出的请求排队等待",
+        8,
+        64,
+    ),
+    "AccountContextTTL": GsIntConfig(
+        "token校验缓存时间（单位秒）",
+        "token校验通过后在此时间内的命令跳过重复校验，0为每次都校验",
+        60,
+        3600,
+    ),
+    "KuroQPS": GsIntConfig(
+        "库街区请求每秒上限",
+        "所有账号共享的库街区请求速率，超出时排队等待，0为不限制",
+        0,
+        200,
+    ),
+    "KuroAccountQPS": GsIntConfig(
+        "库街区单账号请求每秒上限",
+        "同一特征码/token每秒最多发出的请求数（包括抽卡记录的各卡池并发请求），超出时排队等待，0为不限制",
+        0,
+        50,
+    ),
+    "KuroBreakerCooldown": GsIntConfig(
+        "库街区熔断冷却时间（单位秒）",
+        "连续遇到环境风险(270)或请求失败后暂停请求库街区的时间，期间直接返回上次的错误，0为关闭熔断",
+        0,
+        3600,
+    ),
+    "KuroCoalesceTTL": GsIntConfig(
+        "库街区只读接口结果复用时间（单位秒）",
+        "同一请求的并发调用总是合并为一次；开启后面板、深塔等只读接口的结果在此时间内直接复用，0为只合并并发请求",
+        0,
+        60,
+    ),
+    "RefreshIncremental": GsBoolConfig(
+        "增量刷新面板",
+        "刷新全部面板时，等级、突破、共鸣链都没变化且在有效期内获取过详情的角色直接沿用本地数据（只换了声骸/武器/技能的角色会在有效期后才更新，单独刷新某个角色不受影响）",
+        False,
+    ),
+    "RefreshIncrementalMaxAge": GsIntConfig(
+        "增量刷新有效期（单位小时）",
+        "角色详情超过该时间后，刷新全部面板时一定会重新获取",
+        24,
+        720,
+    ),
+    "UploadBatchSize": GsIntConfig(
+        "上传队列每批数量",
+        "上传队列每次从磁盘取出并上传的数据条数",
+        20,
+        200,
+    ),
+    "UploadMaxInflight": GsIntConfig(
+        "上传队列最大并发",
+        "上传队列同时进行中的上传请求数",
+        4,
+        32,
+    ),
+    "UploadQueueMaxSize": GsIntConfig(
+        "上传队列最大积压",
+        "上传队列积压超过该数量时丢弃最旧的数据，0为不限制",
+        5000,
+        100000,
+    ),
+    "GachaExportGzip": GsBoolConfig(
+        "导出抽卡记录使用gzip压缩",
+        "导出的抽卡记录为 .json.gz 文件，体积更小，本插件可以直接导入，其他工具可能需要先解压",
+        False,
+    ),
 }
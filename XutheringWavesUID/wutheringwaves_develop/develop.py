@@ -5,7 +5,6 @@ from pathlib import Path
 from PIL import Image, ImageDraw
 
 from gsuid_core.models import Event
-from gsuid_core.utils.image.convert import convert_img
 
 from ..utils.hint import error_reply
 from ..utils.image import (
@@ -36,6 +35,7 @@ from ..utils.name_convert import (
 )
 from ..utils.char_info_utils import get_all_role_detail_info_list
 from ..utils.database.models import WavesBind
+from ..utils.render_executor import convert_img
 from ..utils.fonts.waves_fonts import (
     waves_font_20,
     waves_font_32,
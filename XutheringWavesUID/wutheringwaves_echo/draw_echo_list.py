@@ -5,7 +5,6 @@ from PIL import Image, ImageDraw
 from pydantic import BaseModel
 
 from gsuid_core.models import Event
-from gsuid_core.utils.image.convert import convert_img
 
 from ..utils import hint
 from ..utils.calc import WuWaCalc
@@ -26,11 +25,14 @@ from ..utils.api.model import (
     RoleDetailData,
     AccountBaseInfo,
 )
-from ..utils.calculate import get_calc_map, get_valid_color, calc_phantom_score
+from ..utils.calculate import get_calc_map, get_valid_color
 from ..utils.imagetool import draw_pic_with_ring
 from ..utils.waves_api import waves_api
 from ..utils.error_reply import WAVES_CODE_102
+from ..utils.image_cache import open_image
+from ..utils.role_snapshot import get_role_snapshot_map
 from ..utils.char_info_utils import get_all_role_detail_info
+from ..utils.render_executor import convert_img
 from ..wutheringwaves_config import PREFIX
 from ..utils.fonts.waves_fonts import (
     waves_font_24,
@@ -72,62 +74,31 @@ async def get_draw_list(ev: Event, uid: str, user_id: str, page: int = 1) -> Uni
     if not all_role_detail:
         return f"[鸣潮] 未找到角色信息, 请先使用[{PREFIX}刷新面板]进行刷新!"
 
-    waves_echo_rank = []
+    # 声骸评分取自刷新时保存的快照，只为当前页的声骸计算词条颜色
+    snapshot = await get_role_snapshot_map(uid)
+    echo_scores = []
     for char_name, role_detail in all_role_detail.items():
         if not role_detail.phantomData:
             continue
         if not role_detail.phantomData.equipPhantomList:
             continue
+        char_rank = snapshot.get(role_detail.role.roleId)
+        if not char_rank:
+            continue
         equipPhantomList = role_detail.phantomData.equipPhantomList
-
-        calc: WuWaCalc = WuWaCalc(role_detail)
-        calc.phantom_pre = calc.prepare_phantom()
-        calc.phantom_card = calc.enhance_summation_phantom_value(calc.phantom_pre)
-        calc.calc_temp = get_calc_map(
-            calc.phantom_card,
-            role_detail.role.roleName,
-            role_detail.role.roleId,
-        )
-
-        for i, _phantom in enumerate(equipPhantomList):  # type: ignore
-            if not _phantom:
-                continue
-            if not _phantom.phantomProp:
+        for _phantom, phantom_score in zip(equipPhantomList, char_rank.phantom_scores):
+            if not _phantom or not _phantom.phantomProp or not phantom_score:
                 continue
-            _phantom: EquipPhantom
-            props = _phantom.get_props()
-            _score, _bg = calc_phantom_score(role_detail.role.roleId, props, _phantom.cost, calc.calc_temp)
-            name_colors = []
-            num_colors = []
-            for index, _prop in enumerate(props):
-                name_color = "white"
-                num_color = "white"
-                if index > 1:
-                    name_color, num_color = get_valid_color(_prop.attributeName, _prop.attributeValue, calc.calc_temp)
-                name_colors.append(name_color)
-                num_colors.append(num_color)
-
-            wcr = WavesEchoRank(
-                **{
-                    "roleId": role_detail.role.roleId,
-                    "roleName": role_detail.role.roleName,
-                    "score": _score,
-                    "score_bg": _bg,
-                    "props": props,
-                    "name_colors": name_colors,
-                    "num_colors": num_colors,
-                    "phantom": _phantom,
-                }
-            )
-            waves_echo_rank.append(wcr)
+            _score, _bg = phantom_score
+            echo_scores.append((_score, _bg, role_detail, _phantom))
 
-    if not waves_echo_rank:
+    if not echo_scores:
         return "[鸣潮] 未找到角色的声骸评分! 请检查角色声骸是否在库街区正确显示"
 
-    waves_echo_rank.sort(key=lambda i: (i.score, i.roleId), reverse=True)
+    echo_scores.sort(key=lambda i: (i[0], i[2].role.roleId), reverse=True)
 
     page_size = 20
-    total_count = len(waves_echo_rank)
+    total_count = len(echo_scores)
     max_page_by_total = (total_count + page_size - 1) // page_size
     max_page = max(1, min(5, max_page_by_total))
     if page > max_page:
@@ -136,7 +107,46 @@ async def get_draw_list(ev: Event, uid: str, user_id: str, page: int = 1) -> Uni
         page = 1
     start_index = (page - 1) * page_size
     end_index = min(start_index + page_size, total_count)
-    waves_echo_rank_page = waves_echo_rank[start_index:end_index]
+
+    calc_temps: Dict[int, Dict] = {}
+    waves_echo_rank_page = []
+    for _score, _bg, role_detail, _phantom in echo_scores[start_index:end_index]:
+        role_id = role_detail.role.roleId
+        if role_id not in calc_temps:
+            calc: WuWaCalc = WuWaCalc(role_detail)
+            calc.phantom_pre = calc.prepare_phantom()
+            calc.phantom_card = calc.enhance_summation_phantom_value(calc.phantom_pre)
+            calc_temps[role_id] = get_calc_map(
+                calc.phantom_card,
+                role_detail.role.roleName,
+                role_id,
+            )
+        calc_temp = calc_temps[role_id]
+
+        props = _phantom.get_props()
+        name_colors = []
+        num_colors = []
+        for index, _prop in enumerate(props):
+            name_color = "white"
+            num_color = "white"
+            if index > 1:
+                name_color, num_color = get_valid_color(_prop.attributeName, _prop.attributeValue, calc_temp)
+            name_colors.append(name_color)
+            num_colors.append(num_color)
+
+        wcr = WavesEchoRank(
+            **{
+                "roleId": role_id,
+                "roleName": role_detail.role.roleName,
+                "score": _score,
+                "score_bg": _bg,
+                "props": props,
+                "name_colors": name_colors,
+                "num_colors": num_colors,
+                "phantom": _phantom,
+            }
+        )
+        waves_echo_rank_page.append(wcr)
 
     # img = get_waves_bg(1200, 2650, 'bg3')
     img = get_waves_bg(1600, 3230, "bg3")
@@ -147,7 +157,7 @@ async def get_draw_list(ev: Event, uid: str, user_id: str, page: int = 1) -> Uni
     img.paste(avatar, (45, 20), avatar)
     img.paste(avatar_ring, (55, 30), avatar_ring)
 
-    base_info_bg = Image.open(TEXT_PATH / "base_info_bg.png")
+    base_info_bg = open_image(TEXT_PATH / "base_info_bg.png")
     base_info_draw = ImageDraw.Draw(base_info_bg)
     base_info_draw.text((275, 120), f"{account_info.name[:7]}", "white", waves_font_30, "lm")
     base_info_draw.text((226, 173), f"特征码:  {account_info.id}", GOLD, waves_font_25, "lm")
@@ -163,7 +173,7 @@ async def get_draw_list(ev: Event, uid: str, user_id: str, page: int = 1) -> Uni
         )
 
     if account_info.is_full:
-        title_bar = Image.open(TEXT_PATH / "title_bar.png")
+        title_bar = open_image(TEXT_PATH / "title_bar.png")
         title_bar_draw = ImageDraw.Draw(title_bar)
         title_bar_draw.text((510, 125), "账号等级", GREY, waves_font_26, "mm")
         title_bar_draw.text((510, 78), f"Lv.{account_info.level}", "white", waves_font_42, "mm")
@@ -175,9 +185,9 @@ async def get_draw_list(ev: Event, uid: str, user_id: str, page: int = 1) -> Uni
         title_bar.alpha_composite(logo_img, dest=(780, 65))
         img.paste(title_bar, (200, 15), title_bar)
 
-    _sh_bg = Image.open(TEXT_PATH / "sh_bg.png")
+    _sh_bg = open_image(TEXT_PATH / "sh_bg.png")
 
-    promote_icon = Image.open(TEXT_PATH / "promote_icon.png")
+    promote_icon = open_image(TEXT_PATH / "promote_icon.png")
     promote_icon = promote_icon.resize((30, 30))
     for index, _echo in enumerate(waves_echo_rank_page):
         sh_bg = _sh_bg.copy()
@@ -186,7 +196,7 @@ async def get_draw_list(ev: Event, uid: str, user_id: str, page: int = 1) -> Uni
         sh_temp_draw = ImageDraw.Draw(sh_temp)
 
         sh_temp.alpha_composite(sh_bg, dest=(0, head_high))
-        sh_title = Image.open(TEXT_PATH / f"sh_title_{_echo.score_bg}.png")
+        sh_title = open_image(TEXT_PATH / f"sh_title_{_echo.score_bg}.png")
         sh_temp.alpha_composite(sh_title, dest=(0, head_high))
 
         # 角色头像
@@ -260,7 +270,7 @@ async def draw_pic(roleId):
     pic_temp = Image.new("RGBA", pic.size)
     pic_temp.paste(pic.resize((160, 160)), (10, 10))
 
-    mask_pic = Image.open(TEXT_PATH / "avatar_mask.png")
+    mask_pic = open_image(TEXT_PATH / "avatar_mask.png")
     mask_pic_temp = Image.new("RGBA", mask_pic.size)
     mask_pic_temp.paste(mask_pic, (-20, -45), mask_pic)
 
@@ -6,7 +6,6 @@ from PIL import Image, ImageDraw
 
 from gsuid_core.models import Event
 from gsuid_core.utils.image.utils import sget
-from gsuid_core.utils.image.convert import convert_img
 
 from ..utils import hint
 from ..utils.image import (
@@ -34,6 +33,7 @@ from ..utils.api.model import (
 from ..utils.imagetool import draw_pic_with_ring
 from ..utils.waves_api import waves_api
 from ..utils.error_reply import WAVES_CODE_102
+from ..utils.render_executor import convert_img
 from ..utils.fonts.waves_fonts import (
     waves_font_24,
     waves_font_25,
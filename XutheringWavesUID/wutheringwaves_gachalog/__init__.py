@@ -1,7 +1,6 @@
 import re
 import json
 import time
-import shutil
 import asyncio
 from typing import Any, List
 from datetime import datetime
@@ -12,15 +11,17 @@ from gsuid_core.models import Event
 from gsuid_core.segment import MessageSegment
 from gsuid_core.data_store import get_res_path
 
+from .gacha_store import GACHA_STORE_DIR, GachaStore
 from ..utils.cache import TimedCache
 from ..utils.button import WavesButton
 from .gacha_handler import fetch_mcgf_data, merge_gacha_data
 from .get_gachalogs import save_gachalogs, export_gachalogs, import_gachalogs
 from .draw_gachalogs import draw_card, draw_card_help
 from ..utils.waves_api import waves_api
+from ..utils.rank_index import update_gacha_rank_index
 from ..utils.error_reply import ERROR_CODE, WAVES_CODE_102, WAVES_CODE_103
 from ..utils.database.models import WavesBind
-from ..wutheringwaves_config import PREFIX
+from ..wutheringwaves_config import PREFIX, WutheringWavesConfig
 from ..utils.resource.RESOURCE_PATH import PLAYER_PATH
 from ..wutheringwaves_rank.draw_gacha_rank_card import draw_gacha_rank_card
 
@@ -173,6 +174,16 @@ async def send_gacha_log_help(bot: Bot, ev: Event):
 
 @sv_import_gacha_log.on_file("json")
 async def get_gacha_log_by_file(bot: Bot, ev: Event):
+    await import_gacha_log_file(bot, ev)
+
+
+# 开启 GachaExportGzip 时导出的 .json.gz 文件
+@sv_import_gacha_log.on_file("gz")
+async def get_gacha_log_by_gz_file(bot: Bot, ev: Event):
+    await import_gacha_log_file(bot, ev)
+
+
+async def import_gacha_log_file(bot: Bot, ev: Event):
     # 没有uid 就别导了吧
     uid = await WavesBind.get_uid_by_game(ev.user_id, ev.bot_id)
     if not uid:
@@ -209,7 +220,7 @@ async def send_export_gacha_info(bot: Bot, ev: Event):
         return await bot.send(ERROR_CODE[WAVES_CODE_102])
 
     # await bot.send("🔜即将为你导出XutheringWavesUID抽卡记录文件，请耐心等待...")
-    export = await export_gachalogs(uid)
+    export = await export_gachalogs(uid, compress=WutheringWavesConfig.get_config("GachaExportGzip").data)
     if export["retcode"] == "ok":
         file_name = export["name"]
         file_path = export["url"]
@@ -225,23 +236,23 @@ async def delete_gacha_history(bot: Bot, ev: Event):
     if not uid.isdigit() or len(uid) != 9:
         return await bot.send(f"请附带特征码，例如【{PREFIX}删除抽卡记录123456789】")
 
-    player_dir = PLAYER_PATH / uid
-    gacha_log_file = player_dir / "gacha_logs.json"
-    if not gacha_log_file.exists():
+    store = GachaStore(uid)
+    if not store.exists():
         return await bot.send(f"UID{uid}暂无抽卡记录文件")
 
     GACHA_BACKUP_PATH.mkdir(parents=True, exist_ok=True)
     backup_dir = GACHA_BACKUP_PATH / uid
     backup_dir.mkdir(parents=True, exist_ok=True)
 
-    dst_file = backup_dir / "gacha_logs.json"
-    if dst_file.exists():
-        dst_file = backup_dir / f"gacha_logs_{datetime.now().strftime('%Y-%m-%d.%H%M%S')}.json"
+    dst_dir = backup_dir / GACHA_STORE_DIR
+    if dst_dir.exists():
+        dst_dir = backup_dir / f"{GACHA_STORE_DIR}_{datetime.now().strftime('%Y-%m-%d.%H%M%S')}"
 
     try:
-        shutil.move(str(gacha_log_file), dst_file)
+        await asyncio.to_thread(store.move_to, dst_dir)
     except Exception as e:
         return await bot.send(f"移动抽卡记录失败：{e}")
+    await update_gacha_rank_index(uid, None)
 
     await bot.send(f"UID{uid}抽卡记录已删除")
 
@@ -1,18 +1,18 @@
 import os
-import json
 import random
+import asyncio
 from typing import Dict, List
 from pathlib import Path
 from datetime import datetime
 
-import aiofiles
 from PIL import Image, ImageDraw
 
 from gsuid_core.models import Event
-from gsuid_core.utils.image.convert import convert_img
 from gsuid_core.utils.image.image_tools import crop_center_img
 
 from ..utils import hint
+from .gacha_stats import iter_rank_s, update_gacha_state
+from .gacha_store import GachaStore, gacha_type_meta_data
 from ..utils.image import (
     GOLD,
     add_footer,
@@ -25,6 +25,7 @@ from ..utils.image import (
 from ..utils.api.model import AccountBaseInfo
 from ..utils.waves_api import waves_api
 from ..utils.error_reply import WAVES_CODE_102
+from ..utils.render_executor import convert_img
 from ..wutheringwaves_config import PREFIX
 from ..utils.fonts.waves_fonts import (
     waves_font_18,
@@ -36,8 +37,6 @@ from ..utils.fonts.waves_fonts import (
     waves_font_32,
     waves_font_40,
 )
-from ..utils.resource.constant import NORMAL_LIST
-from ..utils.resource.RESOURCE_PATH import PLAYER_PATH
 
 TEXT_PATH = Path(__file__).parent / "texture2d"
 HOMO_TAG = ["非到极致", "运气不好", "平稳保底", "小欧一把", "欧狗在此"]
@@ -136,32 +135,15 @@ async def draw_card_help():
 
 
 async def get_gacha_stats(uid: str) -> Dict:
-    """获取抽卡统计信息，优先从缓存读取，否则从原始数据计算"""
-    _dir = PLAYER_PATH / str(uid)
-    _dir.mkdir(parents=True, exist_ok=True)
-
-    gacha_log_path = _dir / "gacha_logs.json"
-    stats_path = _dir / "gachaStats.json"
-    # 如果统计文件存在，直接读取
-    if gacha_log_path.exists() and stats_path.exists():
-        try:
-            async with aiofiles.open(stats_path, "r", encoding="utf-8") as f:
-                return json.loads(await f.read())
-        except Exception:
-            pass
-
-    # 否则从 gacha_logs.json 计算
-    if not gacha_log_path.exists():
+    """获取抽卡统计信息，从统计状态读取，只累加还没统计的新记录"""
+    if not GachaStore(uid).exists():
         return {}
 
     try:
-        async with aiofiles.open(gacha_log_path, "r", encoding="utf-8") as f:
-            raw_data = json.loads(await f.read())
-
-        gachalogs = raw_data.get("data", {})
+        state = await asyncio.to_thread(update_gacha_state, uid)
         total_data = {}
 
-        for gacha_name in gachalogs:
+        for gacha_name in gacha_type_meta_data:
             total_data[gacha_name] = {
                 "total": 0,
                 "avg": 0,
@@ -173,31 +155,18 @@ async def get_gacha_stats(uid: str) -> Dict:
                 "level": 0,
             }
 
-        for gacha_name in gachalogs:
-            num = 1
-            gacha_data = gachalogs[gacha_name]
+        for gacha_name in gacha_type_meta_data:
+            pool = state["pools"][gacha_name]
             current_data = total_data[gacha_name]
 
-            for data in gacha_data[::-1]:
-                if data["qualityLevel"] == 5:
-                    data["gacha_num"] = num
-
-                    if data["name"] in NORMAL_LIST:
-                        data["is_up"] = False
-                    else:
-                        data["is_up"] = True
-
-                    current_data["r_num"].append(num)
-                    current_data["rank_s_list"].append(data)
-                    if data["is_up"]:
-                        current_data["up_list"].append(data)
-
-                    num = 1
-                else:
-                    num += 1
-                current_data["total"] += 1
+            for data in iter_rank_s(pool):
+                current_data["r_num"].append(data["gacha_num"])
+                current_data["rank_s_list"].append(data)
+                if data["is_up"]:
+                    current_data["up_list"].append(data)
+            current_data["total"] = pool["count"]
 
-            current_data["remain"] = num - 1
+            current_data["remain"] = pool["num"] - 1
             if len(current_data["rank_s_list"]) == 0:
                 current_data["avg"] = 0
             else:
@@ -244,63 +213,21 @@ async def get_gacha_stats(uid: str) -> Dict:
                 "weapon_gold": len(data["rank_s_list"]) if gacha_name == "武器精准调谐" else 0,  # 武器金数
             }
 
-        # 保存统计数据到文件
-        await save_gacha_stats(uid, total_data)
         return stats_data
     except Exception:
         return {}
 
 
-async def save_gacha_stats(uid: str, total_data: Dict):
-    """保存抽卡统计信息到本地文件"""
-    try:
-        _dir = PLAYER_PATH / str(uid)
-        _dir.mkdir(parents=True, exist_ok=True)
-        path = _dir / "gachaStats.json"
-
-        # 提取关键统计信息
-        stats_data = {}
-        for gacha_name, data in total_data.items():
-            # 计算综合平均值：如果有 UP 平均数则用 UP，否则用总平均数，都没有则为 0
-            combined_avg = 0
-            if isinstance(data["avg_up"], (int, float)) and data["avg_up"] > 0:
-                combined_avg = data["avg_up"]
-            elif isinstance(data["avg"], (int, float)) and data["avg"] > 0:
-                combined_avg = data["avg"]
-
-            stats_data[gacha_name] = {
-                "total": data["total"],  # 总抽数
-                "avg": data["avg"],  # 平均抽数
-                "avg_up": data["avg_up"],  # UP平均抽数
-                "combined_avg": combined_avg,  # 综合平均（优先UP）
-                "remain": data["remain"],  # 已xx抽未出金
-                "r_num": data["r_num"],  # 五星出现的抽卡位置列表
-                "up_count": len(data["up_list"]),  # UP五星总数
-                "rank_s_count": len(data["rank_s_list"]),  # 五星总数
-                "level": data["level"],  # 抽卡等级
-                "char_gold": len(data["rank_s_list"]) if gacha_name == "角色精准调谐" else 0,  # 角色金数
-                "weapon_gold": len(data["rank_s_list"]) if gacha_name == "武器精准调谐" else 0,  # 武器金数
-            }
-
-        async with aiofiles.open(path, "w", encoding="utf-8") as file:
-            await file.write(json.dumps(stats_data, ensure_ascii=False))
-    except Exception:
-        pass
-
-
 async def draw_card(uid: str, ev: Event):
     # 获取数据
-    gacha_log_path = PLAYER_PATH / str(uid) / "gacha_logs.json"
-    if not gacha_log_path.exists():
+    store = GachaStore(uid)
+    if not store.exists():
         return f"[鸣潮] 你还没有抽卡记录噢!\n 请发送 {PREFIX}导入抽卡链接 后重试!"
-    async with aiofiles.open(gacha_log_path, "r", encoding="UTF-8") as f:
-        raw_data: Dict = json.loads(await f.read())
 
-    gachalogs = raw_data["data"]
-    title_num = len([1 for i in gachalogs.keys() if "新手" not in i])
+    title_num = len([1 for i in gacha_type_meta_data.keys() if "新手" not in i])
 
     total_data = {}
-    for gacha_name in gachalogs:
+    for gacha_name in gacha_type_meta_data:
         total_data[gacha_name] = {
             "total": 0,  # 抽卡总数
             "avg": 0,  # 抽卡平均数
@@ -316,40 +243,24 @@ async def draw_card(uid: str, ev: Event):
             "level": 0,  # 抽卡等级
         }
 
-    for gacha_name in gachalogs:
-        num = 1
-        gacha_data = gachalogs[gacha_name]
+    state = await asyncio.to_thread(update_gacha_state, uid)
+    for gacha_name in gacha_type_meta_data:
+        pool = state["pools"][gacha_name]
         current_data = total_data[gacha_name]
-        for index, data in enumerate(gacha_data[::-1]):
-            if index == 0:
-                current_data["time_range"] = data["time"]
-            if index == len(gacha_data) - 1:
-                time_1 = datetime.strptime(data["time"], "%Y-%m-%d %H:%M:%S")
-                time_2 = datetime.strptime(current_data["time_range"], "%Y-%m-%d %H:%M:%S")
-                current_data["all_time"] = (time_1 - time_2).total_seconds()
-
-                current_data["time_range"] += "~" + data["time"]
-
-            if data["qualityLevel"] == 5:
-                data["gacha_num"] = num
-
-                # 判断是否是UP
-                if data["name"] in NORMAL_LIST:
-                    data["is_up"] = False
-                else:
-                    data["is_up"] = True
-
-                current_data["r_num"].append(num)
-                current_data["rank_s_list"].append(data)
-                if data["is_up"]:
-                    current_data["up_list"].append(data)
-
-                num = 1
-            else:
-                num += 1
-            current_data["total"] += 1
-
-        current_data["remain"] = num - 1
+        if pool["count"]:
+            time_1 = datetime.strptime(pool["last_time"], "%Y-%m-%d %H:%M:%S")
+            time_2 = datetime.strptime(pool["first_time"], "%Y-%m-%d %H:%M:%S")
+            current_data["all_time"] = (time_1 - time_2).total_seconds()
+            current_data["time_range"] = f"{pool['first_time']}~{pool['last_time']}"
+
+        for data in iter_rank_s(pool):
+            current_data["r_num"].append(data["gacha_num"])
+            current_data["rank_s_list"].append(data)
+            if data["is_up"]:
+                current_data["up_list"].append(data)
+        current_data["total"] = pool["count"]
+
+        current_data["remain"] = pool["num"] - 1
         if len(current_data["rank_s_list"]) == 0:
             current_data["avg"] = "-"
         else:
@@ -383,9 +294,6 @@ async def draw_card(uid: str, ev: Event):
                 if current_data["avg"] != "-":
                     current_data["level"] = get_level_from_list(current_data["avg"], [10, 20, 30, 40, 45])
 
-    # 保存抽卡统计信息到本地
-    await save_gacha_stats(uid, total_data)
-
     oset = 280
     bset = 170
 
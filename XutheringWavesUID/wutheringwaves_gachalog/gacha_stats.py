@@ -0,0 +1,88 @@
+"""抽卡统计状态
+
+每个卡池维护一份滚动的统计状态（总抽数、当前未出金抽数、五星列表、首末时间），
+保存抽卡记录后只把新增的记录累加进去，抽卡记录卡片和抽卡排行直接读取状态。
+状态中记录已统计的记录数和卡池的 generation，卡池被重写时从头重新统计。
+"""
+
+import os
+import json
+from typing import Any, Dict, Iterable, Iterator
+from pathlib import Path
+
+from .gacha_store import GachaStore, gacha_type_meta_data
+from ..utils.resource.constant import NORMAL_LIST
+
+# 状态结构变化时修改，旧的状态会被丢弃并重新统计
+GACHA_STATS_VERSION = 1
+GACHA_STATS_FILE = "stats.json"
+
+
+def new_pool_state(generation: int) -> Dict[str, Any]:
+    return {
+        "generation": generation,
+        "count": 0,  # 已统计的记录数，即总抽数
+        "num": 1,  # 距离上一个五星的抽数 + 1
+        "rank_s_list": [],  # 五星记录，附带 gacha_num
+        "first_time": "",
+        "last_time": "",
+    }
+
+
+def fold_pool(pool: Dict[str, Any], logs: Iterable[Dict[str, Any]]):
+    """把按时间升序的新记录累加到卡池状态"""
+    for data in logs:
+        if not pool["first_time"]:
+            pool["first_time"] = data["time"]
+        pool["last_time"] = data["time"]
+
+        if data["qualityLevel"] == 5:
+            data["gacha_num"] = pool["num"]
+            pool["rank_s_list"].append(data)
+            pool["num"] = 1
+        else:
+            pool["num"] += 1
+        pool["count"] += 1
+
+
+def iter_rank_s(pool: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """五星记录，按当前的常驻列表判断是否UP"""
+    for data in pool["rank_s_list"]:
+        data["is_up"] = data["name"] not in NORMAL_LIST
+        yield data
+
+
+def update_gacha_state(uid: str) -> Dict[str, Any]:
+    """读取统计状态，并把还没统计的记录累加进去"""
+    store = GachaStore(uid)
+    path = store.path / GACHA_STATS_FILE
+
+    state: Dict[str, Any] = {}
+    if path.exists():
+        try:
+            with Path.open(path, encoding="UTF-8") as f:
+                state = json.load(f)
+        except Exception:
+            state = {}
+    if state.get("version") != GACHA_STATS_VERSION:
+        state = {"version": GACHA_STATS_VERSION, "pools": {}}
+
+    with store.lock:
+        changed = False
+        for gacha_name in gacha_type_meta_data:
+            count = store.count(gacha_name)
+            generation = store.generation(gacha_name)
+            pool = state["pools"].get(gacha_name)
+            if not pool or pool["generation"] != generation or pool["count"] > count:
+                pool = state["pools"][gacha_name] = new_pool_state(generation)
+                changed = True
+            if pool["count"] < count:
+                fold_pool(pool, store.iter_logs(gacha_name, start=pool["count"]))
+                changed = True
+
+        if changed and store.path.exists():
+            tmp_path = path.with_suffix(".tmp")
+            with Path.open(tmp_path, "w", encoding="UTF-8") as f:
+                json.dump(state, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+    return state
@@ -0,0 +1,352 @@
+"""抽卡记录存储
+
+每个UID一个目录，每个卡池一个只追加的定长记录文件，按时间升序排列（同一时间按抽取顺序），
+名称、类型等字符串单独存成只追加的字符串表，记录中只保存下标。
+新的抽卡记录只追加到文件末尾，按时间查找时二分定位，不再整体读取和重写 gacha_logs.json。
+"""
+
+import os
+import json
+import shutil
+import struct
+import threading
+from typing import Any, Dict, List, Tuple, Iterator, Optional
+from pathlib import Path
+from datetime import datetime, timedelta
+
+from gsuid_core.logger import logger
+
+from ..utils.api.model import GachaLog
+from ..utils.resource.RESOURCE_PATH import PLAYER_PATH
+
+gacha_type_meta_data = {
+    "角色精准调谐": "1",
+    "武器精准调谐": "2",
+    "角色调谐（常驻池）": "3",
+    "武器调谐（常驻池）": "4",
+    "新手调谐": "5",
+    "新手自选唤取": "6",
+    "新手自选唤取（感恩定向唤取）": "7",
+    "角色新旅唤取": "8",
+    "武器新旅唤取": "9",
+}
+
+gacha_type_meta_data_reverse = {v: k for k, v in gacha_type_meta_data.items()}
+
+GACHA_STORE_DIR = "gacha_store"
+LEGACY_GACHA_LOGS = "gacha_logs.json"
+
+# time(秒) resourceId qualityLevel count name下标 resourceType下标
+RECORD = struct.Struct("<IiBHHH")
+# 流式读取时每次读取的记录数
+READ_CHUNK = 4096
+
+_EPOCH = datetime(1970, 1, 1)
+
+_locks: Dict[str, threading.RLock] = {}
+_locks_lock = threading.Lock()
+
+Row = Tuple[int, int, int, int, int, int]
+
+
+def encode_time(value: str) -> int:
+    return int((datetime.fromisoformat(value) - _EPOCH).total_seconds())
+
+
+def decode_time(value: int) -> str:
+    return (_EPOCH + timedelta(seconds=value)).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def fix_pool_type(gacha_name: str, logs: List[Dict]):
+    """修正旧数据中错误的卡池类型"""
+    card_pool_type = gacha_type_meta_data[gacha_name]
+    for index in range(len(logs) - 1, -1, -1):
+        pool_type = logs[index]["cardPoolType"]
+        if pool_type == card_pool_type:
+            continue
+        if card_pool_type == "武器精准调谐" and pool_type == "角色精准调谐-2":
+            del logs[index]
+        elif card_pool_type == "角色调谐（常驻池）" and pool_type == "武器精准调谐":
+            del logs[index]
+        elif card_pool_type == "武器调谐（常驻池）" and pool_type == "全频调谐":
+            del logs[index]
+        else:
+            logs[index]["cardPoolType"] = card_pool_type
+
+
+def _dump_strings(values: List[str]) -> bytes:
+    # 每行一个 JSON 字符串，值中的换行会被转义
+    return "".join(f"{json.dumps(value, ensure_ascii=False)}\n" for value in values).encode("UTF-8")
+
+
+class GachaStore:
+    def __init__(self, uid: str):
+        self.uid = str(uid)
+        self.player_path = PLAYER_PATH / self.uid
+        self.path = self.player_path / GACHA_STORE_DIR
+        self.meta_path = self.path / "meta.json"
+        self.strings_path = self.path / "strings.jsonl"
+        self.legacy_strings_path = self.path / "strings.txt"
+        self._strings: Optional[List[str]] = None
+        self._strings_size = 0
+        self._string_index: Dict[str, int] = {}
+
+        with _locks_lock:
+            self.lock = _locks.setdefault(self.uid, threading.RLock())
+
+    def exists(self) -> bool:
+        return self.meta_path.exists() or (self.player_path / LEGACY_GACHA_LOGS).exists()
+
+    def pool_path(self, gacha_name: str) -> Path:
+        return self.path / f"pool_{gacha_type_meta_data[gacha_name]}.bin"
+
+    def count(self, gacha_name: str) -> int:
+        self.migrate()
+        return self._count(gacha_name)
+
+    def _count(self, gacha_name: str) -> int:
+        path = self.pool_path(gacha_name)
+        return path.stat().st_size // RECORD.size if path.exists() else 0
+
+    # ---------- 旧数据迁移 ----------
+
+    def migrate(self):
+        """把旧的 gacha_logs.json 转为存储格式，原文件改名保留"""
+        legacy_path = self.player_path / LEGACY_GACHA_LOGS
+        if self.meta_path.exists() or not legacy_path.exists():
+            return
+        with self.lock:
+            if self.meta_path.exists() or not legacy_path.exists():
+                return
+            with Path.open(legacy_path, encoding="UTF-8") as f:
+                raw_data: Dict = json.load(f)
+
+            history = raw_data.get("data", {})
+            for gacha_name in gacha_type_meta_data:
+                logs = history.get(gacha_name, [])
+                fix_pool_type(gacha_name, logs)
+                self.write(gacha_name, [GachaLog(**log) for log in logs])
+            self.save_meta(raw_data.get("data_time", ""))
+
+            backup_path = self.player_path / f"migrate_gacha_logs_{datetime.now().strftime('%Y-%m-%d.%H%M%S')}.json"
+            legacy_path.rename(backup_path)
+            logger.info(f"[鸣潮] UID{self.uid} 抽卡记录已迁移，原文件备份为 {backup_path.name}")
+
+    # ---------- 字符串表 ----------
+
+    def _migrate_strings(self):
+        """旧版本的字符串表每行一个原始字符串，名称中含换行时会错位，转为每行一个 JSON 字符串"""
+        if self.strings_path.exists() or not self.legacy_strings_path.exists():
+            return
+        with self.lock:
+            if self.strings_path.exists() or not self.legacy_strings_path.exists():
+                return
+            with Path.open(self.legacy_strings_path, "rb") as f:
+                data = f.read()
+            # 旧版本以文本模式写入，Windows 下行尾为 \r\n
+            strings = [line.rstrip("\r") for line in data.decode("UTF-8", errors="ignore").split("\n")[:-1]]
+            tmp_path = self.strings_path.with_suffix(".tmp")
+            with Path.open(tmp_path, "wb") as f:
+                f.write(_dump_strings(strings))
+            os.replace(tmp_path, self.strings_path)
+            self.legacy_strings_path.unlink()
+
+    def _load_strings(self) -> List[str]:
+        """读取字符串表，文件大小变化时（其他实例追加过）重新读取"""
+        self._migrate_strings()
+        size = self.strings_path.stat().st_size if self.strings_path.exists() else 0
+        if self._strings is None or size != self._strings_size:
+            self._strings = []
+            if size:
+                with Path.open(self.strings_path, "rb") as f:
+                    data = f.read()
+                size = len(data)
+                # 最后一行没有换行符说明写入被中断，忽略
+                self._strings = [json.loads(line) for line in data.decode("UTF-8", errors="ignore").split("\n")[:-1]]
+            self._strings_size = size
+            self._string_index = {s: i for i, s in enumerate(self._strings)}
+        return self._strings
+
+    def _intern(self, values: List[str]):
+        """把没有出现过的字符串追加到字符串表"""
+        with self.lock:
+            strings = self._load_strings()
+            new = []
+            for value in values:
+                if value not in self._string_index:
+                    self._string_index[value] = len(strings) + len(new)
+                    new.append(value)
+            if new:
+                with Path.open(self.strings_path, "ab") as f:
+                    f.write(_dump_strings(new))
+                    self._strings_size = f.tell()
+                strings.extend(new)
+
+    # ---------- 编码 ----------
+
+    def _encode(self, log: GachaLog) -> Row:
+        return (
+            encode_time(log.time),
+            log.resourceId,
+            log.qualityLevel,
+            log.count,
+            self._string_index.get(log.name, -1),
+            self._string_index.get(log.resourceType, -1),
+        )
+
+    def _decode(self, gacha_name: str, rows: List[Row]) -> List[Dict[str, Any]]:
+        strings = self._load_strings()
+        card_pool_type = gacha_type_meta_data[gacha_name]
+        times: Dict[int, str] = {}
+        result = []
+        for t, resource_id, quality_level, count, name, resource_type in rows:
+            if t not in times:
+                times[t] = decode_time(t)
+            result.append(
+                {
+                    "cardPoolType": card_pool_type,
+                    "resourceId": resource_id,
+                    "qualityLevel": quality_level,
+                    "resourceType": strings[resource_type],
+                    "name": strings[name],
+                    "count": count,
+                    "time": times[t],
+                }
+            )
+        return result
+
+    # ---------- 读取 ----------
+
+    def _bisect(self, f, count: int, since: int) -> int:
+        """第一条 time >= since 的记录下标"""
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            f.seek(mid * RECORD.size)
+            if RECORD.unpack(f.read(RECORD.size))[0] < since:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _iter_rows(
+        self, gacha_name: str, since: Optional[str] = None, start: int = 0, reverse: bool = False
+    ) -> Iterator[List[Row]]:
+        path = self.pool_path(gacha_name)
+        if not path.exists():
+            return
+        count = self._count(gacha_name)
+        with Path.open(path, "rb") as f:
+            if since:
+                start = max(start, self._bisect(f, count, encode_time(since)))
+            if reverse:
+                for end in range(count, start, -READ_CHUNK):
+                    offset = max(start, end - READ_CHUNK)
+                    f.seek(offset * RECORD.size)
+                    rows = list(RECORD.iter_unpack(f.read((end - offset) * RECORD.size)))
+                    rows.reverse()
+                    yield rows
+                return
+            f.seek(start * RECORD.size)
+            for offset in range(start, count, READ_CHUNK):
+                chunk = f.read(min(READ_CHUNK, count - offset) * RECORD.size)
+                yield list(RECORD.iter_unpack(chunk))
+
+    def iter_logs(
+        self, gacha_name: str, since: Optional[str] = None, start: int = 0, reverse: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """按时间升序流式读取，since 只读取该时间及之后的记录，start 跳过前 start 条，reverse 为降序"""
+        self.migrate()
+        for rows in self._iter_rows(gacha_name, since, start, reverse):
+            yield from self._decode(gacha_name, rows)
+
+    def read_logs(self, gacha_name: str, since: Optional[str] = None) -> List[GachaLog]:
+        """按时间降序读取，与接口返回的顺序一致"""
+        logs = [GachaLog(**log) for log in self.iter_logs(gacha_name, since)]
+        logs.reverse()
+        return logs
+
+    def read_all(self) -> Dict[str, List[GachaLog]]:
+        return {gacha_name: self.read_logs(gacha_name) for gacha_name in gacha_type_meta_data}
+
+    # ---------- 写入 ----------
+
+    def append(self, gacha_name: str, logs: List[GachaLog]) -> int:
+        """追加比已有记录更新的数据（按时间降序传入）"""
+        if not logs:
+            return 0
+        with self.lock:
+            self.path.mkdir(parents=True, exist_ok=True)
+            self._intern([value for log in logs for value in (log.name, log.resourceType)])
+            data = b"".join(RECORD.pack(*self._encode(log)) for log in reversed(logs))
+            path = self.pool_path(gacha_name)
+            with Path.open(path, "ab") as f:
+                # 上次写入中断时丢弃不完整的记录
+                size = f.tell()
+                if size % RECORD.size:
+                    f.truncate(size - size % RECORD.size)
+                f.write(data)
+        return len(logs)
+
+    def write(self, gacha_name: str, logs: List[GachaLog]) -> int:
+        """保存卡池的全部记录（按时间降序传入），已有记录不变时只追加新增部分，否则重写"""
+        with self.lock:
+            self.path.mkdir(parents=True, exist_ok=True)
+            self._intern([value for log in logs for value in (log.name, log.resourceType)])
+
+            stored = [row for rows in self._iter_rows(gacha_name) for row in rows]
+            if len(stored) <= len(logs):
+                added = len(logs) - len(stored)
+                if all(self._encode(log) == row for log, row in zip(reversed(logs[added:]), stored)):
+                    return self.append(gacha_name, logs[:added])
+
+            # 已有记录被改写，让基于旧记录的统计失效
+            self._bump_generation(gacha_name)
+            path = self.pool_path(gacha_name)
+            tmp_path = path.with_suffix(".tmp")
+            with Path.open(tmp_path, "wb") as f:
+                f.write(b"".join(RECORD.pack(*self._encode(log)) for log in reversed(logs)))
+            os.replace(tmp_path, path)
+        return len(logs)
+
+    def _read_meta(self) -> Dict[str, Any]:
+        if not self.meta_path.exists():
+            return {}
+        with Path.open(self.meta_path, encoding="UTF-8") as f:
+            return json.load(f)
+
+    def _write_meta(self, meta: Dict[str, Any]):
+        tmp_path = self.meta_path.with_suffix(".tmp")
+        with Path.open(tmp_path, "w", encoding="UTF-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_path, self.meta_path)
+
+    def generation(self, gacha_name: str) -> int:
+        """卡池记录被重写的次数，只追加时不变"""
+        return self._read_meta().get("generation", {}).get(gacha_type_meta_data[gacha_name], 0)
+
+    def _bump_generation(self, gacha_name: str):
+        # 迁移完成前没有 meta，也不会有基于存储的统计
+        meta = self._read_meta()
+        if not meta:
+            return
+        generation = meta.setdefault("generation", {})
+        code = gacha_type_meta_data[gacha_name]
+        generation[code] = generation.get(code, 0) + 1
+        self._write_meta(meta)
+
+    def save_meta(self, data_time: str):
+        self._write_meta(
+            {
+                "uid": self.uid,
+                "data_time": data_time,
+                **{gacha_name: self._count(gacha_name) for gacha_name in gacha_type_meta_data},
+                "generation": self._read_meta().get("generation", {}),
+            }
+        )
+
+    def move_to(self, dst: Path):
+        """整体移动到 dst（删除抽卡记录时备份用）"""
+        self.migrate()
+        with self.lock:
+            shutil.move(str(self.path), dst)
@@ -1,8 +1,10 @@
 import copy
+import gzip
 import json
+import time
 import base64
 import asyncio
-from typing import Dict, List, Tuple, Union, Optional
+from typing import Any, Dict, List, Tuple, Union, Iterator, Optional
 from pathlib import Path
 from datetime import datetime
 
@@ -12,30 +14,19 @@ import aiofiles
 from gsuid_core.logger import logger
 from gsuid_core.models import Event
 
-from .model import WWUIDGacha
+from .model import WWUIDGachaInfo
 from ..version import XutheringWavesUID_version
+from .gacha_store import GachaStore, gacha_type_meta_data, gacha_type_meta_data_reverse
+from .draw_gachalogs import get_gacha_stats
 from ..utils.api.model import GachaLog
 from ..utils.constants import WAVES_GAME_ID
 from ..utils.waves_api import waves_api
+from ..utils.rank_index import update_gacha_rank_index
 from ..utils.database.models import WavesUser
 from ..wutheringwaves_config import PREFIX
-from .model_for_waves_plugin import WavesPluginGacha
+from .model_for_waves_plugin import WavesPluginGachaInfo, WavesPluginGachaItem
 from ..utils.resource.RESOURCE_PATH import PLAYER_PATH
 
-gacha_type_meta_data = {
-    "角色精准调谐": "1",
-    "武器精准调谐": "2",
-    "角色调谐（常驻池）": "3",
-    "武器调谐（常驻池）": "4",
-    "新手调谐": "5",
-    "新手自选唤取": "6",
-    "新手自选唤取（感恩定向唤取）": "7",
-    "角色新旅唤取": "8",
-    "武器新旅唤取": "9",
-}
-
-gacha_type_meta_data_reverse = {v: k for k, v in gacha_type_meta_data.items()}
-
 gachalogs_history_meta = {
     "角色精准调谐": [],
     "武器精准调谐": [],
@@ -50,8 +41,11 @@ gachalogs_history_meta = {
 
 ERROR_MSG_INVALID_LINK = "当前抽卡链接已经失效，请重新导入抽卡链接"
 
+GZIP_MAGIC = b"\x1f\x8b"
+
 
 # 找到两个数组中最长公共子串的下标
+# O(n·m)，只用于同一时间（同一次十连）内的少量记录
 def find_longest_common_subarray_indices(
     a: List[GachaLog], b: List[GachaLog]
 ) -> Optional[Tuple[Tuple[int, int], Tuple[int, int]]]:
@@ -96,19 +90,102 @@ def merge_gacha_logs_by_common_subarray(a: List[GachaLog], b: List[GachaLog]) ->
     return prefix + common_subarray + suffix
 
 
+def _sorted_by_time(logs: List[GachaLog]) -> List[GachaLog]:
+    """按time降序，已经有序时直接返回"""
+    if all(logs[i].time >= logs[i + 1].time for i in range(len(logs) - 1)):
+        return logs
+    return sorted(logs, key=lambda log: log.time, reverse=True)
+
+
+def _group_end(logs: List[GachaLog], start: int) -> int:
+    """logs[start:end] 为同一时间的记录"""
+    end = start + 1
+    while end < len(logs) and logs[end].time == logs[start].time:
+        end += 1
+    return end
+
+
+# 按时间分组合并两个GachaLog列表，不去重，按time排序
+def merge_gacha_logs(a: List[GachaLog], b: List[GachaLog]) -> List[GachaLog]:
+    """O(n+m) 合并
+
+    两边都按时间降序，同一时间的记录（一次单抽/十连）为一组，只在一边出现的组直接保留；
+    两边都有的组用最长公共子串合并，相同的记录只保留一份，不同的记录都保留。
+    """
+    a, b = _sorted_by_time(a), _sorted_by_time(b)
+    result: List[GachaLog] = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        if a[i].time > b[j].time:
+            end = _group_end(a, i)
+            result.extend(a[i:end])
+            i = end
+        elif a[i].time < b[j].time:
+            end = _group_end(b, j)
+            result.extend(b[j:end])
+            j = end
+        else:
+            a_end, b_end = _group_end(a, i), _group_end(b, j)
+            result.extend(merge_gacha_logs_by_common_subarray(a[i:a_end], b[j:b_end]))
+            i, j = a_end, b_end
+    result.extend(a[i:])
+    result.extend(b[j:])
+    return result
+
+
+def count_new_gachalogs(old: List[GachaLog], new: List[GachaLog]) -> int:
+    """new 开头有多少条 old 中没有的记录（new 与 old 重叠部分之前的记录数）"""
+    i = j = 0
+    while i < len(old) and j < len(new):
+        if old[i].time > new[j].time:
+            i = _group_end(old, i)
+        elif old[i].time < new[j].time:
+            j = _group_end(new, j)
+        else:
+            old_end, new_end = _group_end(old, i), _group_end(new, j)
+            common_indices = find_longest_common_subarray_indices(old[i:old_end], new[j:new_end])
+            if common_indices:
+                return j + common_indices[1][0]
+            i, j = old_end, new_end
+    return len(new)
+
+
+async def fetch_gacha_pool(uid: str, record_id: str, card_pool_type: str):
+    """获取单个卡池的抽卡记录，返回结果和耗时（秒）"""
+    start = time.perf_counter()
+    res = await waves_api.get_gacha_log(card_pool_type, record_id, uid)
+    return res, time.perf_counter() - start
+
+
 async def get_new_gachalog(
-    uid: str, record_id: str, full_data: Dict[str, List[GachaLog]], is_force: bool
+    uid: str, record_id: str, store: GachaStore, is_force: bool
 ) -> tuple[Union[str, None], Dict[str, List[GachaLog]], Dict[str, int], Dict[str, List[GachaLog]]]:
+    """new 中为新增记录加上已保存记录中与本次获取时间重叠的部分
+
+    抽卡记录接口与库街区社区接口不是同一个上游，所有卡池不再间隔1秒而是直接并发请求；
+    需要限制时由 kuro_throttle 按特征码限速（KuroAccountQPS），触发风控的返回码由熔断处理
+    """
+    start = time.perf_counter()
+    tasks = {
+        gacha_name: asyncio.create_task(fetch_gacha_pool(uid, record_id, card_pool_type))
+        for gacha_name, card_pool_type in gacha_type_meta_data.items()
+    }
+    try:
+        for future in asyncio.as_completed(list(tasks.values())):
+            res, _ = await future
+            # 链接失效时不再等待其余卡池
+            if not res.success and res.code == -1:  # type: ignore
+                return ERROR_MSG_INVALID_LINK, None, None, {}  # type: ignore
+    finally:
+        for task in tasks.values():
+            task.cancel()
+
     new = {}
     new_count = {}
     link_source_data: Dict[str, List[GachaLog]] = {}
+    timing = []
     for gacha_name, card_pool_type in gacha_type_meta_data.items():
-        res = await waves_api.get_gacha_log(card_pool_type, record_id, uid)
-        if not res.success or not res.data:
-            # 抽卡记录获取失败
-            if res.code == -1:  # type: ignore
-                return ERROR_MSG_INVALID_LINK, None, None, {}  # type: ignore
-
+        res, cost = tasks[gacha_name].result()
         if res.data and isinstance(res.data, list):
             temp = res.data
         else:
@@ -119,16 +196,14 @@ async def get_new_gachalog(
             if log.cardPoolType != card_pool_type:
                 log.cardPoolType = card_pool_type
         link_source_data[gacha_name] = list(gacha_log)
-        common_indices = find_longest_common_subarray_indices(full_data[gacha_name], gacha_log)
-        if not common_indices:
-            _add = gacha_log
-        else:
-            (_, _), (b_start, b_end) = common_indices
-            _add = gacha_log[:b_start]
-        new[gacha_name] = _add + copy.deepcopy(full_data[gacha_name])
+        # 只有时间不早于本次最早一条的已保存记录可能重叠，找到第一处重叠就停止
+        old = store.read_logs(gacha_name, since=gacha_log[-1].time) if gacha_log else []
+        _add = gacha_log[: count_new_gachalogs(old, gacha_log)]
+        new[gacha_name] = _add + old
         new_count[gacha_name] = len(_add)
-        await asyncio.sleep(1)
+        timing.append(f"{gacha_name} {cost * 1000:.0f}ms +{len(_add)}")
 
+    logger.info(f"[鸣潮] UID{uid} 获取抽卡记录耗时 {(time.perf_counter() - start) * 1000:.0f}ms: " + ", ".join(timing))
     return None, new, new_count, link_source_data
 
 
@@ -151,7 +226,7 @@ async def get_new_gachalog_for_file(
             continue
         gacha_name = cardPoolType
         gacha_log = [GachaLog(**log.dict()) for log in item]
-        new_gacha_log = merge_gacha_logs_by_common_subarray(full_data[gacha_name], gacha_log)
+        new_gacha_log = merge_gacha_logs(full_data[gacha_name], gacha_log)
         new[gacha_name] = new_gacha_log
         new_count[gacha_name] = len(new_gacha_log)
     return None, new, new_count
@@ -196,67 +271,38 @@ async def save_gachalogs(
     if not path.exists():
         path.mkdir(parents=True, exist_ok=True)
 
-    # 抽卡记录json路径
-    gachalogs_path = path / "gacha_logs.json"
-
-    temp_gachalogs_history = {}
-    if gachalogs_path.exists():
-        with Path.open(gachalogs_path, encoding="UTF-8") as f:
-            gachalogs_history: Dict = json.load(f)
-
-        # import 时备份
-        if not record_id:
-            await backup_gachalogs(uid, gachalogs_history, type="import")
-
-        # update 时备份
-        temp_gachalogs_history = copy.deepcopy(gachalogs_history)
-
-        gachalogs_history = gachalogs_history["data"]
-    else:
-        gachalogs_history = copy.deepcopy(gachalogs_history_meta)
-
-    temp = copy.deepcopy(gachalogs_history_meta)
-    temp.update(gachalogs_history)
-    gachalogs_history = temp
-
-    is_need_backup = False
-    for gacha_name, card_pool_type in gacha_type_meta_data.items():
-        for log in range(len(gachalogs_history[gacha_name]) - 1, -1, -1):
-            pool_type = gachalogs_history[gacha_name][log]["cardPoolType"]
-            if pool_type == card_pool_type:
-                continue
-            if card_pool_type == "武器精准调谐" and pool_type == "角色精准调谐-2":
-                del gachalogs_history[gacha_name][log]
-            elif card_pool_type == "角色调谐（常驻池）" and pool_type == "武器精准调谐":
-                del gachalogs_history[gacha_name][log]
-            elif card_pool_type == "武器调谐（常驻池）" and pool_type == "全频调谐":
-                del gachalogs_history[gacha_name][log]
-            else:
-                gachalogs_history[gacha_name][log]["cardPoolType"] = card_pool_type
-
-            is_need_backup = True
-
-    if is_need_backup:
-        await backup_gachalogs(uid, temp_gachalogs_history, type="update")
-
-    for gacha_name in gacha_type_meta_data.keys():
-        gachalogs_history[gacha_name] = [GachaLog(**log) for log in gachalogs_history[gacha_name]]
+    store = GachaStore(uid)
+    await asyncio.to_thread(store.migrate)
 
     link_source_data: Dict[str, List[GachaLog]] = {}
     if record_id:
         code, gachalogs_new, gachalogs_count_add, link_source_data = await get_new_gachalog(
-            uid, record_id, gachalogs_history, is_force
-        )
-    elif not force_overwrite:
-        code, gachalogs_new, gachalogs_count_add = await get_new_gachalog_for_file(
-            gachalogs_history,
-            import_data,  # type: ignore
+            uid, record_id, store, is_force
         )
     else:
-        code, gachalogs_new, gachalogs_count_add = await get_new_gachalog_for_file(
-            import_data,
-            import_data,  # type: ignore
-        )
+        gachalogs_history = await asyncio.to_thread(store.read_all)
+
+        # import 时备份
+        if store.exists():
+            await backup_gachalogs(
+                uid,
+                {
+                    "uid": uid,
+                    "data": {name: [log.dict() for log in logs] for name, logs in gachalogs_history.items()},
+                },
+                type="import",
+            )
+
+        if not force_overwrite:
+            code, gachalogs_new, gachalogs_count_add = await get_new_gachalog_for_file(
+                gachalogs_history,
+                import_data,  # type: ignore
+            )
+        else:
+            code, gachalogs_new, gachalogs_count_add = await get_new_gachalog_for_file(
+                import_data,  # type: ignore
+                import_data,  # type: ignore
+            )
 
     if isinstance(code, str) or not gachalogs_new:
         return code or ERROR_MSG_INVALID_LINK
@@ -269,6 +315,11 @@ async def save_gachalogs(
     # 获取当前时间
     current_time = datetime.now().strftime("%Y-%m-%d %H-%M-%S")
 
+    # 链接导入时 gachalogs_new 为新增记录加上已保存的重叠部分，只追加新增的
+    overlap = {
+        gacha_name: len(logs) - gachalogs_count_add.get(gacha_name, 0) for gacha_name, logs in gachalogs_new.items()
+    }
+
     # 检查并修正时间降序
     for gacha_name in gacha_type_meta_data.keys():
         logs = gachalogs_new.get(gacha_name, [])
@@ -284,21 +335,16 @@ async def save_gachalogs(
                     gachalogs_new[gacha_name] = logs[i:]
                     break
 
-    # 初始化最后保存的数据
-    result = {"uid": uid, "data_time": current_time}
-
-    # 保存数量
     for gacha_name in gacha_type_meta_data.keys():
-        result[gacha_name] = len(gachalogs_new.get(gacha_name, []))  # type: ignore
-
-    result["data"] = {  # type: ignore
-        gacha_name: [log.dict() for log in gachalogs_new.get(gacha_name, [])]
-        for gacha_name in gacha_type_meta_data.keys()
-    }
+        logs = gachalogs_new.get(gacha_name, [])
+        if record_id:
+            await asyncio.to_thread(store.append, gacha_name, logs[: max(0, len(logs) - overlap[gacha_name])])
+        else:
+            await asyncio.to_thread(store.write, gacha_name, logs)
+    await asyncio.to_thread(store.save_meta, current_time)
 
-    vo = msgspec.to_builtins(result)
-    async with aiofiles.open(gachalogs_path, "w", encoding="UTF-8") as file:
-        await file.write(json.dumps(vo, ensure_ascii=False))
+    # 把新增记录累加到抽卡统计并更新抽卡排行索引
+    await update_gacha_rank_index(uid, await get_gacha_stats(uid))
 
     # 计算数据
     all_add = sum(gachalogs_count_add.values())
@@ -334,29 +380,59 @@ async def save_record_id(user_id, bot_id, uid, record_id):
         await WavesUser.insert_data(user_id, bot_id, record_id=record_id, uid=uid, game_id=WAVES_GAME_ID)
 
 
-async def import_gachalogs(ev: Event, history_url: str, type: str, uid: str, force_overwrite=False) -> str:
-    history_data: Dict = {}
+def load_import_data(history_url: str, type: str) -> Any:
+    """解析导入的文件，base64 内容直接按字节解析，gzip 压缩的先解压，不是 UTF-8 时按 GBK 解析"""
     if type == "json":
-        history_data = json.loads(history_url)
-    else:
-        data_bytes = base64.b64decode(history_url)
-        try:
-            history_data = json.loads(data_bytes.decode())
-        except UnicodeDecodeError:
-            history_data = json.loads(data_bytes.decode("gbk"))
-        except json.decoder.JSONDecodeError:
-            return "请传入正确的JSON格式文件!"
-
-    def turn_wwuid_gacha(data: Dict) -> Optional[WWUIDGacha]:
-        if "info" in data and "export_app" in data["info"]:
-            if "Waves-Plugin" == data["info"]["export_app"]:
-                return WavesPluginGacha.model_validate(data).turn_wwuid_gacha()
-            elif "XutheringWavesUID" == data["info"]["export_app"] or "WutheringWavesUID" == data["info"]["export_app"]:
-                return WWUIDGacha.model_validate(data)
+        return msgspec.json.decode(history_url)
+    data_bytes = base64.b64decode(history_url)
+    if data_bytes[:2] == GZIP_MAGIC:
+        data_bytes = gzip.decompress(data_bytes)
+    try:
+        return msgspec.json.decode(data_bytes)
+    except UnicodeDecodeError:
+        return msgspec.json.decode(data_bytes.decode("gbk"))
+
+
+def get_import_info(history_data: Any) -> Optional[WWUIDGachaInfo]:
+    if not isinstance(history_data, dict) or not isinstance(history_data.get("info"), dict):
         return None
+    info = history_data["info"]
+    if info.get("export_app") == "Waves-Plugin":
+        return WavesPluginGachaInfo.model_validate(info).turn_wwuid_gacha_info()
+    elif info.get("export_app") in ("XutheringWavesUID", "WutheringWavesUID"):
+        return WWUIDGachaInfo.model_validate(info)
+    return None
+
+
+def iter_import_gachalogs(history_data: Dict) -> Iterator[Tuple[str, GachaLog]]:
+    """逐条校验并转换导入的记录，返回卡池名和记录，不支持的卡池跳过"""
+    is_waves_plugin = history_data["info"]["export_app"] == "Waves-Plugin"
+    for raw in history_data.get("list") or []:
+        if is_waves_plugin:
+            item = GachaLog(**WavesPluginGachaItem.model_validate(raw).turn_wwuid_gacha_item().dict())
+        else:
+            item = GachaLog.model_validate(raw)
+
+        gacha_name = item.cardPoolType
+        if gacha_name in gacha_type_meta_data:
+            # 此时cardPoolType是名字 -> 如角色精准调谐
+            item.cardPoolType = gacha_type_meta_data[gacha_name]
+        else:
+            # 此时cardPoolType是类型 -> 如 "1"
+            gacha_name = gacha_type_meta_data_reverse.get(item.cardPoolType)
+            if not gacha_name:
+                continue
+        yield gacha_name, item
+
 
-    wwuid_gacha = turn_wwuid_gacha(history_data)
-    if not wwuid_gacha:
+async def import_gachalogs(ev: Event, history_url: str, type: str, uid: str, force_overwrite=False) -> str:
+    try:
+        history_data = await asyncio.to_thread(load_import_data, history_url, type)
+    except (UnicodeDecodeError, msgspec.DecodeError, EOFError, gzip.BadGzipFile):
+        return "请传入正确的JSON格式文件!"
+
+    info = get_import_info(history_data)
+    if not info:
         err_res = [
             "你当前导入的抽卡记录文件不支持, 目前支持的文件类型有:",
             "1.WutheringWavesUID",
@@ -365,27 +441,31 @@ async def import_gachalogs(ev: Event, history_url: str, type: str, uid: str, for
         ]
         return "\n".join(err_res)
 
-    if wwuid_gacha.info.uid != uid:
+    if info.uid != uid:
         return "你当前导入的抽卡记录文件的UID与当前UID不匹配!"
 
     import_data = copy.deepcopy(gachalogs_history_meta)
-    for item in wwuid_gacha.list:
-        gacha_name = item.cardPoolType
-        if gacha_name in gacha_type_meta_data:
-            # 此时cardPoolType是名字 -> 如角色精准调谐
-            item.cardPoolType = gacha_type_meta_data[gacha_name]
-        else:
-            # 此时cardPoolType是类型 -> 如 "1"
-            gacha_name = gacha_type_meta_data_reverse.get(item.cardPoolType)
-            if not gacha_name:
-                continue
-        import_data[gacha_name].append(GachaLog(**item.dict()))
+    for gacha_name, item in iter_import_gachalogs(history_data):
+        import_data[gacha_name].append(item)
+    del history_data
 
     res = await save_gachalogs(ev, uid, "", import_data=import_data, force_overwrite=force_overwrite)
     return res
 
 
-async def export_gachalogs(uid: str) -> dict:
+def write_gacha_export(store: GachaStore, path: Path, info: Dict, compress: bool):
+    """按卡池逐条写出，不在内存中拼出完整的导出文件"""
+    with gzip.open(path, "wb", compresslevel=6) if compress else Path.open(path, "wb") as f:
+        f.write(b'{"info": ' + msgspec.json.encode(info) + b', "list": [')
+        sep = b"\n"
+        for gacha_name in gacha_type_meta_data:
+            for log in store.iter_logs(gacha_name, reverse=True):
+                f.write(sep + msgspec.json.encode(log))
+                sep = b",\n"
+        f.write(b"\n]}\n")
+
+
+async def export_gachalogs(uid: str, compress: bool = False) -> dict:
     path = PLAYER_PATH / uid
     if not path.exists():
         path.mkdir(parents=True, exist_ok=True)
@@ -394,36 +474,25 @@ async def export_gachalogs(uid: str) -> dict:
     now = datetime.now()
     current_time = now.strftime("%Y-%m-%d %H:%M:%S")
 
-    # 抽卡记录json路径
-    gachalogs_path = path / "gacha_logs.json"
-    if gachalogs_path.exists():
-        async with aiofiles.open(gachalogs_path, "r", encoding="UTF-8") as f:
-            raw_data = json.loads(await f.read())
-
-        result = {
-            "info": {
-                "export_time": current_time,
-                "export_app": "XutheringWavesUID",
-                "export_app_version": XutheringWavesUID_version,
-                "export_timestamp": round(now.timestamp()),
-                "version": "v2.0",
-                "uid": uid,
-            },
-            "list": [],
+    store = GachaStore(uid)
+    if store.exists():
+        info = {
+            "export_time": current_time,
+            "export_app": "XutheringWavesUID",
+            "export_app_version": XutheringWavesUID_version,
+            "export_timestamp": round(now.timestamp()),
+            "version": "v2.0",
+            "uid": uid,
         }
-        gachalogs_history = raw_data["data"]
-        for name, gachalogs in gachalogs_history.items():
-            result["list"].extend(gachalogs)
-
-        async with aiofiles.open(path / f"export_{uid}.json", "w", encoding="UTF-8") as file:
-            await file.write(json.dumps(result, ensure_ascii=False, indent=4))
+        name = f"export_{uid}.json.gz" if compress else f"export_{uid}.json"
+        await asyncio.to_thread(write_gacha_export, store, path / name, info, compress)
 
         logger.success("[导出抽卡记录] 导出成功!")
         im = {
             "retcode": "ok",
             "data": "导出成功!",
-            "name": f"export_{uid}.json",
-            "url": str((path / f"export_{uid}.json").absolute()),
+            "name": name,
+            "url": str((path / name).absolute()),
         }
     else:
         logger.error("[导出抽卡记录] 没有找到抽卡记录!")
@@ -47,6 +47,18 @@ class WavesPluginGachaInfo(BaseModel):
     wwgf_version: str
     uid: str
 
+    def turn_wwuid_gacha_info(self) -> WWUIDGachaInfo:
+        export_timestamp = int(self.export_timestamp / 1000)
+        export_time = datetime.fromtimestamp(export_timestamp).strftime("%Y-%m-%d %H:%M:%S")
+        return WWUIDGachaInfo(
+            export_time=export_time,
+            export_app=self.export_app,
+            export_app_version=self.export_app_version,
+            export_timestamp=export_timestamp,
+            version=self.wwgf_version,
+            uid=self.uid,
+        )
+
 
 class WavesPluginGachaItem(BaseModel):
     gacha_id: str
@@ -59,33 +71,24 @@ class WavesPluginGachaItem(BaseModel):
     rank_type: str
     id: str
 
+    def turn_wwuid_gacha_item(self) -> WWUIDGachaItem:
+        return WWUIDGachaItem(
+            cardPoolType=turn_kuro_gacha_type.get(self.gacha_type, self.gacha_type),
+            resourceId=int(self.item_id),
+            qualityLevel=int(self.rank_type),
+            resourceType=self.item_type,
+            name=self.name,
+            count=int(self.count),
+            time=self.time,
+        )
+
 
 class WavesPluginGacha(BaseModel):
     info: WavesPluginGachaInfo
     list: List[WavesPluginGachaItem]
 
     def turn_wwuid_gacha(self) -> WWUIDGacha:
-        export_timestamp = int(self.info.export_timestamp / 1000)
-        export_time = datetime.fromtimestamp(export_timestamp).strftime("%Y-%m-%d %H:%M:%S")
         return WWUIDGacha(
-            info=WWUIDGachaInfo(
-                export_time=export_time,
-                export_app=self.info.export_app,
-                export_app_version=self.info.export_app_version,
-                export_timestamp=export_timestamp,
-                version=self.info.wwgf_version,
-                uid=self.info.uid,
-            ),
-            list=[
-                WWUIDGachaItem(
-                    cardPoolType=turn_kuro_gacha_type.get(item.gacha_type, item.gacha_type),
-                    resourceId=int(item.item_id),
-                    qualityLevel=int(item.rank_type),
-                    resourceType=item.item_type,
-                    name=item.name,
-                    count=int(item.count),
-                    time=item.time,
-                )
-                for item in self.list
-            ],
+            info=self.info.turn_wwuid_gacha_info(),
+            list=[item.turn_wwuid_gacha_item() for item in self.list],
         )
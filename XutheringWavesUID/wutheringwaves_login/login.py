@@ -5,7 +5,6 @@ import hashlib
 from typing import Union
 from pathlib import Path
 
-import httpx
 from pydantic import BaseModel
 from async_timeout import timeout
 from starlette.responses import HTMLResponse, RedirectResponse
@@ -23,6 +22,7 @@ from ..utils.cache import TimedCache
 from ..utils.constants import WAVES_GAME_ID
 from ..utils.waves_api import waves_api
 from ..wutheringwaves_user import deal
+from ..utils.api.http_client import http_client
 from ..utils.database.models import WavesBind, WavesUser
 from ..wutheringwaves_config import PREFIX, WutheringWavesConfig
 from ..utils.resource.RESOURCE_PATH import waves_templates
@@ -152,7 +152,7 @@ async def page_login_other(bot: Bot, ev: Event, url):
         await send_login(bot, ev, f"{url}/waves/i/{token}")
         return
 
-    async with httpx.AsyncClient() as client:
+    async with http_client(url) as client:
         try:
             r = await client.post(
                 url + "/waves/token",
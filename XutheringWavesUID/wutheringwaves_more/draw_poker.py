@@ -3,7 +3,6 @@ from pathlib import Path
 from PIL import Image, ImageDraw
 
 from gsuid_core.models import Event
-from gsuid_core.utils.image.convert import convert_img
 
 from ..utils.hint import error_reply
 from ..utils.image import (
@@ -17,6 +16,7 @@ from ..utils.api.model import MoreActivity, AccountBaseInfo
 from ..utils.imagetool import draw_pic_with_ring
 from ..utils.waves_api import waves_api
 from ..utils.error_reply import WAVES_CODE_102
+from ..utils.render_executor import convert_img
 from ..utils.fonts.waves_fonts import (
     waves_font_25,
     waves_font_26,
@@ -8,13 +8,13 @@ from gsuid_core.sv import get_plugin_available_prefix
 from gsuid_core.bot import Bot
 from gsuid_core.logger import logger
 from gsuid_core.models import Event
-from gsuid_core.utils.image.convert import convert_img
 from gsuid_core.utils.image.image_tools import crop_center_img
 
 from ..utils.image import add_footer, get_waves_bg, get_event_avatar
 from ..utils.api.model import Period, PeriodList, PeriodDetail, AccountBaseInfo
 from ..utils.waves_api import waves_api
 from ..utils.database.models import WavesBind
+from ..utils.render_executor import convert_img
 from ..utils.fonts.waves_fonts import (
     waves_font_24,
     waves_font_30,
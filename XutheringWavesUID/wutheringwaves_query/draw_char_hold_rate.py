@@ -3,14 +3,12 @@ import asyncio
 from typing import Dict, Union
 from pathlib import Path
 
-import httpx
 from PIL import Image, ImageDraw
 
 from gsuid_core.logger import logger
 from gsuid_core.models import Event
-from gsuid_core.utils.image.convert import convert_img
 
-from ..utils.util import timed_async_cache
+from ..utils.util import async_cache
 from ..utils.image import (
     GOLD,
     SPECIAL_GOLD,
@@ -23,8 +21,10 @@ from ..utils.image import (
 )
 from ..utils.api.wwapi import GET_HOLD_RATE_URL
 from ..utils.ascension.char import get_char_model
+from ..utils.api.http_client import http_client
 from ..utils.char_info_utils import get_all_role_detail_info_list
 from ..utils.database.models import WavesBind
+from ..utils.render_executor import convert_img
 from ..utils.fonts.waves_fonts import (
     waves_font_20,
     waves_font_24,
@@ -244,14 +244,15 @@ async def draw_pic(roleId):
     return img
 
 
-@timed_async_cache(
-    expiration=3600,
+@async_cache(
+    3600,
+    stale_ttl=3600,
     condition=lambda x: x,
 )
 async def get_char_hold_rate_data() -> Dict:
     """获取角色持有率数据"""
     try:
-        async with httpx.AsyncClient() as client:
+        async with http_client(GET_HOLD_RATE_URL) as client:
             response = await client.get(GET_HOLD_RATE_URL, timeout=10)
             response.raise_for_status()
             if response.status_code == 200:
@@ -6,13 +6,14 @@ from PIL import Image, ImageDraw
 
 from gsuid_core.logger import logger
 from gsuid_core.models import Event
-from gsuid_core.utils.image.convert import convert_img
 
-from ..utils.util import timed_async_cache
+from ..utils.util import async_cache
 from ..utils.image import get_ICON, add_footer, get_waves_bg, get_square_avatar
 from ..utils.api.wwapi import GET_TOWER_APPEAR_RATE, ABYSS_TYPE_MAP_REVERSE
 from ..utils.ascension.char import get_char_model
+from ..utils.api.http_client import http_client
 from ..utils.ascension.model import CharacterModel
+from ..utils.render_executor import convert_img
 from ..utils.fonts.waves_fonts import (
     waves_font_20,
     waves_font_30,
@@ -24,9 +25,9 @@ from ..utils.resource.constant import NAME_ALIAS
 TEXT_PATH = Path(__file__).parent / "texture2d"
 
 
-@timed_async_cache(expiration=3600, condition=lambda x: isinstance(x, dict))
+@async_cache(3600, stale_ttl=3600, condition=lambda x: isinstance(x, dict))
 async def get_tower_appear_rate_data() -> Union[Dict, None]:
-    async with httpx.AsyncClient() as client:
+    async with http_client(GET_TOWER_APPEAR_RATE) as client:
         try:
             res = await client.get(
                 GET_TOWER_APPEAR_RATE,
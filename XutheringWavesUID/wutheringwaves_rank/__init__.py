@@ -2,11 +2,16 @@ from gsuid_core.sv import SV
 from gsuid_core.bot import Bot
 from gsuid_core.models import Event
 
+from ..utils.image import has_random_image
 from .darw_rank_card import draw_rank_img
+from ..utils.card_cache import card_cache, get_dir_version, get_show_config_version
+from ..utils.rank_index import get_rank_index
 from .draw_all_rank_card import draw_all_rank_card
+from ..utils.name_convert import char_name_to_char_id
 from .draw_rank_list_card import draw_rank_list
 from .draw_total_rank_card import draw_total_rank
 from ..utils.char_info_utils import PATTERN
+from ..utils.resource.RESOURCE_PATH import CUSTOM_MR_CARD_PATH
 
 sv_waves_rank_list = SV("ww角色排行")
 sv_waves_rank_all_list = SV("ww角色总排行", priority=1)
@@ -27,7 +32,23 @@ async def send_rank_card(bot: Bot, ev: Event):
 
     char = char.replace("伤害", "").replace("评分", "").replace("本群", "").replace("群", "")
 
-    im = await draw_rank_img(bot, ev, char, rank_type)
+    # 排行卡片使用自定义背景，上传多张立绘的角色每次随机选取
+    char_id = char_name_to_char_id(char)
+    im = await card_cache.get_or_render(
+        "rank",
+        (
+            ev.bot_id,
+            ev.group_id,
+            ev.user_id,
+            char,
+            rank_type,
+            get_rank_index().generation,
+            get_show_config_version(),
+            get_dir_version(CUSTOM_MR_CARD_PATH),
+        ),
+        lambda: draw_rank_img(bot, ev, char, rank_type),
+        cacheable=not (char_id and has_random_image(CUSTOM_MR_CARD_PATH / char_id)),
+    )
 
     if isinstance(im, str):
         at_sender = True if ev.group_id else False
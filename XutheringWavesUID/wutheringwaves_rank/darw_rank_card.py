@@ -1,6 +1,6 @@
 import time
 import asyncio
-from typing import List, Union, Optional
+from typing import Dict, List, Tuple, Union, Optional
 from pathlib import Path
 
 from PIL import Image, ImageDraw
@@ -9,10 +9,8 @@ from pydantic import BaseModel
 from gsuid_core.bot import Bot
 from gsuid_core.logger import logger
 from gsuid_core.models import Event
-from gsuid_core.utils.image.convert import convert_img
 from gsuid_core.utils.image.image_tools import crop_center_img
 
-from ..utils.calc import WuWaCalc
 from ..utils.util import hide_uid
 from ..utils.cache import TimedCache
 from ..utils.image import (
@@ -31,15 +29,14 @@ from ..utils.image import (
     get_role_pile_default,
 )
 from ..utils.api.model import WeaponData, RoleDetailData
-from ..utils.calculate import (
-    get_calc_map,
-    calc_phantom_score,
-    get_total_score_bg,
-)
+from ..utils.rank_index import RANK_ROLE, get_rank_index, ensure_role_rank_index
 from ..utils.name_convert import alias_to_char_name, char_name_to_char_id
+from ..utils.role_snapshot import get_role_snapshot_map
+from ..utils.expression_ctx import WavesCharRank
 from ..utils.char_info_utils import get_all_role_detail_info_list
 from ..utils.damage.abstract import DamageRankRegister
 from ..utils.database.models import WavesBind, WavesUser
+from ..utils.render_executor import convert_img
 from ..wutheringwaves_config import PREFIX, WutheringWavesConfig
 from ..utils.fonts.waves_fonts import (
     waves_font_14,
@@ -82,53 +79,12 @@ class RankInfo(BaseModel):
     sonata_name: str  # 合鸣效果
 
 
-async def get_one_rank_info(user_id, uid, role_detail, rankDetail):
-    equipPhantomList = role_detail.phantomData.equipPhantomList
-
-    calc: WuWaCalc = WuWaCalc(role_detail)
-    calc.phantom_pre = calc.prepare_phantom()
-    calc.phantom_card = calc.enhance_summation_phantom_value(calc.phantom_pre)
-    calc.calc_temp = get_calc_map(
-        calc.phantom_card,
-        role_detail.role.roleName,
-        role_detail.role.roleId,
-    )
-
-    # 评分
-    phantom_score = 0
-    # calc_temp = get_calc_map(phantom_sum_value, role_detail.role.roleName)
-    for i, _phantom in enumerate(equipPhantomList):
-        if _phantom and _phantom.phantomProp:
-            props = _phantom.get_props()
-            _score, _bg = calc_phantom_score(role_detail.role.roleId, props, _phantom.cost, calc.calc_temp)
-            phantom_score += _score
-
-    if phantom_score == 0:
+def get_one_rank_info(user_id, uid, role_detail: RoleDetailData, char_rank: WavesCharRank) -> Optional[RankInfo]:
+    """由刷新时保存的评分/伤害快照组装排行条目"""
+    if char_rank.score == 0:
         return
 
-    phantom_score = round(phantom_score, 2)
-    phantom_bg = get_total_score_bg(role_detail.role.roleName, phantom_score, calc.calc_temp)
-
-    calc.role_card = calc.enhance_summation_card_value(calc.phantom_card)
-    calc.damageAttribute = calc.card_sort_map_to_attribute(calc.role_card)
-
-    if rankDetail:
-        crit_damage, expected_damage = rankDetail["func"](calc.damageAttribute, role_detail)
-    else:
-        expected_damage = "0"
-
-    sonata_name = ""
-    ph_detail = calc.phantom_card.get("ph_detail", [])
-    if isinstance(ph_detail, list):
-        for ph in ph_detail:
-            if ph.get("ph_num") == 5:
-                sonata_name = ph.get("ph_name", "")
-                break
-
-            if ph.get("isFull"):
-                sonata_name = ph.get("ph_name", "")
-                break
-
+    expected_damage = int(char_rank.expected_damage or 0)
     rankInfo = RankInfo(
         **{
             "roleDetail": role_detail,
@@ -137,11 +93,11 @@ async def get_one_rank_info(user_id, uid, role_detail, rankDetail):
             "level": role_detail.role.level,
             "chain": role_detail.get_chain_num(),
             "chainName": role_detail.get_chain_name(),
-            "score": round(int(phantom_score * 100) / 100, ndigits=2),
-            "score_bg": phantom_bg,
-            "expected_damage": expected_damage,
-            "expected_damage_int": int(expected_damage.replace(",", "")),
-            "sonata_name": sonata_name,
+            "score": round(int(char_rank.score * 100) / 100, ndigits=2),
+            "score_bg": char_rank.score_bg,
+            "expected_damage": f"{expected_damage:,}",
+            "expected_damage_int": expected_damage,
+            "sonata_name": char_rank.sonataName,
         }
     )
     return rankInfo
@@ -162,71 +118,83 @@ async def find_role_detail(uid: str, char_id: Union[int, str, List[str], List[in
     return next((role for role in role_details if str(role.role.roleId) in char_id_list), None)
 
 
-async def get_rank_info_for_user(
-    user: WavesBind,
-    char_id,
+def get_rank_sort_key(rank_type: str, score: float, damage: float, level: int, chain: int):
+    if rank_type == "评分":
+        return score, damage, level, chain
+    return damage, score, level, chain
+
+
+async def get_all_rank_info(
+    users: List[WavesBind],
     find_char_id,
-    rankDetail,
     tokenLimitFlag,
     wavesTokenUsersMap,
-):
-    rankInfoList = []
-    if not user.uid:
-        return rankInfoList
-
-    tasks = [find_role_detail(uid, find_char_id) for uid in user.uid.split("_")]
-    role_details = await asyncio.gather(*tasks)
-
-    for uid, role_detail in zip(user.uid.split("_"), role_details):
-        if (
-            tokenLimitFlag
-            and (
-                user.user_id,
-                uid,
-            )
-            not in wavesTokenUsersMap
-        ):
-            continue
-        if not role_detail:
-            continue
-        if not role_detail.phantomData or not role_detail.phantomData.equipPhantomList:
+    rank_type: str,
+    self_uid: Optional[str] = None,
+    self_user_id: Optional[str] = None,
+) -> Tuple[List[RankInfo], Optional[int]]:
+    """从排行索引中取前rank_length名和自己的排名，只为展示的条目加载面板"""
+    uid_users: Dict[str, List[str]] = {}
+    for user in users:
+        if not user.uid:
             continue
+        for uid in user.uid.split("_"):
+            if tokenLimitFlag and (user.user_id, uid) not in wavesTokenUsersMap:
+                continue
+            uid_users.setdefault(uid, []).append(user.user_id)
 
-        rankInfo = await get_one_rank_info(user.user_id, uid, role_detail, rankDetail)
-        if not rankInfo:
-            continue
-        rankInfoList.append(rankInfo)
+    if not uid_users:
+        return [], None
 
-    return rankInfoList
+    if isinstance(find_char_id, (int, str)):
+        char_id_list = [int(find_char_id)]
+    else:
+        char_id_list = [int(cid) for cid in find_char_id]
 
+    await ensure_role_rank_index(uid_users.keys())
+    rows = await get_rank_index().query(RANK_ROLE, uid_users.keys(), keys=char_id_list)
 
-async def get_all_rank_info(
-    users: List[WavesBind],
-    char_id,
-    find_char_id,
-    rankDetail,
-    tokenLimitFlag,
-    wavesTokenUsersMap,
-):
-    semaphore = asyncio.Semaphore(50)
-
-    async def process_user(user):
-        async with semaphore:
-            return await get_rank_info_for_user(
-                user,
-                char_id,
-                find_char_id,
-                rankDetail,
-                tokenLimitFlag,
-                wavesTokenUsersMap,
-            )
+    # 漂泊者多形态时每个uid只取最好的一条
+    best: Dict[str, Tuple] = {}
+    for row in rows:
+        if row.value <= 0:
+            continue
+        sort_key = get_rank_sort_key(
+            rank_type, row.value, row.extra, row.payload.get("level", 0), row.payload.get("chain", 0)
+        )
+        if row.uid not in best or sort_key > best[row.uid][0]:
+            best[row.uid] = (sort_key, row.key)
+
+    candidates = [
+        (sort_key, user_id, uid, role_id) for uid, (sort_key, role_id) in best.items() for user_id in uid_users[uid]
+    ]
+    candidates.sort(key=lambda i: i[0], reverse=True)
+
+    rankId = next(
+        (
+            index
+            for index, (_, user_id, uid, _) in enumerate(candidates, start=1)
+            if uid == self_uid and user_id == self_user_id
+        ),
+        None,
+    )
+    display = candidates[:rank_length]
+    if rankId and rankId > rank_length:
+        display.append(candidates[rankId - 1])
 
-    tasks = [process_user(user) for user in users]
-    results = await asyncio.gather(*tasks)
+    rankInfoList = []
+    for _, user_id, uid, role_id in display:
+        role_detail = await find_role_detail(uid, role_id)
+        if not role_detail or not role_detail.phantomData or not role_detail.phantomData.equipPhantomList:
+            continue
+        char_rank = (await get_role_snapshot_map(uid)).get(role_detail.role.roleId)
+        if not char_rank:
+            continue
+        rankInfo = get_one_rank_info(user_id, uid, role_detail, char_rank)
+        if rankInfo:
+            rankInfoList.append(rankInfo)
 
-    # Flatten the results list
-    rankInfoList = [rank_info for result in results for rank_info in result]
-    return rankInfoList
+    return rankInfoList, rankId
 
 
 async def get_waves_token_condition(ev):
@@ -292,13 +260,14 @@ async def draw_rank_img(bot: Bot, ev: Event, char: str, rank_type: str) -> Union
         pass
 
     damage_title = (rankDetail and rankDetail["title"]) or "无"
-    rankInfoList = await get_all_rank_info(
+    rankInfoList, rankId = await get_all_rank_info(
         list(users),
-        char_id,
         find_char_id,
-        rankDetail,
         tokenLimitFlag,
         wavesTokenUsersMap,
+        rank_type,
+        self_uid,
+        ev.user_id,
     )
     if len(rankInfoList) == 0:
         msg = []
@@ -309,34 +278,6 @@ async def draw_rank_img(bot: Bot, ev: Event, char: str, rank_type: str) -> Union
         msg.append("")
         return "\n".join(msg)
 
-    if rank_type == "评分":
-        rankInfoList.sort(
-            key=lambda i: (i.score, i.expected_damage_int, i.level, i.chain),
-            reverse=True,
-        )
-    else:
-        rankInfoList.sort(
-            key=lambda i: (i.expected_damage_int, i.score, i.level, i.chain),
-            reverse=True,
-        )
-
-    rankId = None
-    rankInfo = None
-
-    if not rankId:
-        rankId, rankInfo = next(
-            (
-                (rankId, rankInfo)
-                for rankId, rankInfo in enumerate(rankInfoList, start=1)
-                if rankInfo.uid == self_uid and ev.user_id == rankInfo.qid
-            ),
-            (None, None),
-        )
-
-    rankInfoList = rankInfoList[:rank_length]
-    if rankId and rankInfo and rankId > rank_length:
-        rankInfoList.append(rankInfo)
-
     totalNum = len(rankInfoList)
     title_h = 500
     bar_star_h = 110
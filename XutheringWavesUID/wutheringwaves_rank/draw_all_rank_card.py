@@ -10,7 +10,6 @@ from PIL import Image, ImageDraw
 from gsuid_core.bot import Bot
 from gsuid_core.logger import logger
 from gsuid_core.models import Event
-from gsuid_core.utils.image.convert import convert_img
 
 from ..utils.util import get_version
 from ..utils.cache import TimedCache
@@ -46,7 +45,9 @@ from ..utils.api.wwapi import (
 from ..utils.waves_api import waves_api
 from ..utils.name_convert import alias_to_char_name, char_name_to_char_id
 from ..utils.ascension.char import get_char_model
+from ..utils.api.http_client import http_client
 from ..utils.database.models import WavesBind
+from ..utils.render_executor import convert_img
 from ..wutheringwaves_config import WutheringWavesConfig
 from ..utils.ascension.weapon import get_weapon_model
 from ..utils.fonts.waves_fonts import (
@@ -95,7 +96,7 @@ async def get_rank(item: RankItem) -> Optional[RankInfoResponse]:
     if not WavesToken:
         return
 
-    async with httpx.AsyncClient() as client:
+    async with http_client(GET_RANK_URL) as client:
         try:
             res = await client.post(
                 GET_RANK_URL,
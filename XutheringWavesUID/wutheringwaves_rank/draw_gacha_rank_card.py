@@ -4,9 +4,7 @@ from pathlib import Path
 
 from PIL import Image, ImageDraw
 
-from gsuid_core.logger import logger
 from gsuid_core.models import Event
-from gsuid_core.utils.image.convert import convert_img
 
 from .slash_rank import get_avatar
 from ..utils.image import (
@@ -16,7 +14,9 @@ from ..utils.image import (
     add_footer,
     get_waves_bg,
 )
+from ..utils.rank_index import RANK_GACHA, get_rank_index, ensure_gacha_rank_index
 from ..utils.database.models import WavesBind, WavesUser
+from ..utils.render_executor import convert_img
 from ..wutheringwaves_config import PREFIX, WutheringWavesConfig
 from ..utils.fonts.waves_fonts import (
     waves_font_18,
@@ -25,7 +25,6 @@ from ..utils.fonts.waves_fonts import (
     waves_font_34,
     waves_font_58,
 )
-from ..wutheringwaves_gachalog.draw_gachalogs import get_gacha_stats
 
 TEXT_PATH = Path(__file__).parent / "texture2d"
 avatar_mask = Image.open(TEXT_PATH / "avatar_mask.png")
@@ -68,9 +67,8 @@ async def get_all_gacha_rank_info(
     tokenLimitFlag: bool = False,
     wavesTokenUsersMap: Optional[Dict[Tuple[str, str], str]] = None,
 ) -> List[GachaRankCard]:
-    """获取所有用户的抽卡排行信息"""
-    rankInfoList = []
-
+    """获取所有用户的抽卡排行信息，统计数据从排行索引读取"""
+    uid_users: Dict[str, List[str]] = {}
     for user in users:
         if not user.user_id:
             continue
@@ -82,21 +80,17 @@ async def get_all_gacha_rank_info(
             if tokenLimitFlag and wavesTokenUsersMap is not None:
                 if (user.user_id, uid) not in wavesTokenUsersMap:
                     continue
-            try:
-                stats = await get_gacha_stats(uid)
-                if not stats:
-                    continue
-
-                rankInfo = GachaRankCard(user.user_id, uid, stats)
+            uid_users.setdefault(uid, []).append(user.user_id)
 
-                min_pull = WutheringWavesConfig.get_config("GachaRankMin").data
-                if rankInfo.total_count < min_pull:
-                    continue
+    await ensure_gacha_rank_index(uid_users.keys())
 
-                rankInfoList.append(rankInfo)
-            except Exception as e:
-                logger.debug(f"获取用户{uid}抽卡排行数据失败: {e}")
-                continue
+    min_pull = WutheringWavesConfig.get_config("GachaRankMin").data
+    rankInfoList = []
+    for row in await get_rank_index().query(RANK_GACHA, uid_users.keys()):
+        if row.extra < min_pull:
+            continue
+        for user_id in uid_users[row.uid]:
+            rankInfoList.append(GachaRankCard(user_id, row.uid, row.payload))
 
     return rankInfoList
 
@@ -1,20 +1,16 @@
-import json
 import time
 import asyncio
 from typing import Dict, List, Tuple, Union, Optional
 from pathlib import Path
 
-import aiofiles
 from PIL import Image, ImageDraw
 from pydantic import BaseModel
 
 from gsuid_core.bot import Bot
 from gsuid_core.logger import logger
 from gsuid_core.models import Event
-from gsuid_core.utils.image.convert import convert_img
 
 from .slash_rank import get_avatar
-from ..utils.calc import WuWaCalc
 from ..utils.cache import TimedCache
 from ..utils.image import (
     RED,
@@ -32,13 +28,9 @@ from ..utils.image import (
     get_square_avatar,
     get_custom_waves_bg,
 )
-from ..utils.api.model import RoleDetailData
-from ..utils.calculate import (
-    get_calc_map,
-    calc_phantom_score,
-)
-from ..utils.char_info_utils import get_all_role_detail_info_list
+from ..utils.rank_index import RANK_ROLE, get_rank_index, ensure_role_rank_index
 from ..utils.database.models import WavesBind, WavesUser
+from ..utils.render_executor import convert_img
 from ..wutheringwaves_config import PREFIX, WutheringWavesConfig
 from ..utils.fonts.waves_fonts import (
     waves_font_12,
@@ -50,7 +42,6 @@ from ..utils.fonts.waves_fonts import (
     waves_font_34,
     waves_font_58,
 )
-from ..utils.resource.RESOURCE_PATH import PLAYER_PATH
 
 
 async def get_practice_rank_token_condition(ev) -> Tuple[bool, Dict[Tuple[str, str], str]]:
@@ -74,77 +65,6 @@ async def get_practice_rank_token_condition(ev) -> Tuple[bool, Dict[Tuple[str, s
     return tokenLimitFlag, wavesTokenUsersMap
 
 
-def calculate_role_phantom_score(role_detail: RoleDetailData) -> float:
-    """计算单个角色的声骸总分
-
-    Args:
-        role_detail: 角色详情
-
-    Returns:
-        角色的声骸总分
-    """
-    if not role_detail.phantomData or not role_detail.phantomData.equipPhantomList:
-        return 0.0
-
-    calc: WuWaCalc = WuWaCalc(role_detail)
-    calc.phantom_pre = calc.prepare_phantom()
-    calc.phantom_card = calc.enhance_summation_phantom_value(calc.phantom_pre)
-    calc.calc_temp = get_calc_map(
-        calc.phantom_card,
-        role_detail.role.roleName,
-        role_detail.role.roleId,
-    )
-
-    phantom_score = 0.0
-    for _phantom in role_detail.phantomData.equipPhantomList:
-        if _phantom and _phantom.phantomProp:
-            props = _phantom.get_props()
-            _score, _ = calc_phantom_score(role_detail.role.roleId, props, _phantom.cost, calc.calc_temp)
-            phantom_score += _score
-
-    return phantom_score
-
-
-async def save_char_list_data(uid: str, char_list_data: Dict):
-    """保存角色评分数据到charListData.json
-
-    Args:
-        uid: 用户uid
-        char_list_data: 角色评分字典，格式为 {roleId: score}
-    """
-    try:
-        _dir = PLAYER_PATH / uid
-        _dir.mkdir(parents=True, exist_ok=True)
-        path = _dir / "charListData.json"
-
-        async with aiofiles.open(path, "w", encoding="utf-8") as file:
-            await file.write(json.dumps(char_list_data, ensure_ascii=False))
-    except Exception as e:
-        logger.debug(f"保存charListData.json失败 uid={uid}: {e}")
-
-
-async def load_char_list_data(uid: str) -> Optional[Dict]:
-    """从charListData.json读取角色评分数据
-
-    Args:
-        uid: 用户uid
-
-    Returns:
-        角色评分字典，格式为 {roleId: score}，如果文件不存在返回None
-    """
-    try:
-        path = PLAYER_PATH / uid / "charListData.json"
-        if not path.exists():
-            return None
-
-        async with aiofiles.open(path, mode="r", encoding="utf-8") as f:
-            char_list_data = json.loads(await f.read())
-            return char_list_data
-    except Exception as e:
-        logger.debug(f"读取charListData.json失败 uid={uid}: {e}")
-        return None
-
-
 TEXT_PATH = Path(__file__).parent / "texture2d"
 avatar_mask = Image.open(TEXT_PATH / "avatar_mask.png")
 char_mask = Image.open(TEXT_PATH / "char_mask.png")
@@ -167,7 +87,7 @@ class PracticeRankInfo(BaseModel):
     uid: str  # uid
     kuro_name: str  # 玩家名字
     total_score: float  # 总声骸分数
-    role_details: List[RoleDetailData]  # 角色详情列表
+    role_scores: List[Tuple[int, float]]  # 计入排行的角色id和声骸分数
 
 
 async def get_all_rank_list_info(
@@ -178,12 +98,13 @@ async def get_all_rank_list_info(
 ) -> List[PracticeRankInfo]:
     """获取所有用户的练度排行信息（基于声骸分数）
 
+    分数直接从排行索引读取，不需要加载角色面板。
+
     Args:
         users: 用户列表
         threshold: 计入排行的角色声骸分数阈值 (150-195)
     """
-    rankInfoList = []
-
+    uid_users: Dict[str, List[str]] = {}
     for user in users:
         if not user.uid:
             continue
@@ -193,79 +114,29 @@ async def get_all_rank_list_info(
             if tokenLimitFlag and wavesTokenUsersMap is not None:
                 if (user.user_id, uid) not in wavesTokenUsersMap:
                     continue
-            # 首先尝试从charListData.json读取缓存的角色评分
-            char_list_data = await load_char_list_data(uid)
-
-            if char_list_data:
-                # 使用缓存的角色评分数据
-                total_score = 0.0
-                valid_role_ids = []
-
-                for role_id_str, score in char_list_data.items():
-                    if score >= threshold:
-                        total_score += score
-                        valid_role_ids.append(role_id_str)
-
-                if total_score == 0:
-                    continue
-
-                total_score = round(total_score, 2)
-
-                # 获取角色详情用于排行展示
-                role_details_list = await get_all_role_detail_info_list(uid)
-                if role_details_list is None:
-                    continue
-
-                role_details = [r for r in role_details_list if str(r.role.roleId) in valid_role_ids]
-
-                rankInfo = PracticeRankInfo(
-                    qid=user.user_id,
-                    uid=uid,
-                    kuro_name=uid,
-                    total_score=total_score,
-                    role_details=role_details,
-                )
-                rankInfoList.append(rankInfo)
-            else:
-                # charListData.json不存在，从rawData计算并保存
-                role_details_list = await get_all_role_detail_info_list(uid)
-                if role_details_list is None:
-                    continue
+            uid_users.setdefault(uid, []).append(user.user_id)
 
-                role_details = list(role_details_list)
-                if not role_details:
-                    continue
-
-                # 计算总声骸分数并保存到charListData
-                total_score = 0.0
-                valid_role_details = []
-                char_list_data = {}
-
-                for role_detail in role_details:
-                    phantom_score = calculate_role_phantom_score(role_detail)
-                    char_list_data[str(role_detail.role.roleId)] = phantom_score
-
-                    # 只计算分数>=阈值的角色
-                    if phantom_score >= threshold:
-                        total_score += phantom_score
-                        valid_role_details.append(role_detail)
+    await ensure_role_rank_index(uid_users.keys())
+    rows = await get_rank_index().query(RANK_ROLE, uid_users.keys(), min_value=threshold)
 
-                # 保存计算结果到charListData.json
-                if char_list_data:
-                    await save_char_list_data(uid, char_list_data)
+    uid_scores: Dict[str, List[Tuple[int, float]]] = {}
+    for row in rows:
+        uid_scores.setdefault(row.uid, []).append((row.key, row.value))
 
-                if total_score == 0:
-                    continue
-
-                total_score = round(total_score, 2)
-                rankInfo = PracticeRankInfo(
-                    qid=user.user_id,
-                    uid=uid,
-                    kuro_name=uid,
-                    total_score=total_score,
-                    role_details=valid_role_details,
-                )
-                rankInfoList.append(rankInfo)
+    rankInfoList = []
+    for uid, scores in uid_scores.items():
+        total_score = round(sum(score for _, score in scores), 2)
+        if total_score == 0:
+            continue
+        for user_id in uid_users[uid]:
+            rankInfo = PracticeRankInfo(
+                qid=user_id,
+                uid=uid,
+                kuro_name=uid,
+                total_score=total_score,
+                role_scores=scores,
+            )
+            rankInfoList.append(rankInfo)
 
     return rankInfoList
 
@@ -427,33 +298,13 @@ async def draw_rank_list(bot: Bot, ev: Event, threshold: int = 175) -> Union[str
         bar_draw.text((210, 40), f"{rankInfo.uid}", uid_color, waves_font_20, "lm")
 
         # 绘制角色数量（根据等级显示）
-        char_count = len(rankInfo.role_details)
+        char_count = len(rankInfo.role_scores)
         bar_draw.text((210, 75), f"{threshold_label}角色数: {char_count}", "white", waves_font_18, "lm")
 
         # 绘制角色信息
-        if rankInfo.role_details:
-            # 按声骸分数排序，取前5名
-            role_scores = []
-            for role in rankInfo.role_details:
-                if not role.phantomData or not role.phantomData.equipPhantomList:
-                    continue
-                calc: WuWaCalc = WuWaCalc(role)
-                calc.phantom_pre = calc.prepare_phantom()
-                calc.phantom_card = calc.enhance_summation_phantom_value(calc.phantom_pre)
-                calc.calc_temp = get_calc_map(
-                    calc.phantom_card,
-                    role.role.roleName,
-                    role.role.roleId,
-                )
-                phantom_score = 0.0
-                for _phantom in role.phantomData.equipPhantomList:
-                    if _phantom and _phantom.phantomProp:
-                        props = _phantom.get_props()
-                        _score, _ = calc_phantom_score(role.role.roleId, props, _phantom.cost, calc.calc_temp)
-                        phantom_score += _score
-                role_scores.append((role, phantom_score))
-
-            sorted_roles = sorted(role_scores, key=lambda x: x[1], reverse=True)[:8]
+        if rankInfo.role_scores:
+            # 按声骸分数排序，取前8名
+            sorted_roles = sorted(rankInfo.role_scores, key=lambda x: x[1], reverse=True)[:8]
 
             # 在条目底部绘制前5名角色的头像（放在UID右边）
             char_size = 40
@@ -461,11 +312,11 @@ async def draw_rank_list(bot: Bot, ev: Event, threshold: int = 175) -> Union[str
             char_start_x = 350
             char_start_y = 35
 
-            for i, (role, score) in enumerate(sorted_roles):
+            for i, (role_id, score) in enumerate(sorted_roles):
                 char_x = char_start_x + i * char_spacing
 
                 # 获取角色头像
-                char_avatar = await get_square_avatar(role.role.roleId)
+                char_avatar = await get_square_avatar(role_id)
                 char_avatar = char_avatar.resize((char_size, char_size))
 
                 # 应用圆形遮罩
@@ -9,7 +9,6 @@ from PIL import Image, ImageDraw
 from gsuid_core.bot import Bot
 from gsuid_core.logger import logger
 from gsuid_core.models import Event
-from gsuid_core.utils.image.convert import convert_img
 
 from .slash_rank import get_avatar
 from ..utils.util import get_version
@@ -35,7 +34,9 @@ from ..utils.api.wwapi import (
     TotalRankRequest,
     TotalRankResponse,
 )
+from ..utils.api.http_client import http_client
 from ..utils.database.models import WavesBind
+from ..utils.render_executor import convert_img
 from ..wutheringwaves_config import WutheringWavesConfig
 from ..utils.fonts.waves_fonts import (
     waves_font_12,
@@ -71,7 +72,7 @@ async def get_rank(item: TotalRankRequest) -> Optional[TotalRankResponse]:
     if not WavesToken:
         return
 
-    async with httpx.AsyncClient() as client:
+    async with http_client(GET_TOTAL_RANK_URL) as client:
         try:
             res = await client.post(
                 GET_TOTAL_RANK_URL,
@@ -14,7 +14,6 @@ from PIL import Image, ImageDraw
 from gsuid_core.bot import Bot
 from gsuid_core.logger import logger
 from gsuid_core.models import Event
-from gsuid_core.utils.image.convert import convert_img
 from gsuid_core.utils.image.image_tools import crop_center_img
 
 from ..utils.util import get_version
@@ -44,7 +43,9 @@ from ..utils.api.wwapi import (
     SlashRankItem,
 )
 from ..utils.ascension.char import get_char_model
+from ..utils.api.http_client import http_client
 from ..utils.database.models import WavesBind, WavesUser
+from ..utils.render_executor import convert_img
 from ..wutheringwaves_config import PREFIX, WutheringWavesConfig
 from ..utils.fonts.waves_fonts import (
     waves_font_12,
@@ -145,7 +146,7 @@ async def get_rank(item: SlashRankItem) -> Optional[SlashRankRes]:
     if not WavesToken:
         return
 
-    async with httpx.AsyncClient() as client:
+    async with http_client(GET_SLASH_RANK_URL) as client:
         try:
             res = await client.post(
                 GET_SLASH_RANK_URL,
@@ -418,22 +419,35 @@ async def get_avatar(
 
 
 class SlashRankListInfo:
-    """无尽排行信息"""
+    """无尽排行信息，分数来自排行索引，出场角色等详情只为展示的条目读取"""
 
-    def __init__(self, user_id: str, uid: str, slash_data: Optional[SlashDetail] = None):
+    def __init__(self, user_id: str, uid: str, score: int, slash_data: Optional[SlashDetail] = None):
         self.user_id = user_id
         self.uid = uid
+        self.score = score
         self.slash_data = slash_data
-        self.score = 0
 
-        if slash_data and slash_data.difficultyList:
-            # 获取难度12的分数
-            difficulty_12 = next((k for k in slash_data.difficultyList if k.difficulty == 2), None)
-            if difficulty_12 and difficulty_12.challengeList:
-                challenge = difficulty_12.challengeList[0]
-                if challenge.halfList:
-                    # 计算总分数
-                    self.score = sum(half.score for half in challenge.halfList)
+
+async def load_local_slash_data(uid: str) -> Tuple[Optional[int], Optional[SlashDetail]]:
+    """读取本地无尽数据，返回 (记录时间, 数据)"""
+    from ..utils.resource.RESOURCE_PATH import PLAYER_PATH
+
+    slash_data_path = Path(PLAYER_PATH / uid / "slashData.json")
+    if not slash_data_path.exists():
+        return None, None
+
+    async with aiofiles.open(slash_data_path, mode="r", encoding="utf-8") as f:
+        slash_raw = json.loads(await f.read())
+
+    record_time = None
+    slash_data = slash_raw
+    if isinstance(slash_raw, dict) and "slash_data" in slash_raw:
+        record_time = slash_raw.get("record_time", SLASH_BASE_TIMESTAMP)
+        slash_data = slash_raw.get("slash_data")
+
+    if not isinstance(slash_data, dict) or not slash_data:
+        return record_time, None
+    return record_time, SlashDetail.model_validate(slash_data)
 
 
 async def get_all_slash_rank_info(
@@ -441,11 +455,15 @@ async def get_all_slash_rank_info(
     tokenLimitFlag: bool = False,
     wavesTokenUsersMap: Optional[Dict[Tuple[str, str], str]] = None,
 ) -> List[SlashRankListInfo]:
-    """从本地获取所有用户的无尽排行信息"""
-    from ..utils.resource.RESOURCE_PATH import PLAYER_PATH
-
-    rankInfoList = []
+    """从排行索引获取所有用户的无尽排行信息"""
+    from ..utils.rank_index import (
+        RANK_SLASH,
+        get_rank_index,
+        get_slash_rank_score,
+        update_slash_rank_index,
+    )
 
+    uid_users: List[Tuple[str, str]] = []
     for user in users:
         if not user.uid:
             continue
@@ -455,55 +473,40 @@ async def get_all_slash_rank_info(
             if tokenLimitFlag and wavesTokenUsersMap is not None:
                 if (user.user_id, uid) not in wavesTokenUsersMap:
                     continue
-            # 从本地读取该用户的无尽数据
-            try:
-                slash_data_path = Path(PLAYER_PATH / uid / "slashData.json")
-                if not slash_data_path.exists():
-                    continue
-
-                async with aiofiles.open(slash_data_path, mode="r", encoding="utf-8") as f:
-                    slash_raw = json.loads(await f.read())
-
-                record_time = None
-                slash_data = slash_raw
-                if isinstance(slash_raw, dict) and "slash_data" in slash_raw:
-                    record_time = slash_raw.get("record_time", SLASH_BASE_TIMESTAMP)
-                    slash_data = slash_raw.get("slash_data")
-
-                if not isinstance(slash_data, dict) or not slash_data:
-                    continue
-
-                if is_slash_record_expired(record_time):
-                    logger.debug(f"用户{uid}无尽数据已过期，跳过")
-                    continue
-
-                if not slash_data.get("isUnlock", False):
-                    continue
+            uid_users.append((user.user_id, uid))
 
-                slash_data = SlashDetail.model_validate(slash_data)
+    # 还没有建索引的uid读取一次本地文件补建，之后只读索引
+    rank_index = get_rank_index()
+    for uid in await rank_index.missing(RANK_SLASH, [uid for _, uid in uid_users]):
+        try:
+            record_time, slash_data = await load_local_slash_data(uid)
+            await update_slash_rank_index(uid, get_slash_rank_score(slash_data), record_time or SLASH_BASE_TIMESTAMP)
+        except Exception as e:
+            logger.debug(f"获取用户{uid}本地无尽数据失败: {e}")
 
-                rankInfo = SlashRankListInfo(user.user_id, uid, slash_data)
-                if rankInfo.score > 0:
-                    rankInfoList.append(rankInfo)
-            except Exception as e:
-                logger.debug(f"获取用户{uid}本地无尽数据失败: {e}")
-                continue
+    rows = {row.uid: row for row in await rank_index.query(RANK_SLASH, [uid for _, uid in uid_users])}
+    rankInfoList = []
+    for user_id, uid in uid_users:
+        row = rows.get(uid)
+        if row is None:
+            continue
+        if is_slash_record_expired(int(row.extra)):
+            logger.debug(f"用户{uid}无尽数据已过期，跳过")
+            continue
+        rankInfoList.append(SlashRankListInfo(user_id, uid, int(row.value)))
 
     return rankInfoList
 
 
 async def get_role_chain_count(uid: str, role_id: int) -> int:
-    """从rawData.json获取角色共鸣链数量"""
-    from ..utils.resource.RESOURCE_PATH import PLAYER_PATH
+    """从面板数据获取角色共鸣链数量"""
+    from ..utils.player_store import get_player_store
 
     try:
-        raw_data_path = Path(PLAYER_PATH / str(uid) / "rawData.json")
-        if not raw_data_path.exists():
+        raw_data = await get_player_store().load_roles(str(uid))
+        if raw_data is None:
             return -1
 
-        async with aiofiles.open(raw_data_path, mode="r", encoding="utf-8") as f:
-            raw_data = json.loads(await f.read())
-
         # rawData是一个列表，包含每个角色的详细信息
         if isinstance(raw_data, list):
             for role_data in raw_data:
@@ -520,16 +523,13 @@ async def get_role_chain_count(uid: str, role_id: int) -> int:
 
 async def get_five_star_chain_total(uid: str) -> int:
     """计算五星角色的金数（0链=1金，6链=7金，即链数+1）"""
-    from ..utils.resource.RESOURCE_PATH import PLAYER_PATH
+    from ..utils.player_store import get_player_store
 
     try:
-        raw_data_path = Path(PLAYER_PATH / str(uid) / "rawData.json")
-        if not raw_data_path.exists():
+        raw_data = await get_player_store().load_roles(str(uid))
+        if raw_data is None:
             return 0
 
-        async with aiofiles.open(raw_data_path, mode="r", encoding="utf-8") as f:
-            raw_data = json.loads(await f.read())
-
         total_gold = 0
         if isinstance(raw_data, list):
             for role_data in raw_data:
@@ -603,6 +603,13 @@ async def draw_slash_rank_list(bot: Bot, ev: Event):
     if rankId and rankInfo and rankId > rank_length:
         rankInfoList_display.append(rankInfo)
 
+    # 只为展示的条目读取出场角色和信物
+    for item in rankInfoList_display:
+        try:
+            _, item.slash_data = await load_local_slash_data(item.uid)
+        except Exception as e:
+            logger.debug(f"获取用户{item.uid}本地无尽数据失败: {e}")
+
     # 设置图像尺寸
     width = 1000
     item_spacing = 120
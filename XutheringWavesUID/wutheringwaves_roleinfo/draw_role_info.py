@@ -4,7 +4,6 @@ from pathlib import Path
 from PIL import Image, ImageDraw
 
 from gsuid_core.models import Event
-from gsuid_core.utils.image.convert import convert_img
 
 from ..utils.image import (
     GOLD,
@@ -26,6 +25,7 @@ from ..utils.api.model import (
 from ..utils.imagetool import draw_pic_with_ring
 from ..utils.waves_api import waves_api
 from ..utils.char_info_utils import get_all_roleid_detail_info_int
+from ..utils.render_executor import convert_img
 from ..utils.fonts.waves_fonts import (
     waves_font_25,
     waves_font_26,
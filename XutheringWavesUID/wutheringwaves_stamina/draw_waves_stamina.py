@@ -9,7 +9,6 @@ from PIL import Image, ImageDraw
 from gsuid_core.bot import Bot
 from gsuid_core.logger import logger
 from gsuid_core.models import Event
-from gsuid_core.utils.image.convert import convert_img
 from gsuid_core.utils.image.image_tools import crop_center_img
 
 from ..utils.image import (
@@ -29,6 +28,7 @@ from ..utils.waves_api import waves_api
 from ..utils.error_reply import ERROR_CODE, WAVES_CODE_102, WAVES_CODE_103
 from ..utils.name_convert import char_name_to_char_id
 from ..utils.database.models import WavesBind, WavesUser
+from ..utils.render_executor import convert_img
 from ..utils.api.request_util import KuroApiResp
 from ..utils.fonts.waves_fonts import (
     waves_font_24,
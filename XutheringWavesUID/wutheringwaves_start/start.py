@@ -1,11 +1,17 @@
 from gsuid_core.logger import logger
-from gsuid_core.server import on_core_start
+from gsuid_core.server import on_core_start, on_core_shutdown
 
+from ..utils.waves_api import waves_api
+from ..utils.queues.queues import dispatcher
+from ..utils.import_profile import report_import_profile
+from ..utils.api.http_client import http_clients
 from ..wutheringwaves_resource import startup
+from ..utils.queues.upload_queue import upload_queue
 
 
 @on_core_start
 async def all_start():
+    report_import_profile()
     logger.info("[鸣潮] 启动中...")
     try:
         await startup()
@@ -14,3 +20,11 @@ async def all_start():
         logger.exception(e)
 
     logger.success("[鸣潮] 启动完成✅")
+
+
+@on_core_shutdown
+async def all_shutdown():
+    await dispatcher.stop()
+    await upload_queue.stop()
+    await http_clients.close()
+    await waves_api.close_sessions()
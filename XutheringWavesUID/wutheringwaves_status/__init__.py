@@ -1,7 +1,13 @@
 from gsuid_core.status.plugin_status import register_status
 
 from ..utils.image import get_ICON
+from ..utils.card_cache import card_cache
+from ..utils.image_cache import image_cache
+from ..utils.api.throttle import kuro_throttle
+from ..utils.char_info_utils import role_detail_cache
 from ..utils.database.models import WavesBind, WavesUser
+from ..utils.render_executor import render_executor
+from ..utils.queues.upload_queue import upload_queue
 
 
 async def get_user_num():
@@ -14,11 +20,56 @@ async def get_add_num():
     return len(datas)
 
 
+async def get_role_detail_cache_hit():
+    stats = role_detail_cache.stats()
+    total = stats["hits"] + stats["misses"]
+    return f"{stats['hits']}/{total}"
+
+
+async def get_image_cache_hit():
+    stats = image_cache.stats()
+    total = stats["hits"] + stats["misses"]
+    return f"{stats['hits']}/{total}"
+
+
+async def get_card_cache_hit():
+    stats = card_cache.stats()
+    total = stats["hits"] + stats["misses"]
+    return f"{stats['hits']}/{total}"
+
+
+async def get_kuro_throttle():
+    summary = kuro_throttle.summary()
+    opened = sum(1 for b in summary["breakers"].values() if b["state"] != "closed")
+    return f"限流{summary['throttled']}次 熔断{opened}"
+
+
+async def get_render_queue():
+    summary = render_executor.summary()
+    tasks = summary["tasks"].values()
+    count = sum(t["count"] for t in tasks)
+    if not count:
+        return f"{summary['depth']}"
+    avg_ms = sum(t["avg_ms"] * t["count"] for t in tasks) / count
+    return f"{summary['depth']} ({avg_ms:.0f}ms)"
+
+
+async def get_upload_queue():
+    stats = await upload_queue.stats()
+    return f"{sum(stats['depth'].values())} (延迟{stats['lag']:.0f}s)"
+
+
 register_status(
     get_ICON(),
     "XutheringWavesUID",
     {
         "绑定UID": get_add_num,
         "登录账户": get_user_num,
+        "面板缓存命中": get_role_detail_cache_hit,
+        "图片缓存命中": get_image_cache_hit,
+        "卡片缓存命中": get_card_cache_hit,
+        "渲染队列": get_render_queue,
+        "库街区请求": get_kuro_throttle,
+        "上传队列": get_upload_queue,
     },
 )
@@ -7,10 +7,9 @@ import httpx
 from PIL import Image, ImageDraw
 
 from gsuid_core.logger import logger
-from gsuid_core.utils.image.convert import convert_img
 
 from .model import WavesPool
-from ..utils.util import timed_async_cache
+from ..utils.util import async_cache
 from ..utils.image import (
     SPECIAL_GOLD,
     WAVES_MOLTEN,
@@ -23,6 +22,8 @@ from ..utils.image import (
 )
 from ..utils.api.wwapi import GET_POOL_LIST
 from ..utils.name_convert import easy_id_to_name
+from ..utils.api.http_client import http_client
+from ..utils.render_executor import convert_img
 from ..utils.fonts.waves_fonts import waves_font_30, waves_font_58
 
 TEXT_PATH = Path(__file__).parent / "texture2d"
@@ -30,9 +31,9 @@ bar = Image.open(TEXT_PATH / "bar.png")
 avatar_mask = Image.open(TEXT_PATH / "avatar_mask.png")
 
 
-@timed_async_cache(expiration=3600, condition=lambda x: isinstance(x, list))
+@async_cache(3600, stale_ttl=3600, condition=lambda x: isinstance(x, list))
 async def get_pool_data() -> Union[List, None]:
-    async with httpx.AsyncClient() as client:
+    async with http_client(GET_POOL_LIST) as client:
         try:
             res = await client.get(
                 GET_POOL_LIST,
@@ -6,9 +6,9 @@ from pathlib import Path
 from PIL import Image, ImageDraw
 
 from gsuid_core.logger import logger
-from gsuid_core.utils.image.convert import convert_img
 
 from ..utils.image import get_waves_bg
+from ..utils.render_executor import convert_img
 from ..utils.fonts.waves_fonts import emoji_font, waves_font_origin
 
 
@@ -9,6 +9,7 @@ from ..utils.waves_api import waves_api
 from ..utils.error_reply import ERROR_CODE, WAVES_CODE_103
 from ..utils.database.models import WavesBind, WavesUser
 from ..utils.api.request_util import PLATFORM_SOURCE
+from ..utils.api.account_context import account_context
 
 
 async def _fetch_roles_by_game(ck: str, did: str, game_id: int):
@@ -82,6 +83,7 @@ async def add_cookie(ev: Event, ck: str, did: str) -> str:
                 },
                 update_data={"bat": bat, "did": did, "game_id": WAVES_GAME_ID},
             )
+            account_context.invalidate(data.roleId)
 
             res = await WavesBind.insert_waves_uid(ev.user_id, ev.bot_id, data.roleId, ev.group_id, lenth_limit=9)
             if res == 0 or res == -2:
@@ -215,6 +217,7 @@ async def refresh_bind(ev: Event) -> str:
 
 async def delete_cookie(ev: Event, uid: str) -> str:
     count = await WavesUser.delete_cookie(uid, ev.user_id, ev.bot_id, game_id=WAVES_GAME_ID)
+    account_context.invalidate(uid)
     if count == 0:
         return f"[鸣潮] 特征码[{uid}]的token删除失败!\n❌不存在该特征码的token!\n"
     return f"[鸣潮] 特征码[{uid}]的token删除成功!\n"
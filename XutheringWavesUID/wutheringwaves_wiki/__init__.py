@@ -10,8 +10,14 @@ from .draw_echo import draw_wiki_echo
 from .draw_list import draw_sonata_list, draw_weapon_list
 from .draw_tower import draw_slash_challenge_img, draw_tower_challenge_img
 from .draw_weapon import draw_wiki_weapon
+from ..utils.card_cache import card_cache, get_files_version
 from ..utils.name_convert import char_name_to_char_id
 from ..utils.char_info_utils import PATTERN
+from ..wutheringwaves_abyss.period import (
+    get_slash_period_number,
+    get_tower_period_number,
+)
+from ..utils.resource.RESOURCE_PATH import MAP_DETAIL_PATH, MAP_CHALLENGE_PATH
 
 sv_waves_guide = SV("鸣潮攻略")
 sv_waves_wiki = SV("鸣潮wiki")
@@ -71,13 +77,26 @@ async def send_role_guide_pic(bot: Bot, ev: Event):
 @sv_waves_guide.on_regex(rf"^(?P<type>{PATTERN})?武器(?:列表)?$", block=True)
 async def send_weapon_list(bot: Bot, ev: Event):
     weapon_type = ev.regex_dict.get("type", "")
-    img = await draw_weapon_list(weapon_type)
+    img = await card_cache.get_or_render(
+        "weapon_list",
+        (weapon_type, get_files_version(MAP_DETAIL_PATH / "weapon")),
+        lambda: draw_weapon_list(weapon_type),
+        ttl=0,
+        persist=True,
+    )
     await bot.send(img)
 
 
 @sv_waves_guide.on_regex(r".*套装(列表)?$", block=True)
 async def send_sonata_list(bot: Bot, ev: Event):
-    await bot.send(await draw_sonata_list())
+    img = await card_cache.get_or_render(
+        "sonata_list",
+        (get_files_version(MAP_DETAIL_PATH / "sonata"),),
+        draw_sonata_list,
+        ttl=0,
+        persist=True,
+    )
+    await bot.send(img)
 
 
 @sv_waves_tower.on_regex(
@@ -96,7 +115,15 @@ async def send_tower_challenge_info(bot: Bot, ev: Event):
         except ValueError:
             pass
 
-    im = await draw_tower_challenge_img(ev, period)
+    if period is None:
+        period = get_tower_period_number()
+    im = await card_cache.get_or_render(
+        "tower_challenge",
+        (period, get_files_version(MAP_CHALLENGE_PATH / "tower" / f"{period}.json")),
+        lambda: draw_tower_challenge_img(ev, period),
+        ttl=0,
+        persist=True,
+    )
     if isinstance(im, str):
         at_sender = True if ev.group_id else False
         await bot.send(im, at_sender)
@@ -120,7 +147,21 @@ async def send_slash_challenge_info(bot: Bot, ev: Event):
         except ValueError:
             pass
 
-    im = await draw_slash_challenge_img(ev, period)
+    if period is None:
+        period = get_slash_period_number()
+    im = await card_cache.get_or_render(
+        "slash_challenge",
+        (
+            period,
+            get_files_version(
+                MAP_CHALLENGE_PATH / "slash" / f"{period}.json",
+                MAP_CHALLENGE_PATH / "slash" / f"buff_{period}.json",
+            ),
+        ),
+        lambda: draw_slash_challenge_img(ev, period),
+        ttl=0,
+        persist=True,
+    )
     if isinstance(im, str):
         at_sender = True if ev.group_id else False
         await bot.send(im, at_sender)
@@ -4,8 +4,6 @@ from pathlib import Path
 
 from PIL import Image, ImageDraw
 
-from gsuid_core.utils.image.convert import convert_img
-
 from ..utils.image import (
     GREY,
     SPECIAL_GOLD,
@@ -21,6 +19,7 @@ from ..utils.ascension.model import (
     SkillLevel,
     CharacterModel,
 )
+from ..utils.render_executor import convert_img
 from ..utils.fonts.waves_fonts import (
     waves_font_12,
     waves_font_24,
@@ -4,7 +4,6 @@ from pathlib import Path
 
 from PIL import Image, ImageDraw
 
-from gsuid_core.utils.image.convert import convert_img
 from gsuid_core.utils.image.image_tools import crop_center_img
 
 from ..utils.image import (
@@ -16,6 +15,7 @@ from ..utils.image import (
 from ..utils.name_convert import alias_to_echo_name, echo_name_to_echo_id
 from ..utils.ascension.echo import get_echo_model
 from ..utils.ascension.model import EchoModel
+from ..utils.render_executor import convert_img
 from ..utils.fonts.waves_fonts import (
     waves_font_30,
     waves_font_40,
@@ -6,7 +6,6 @@ from collections import defaultdict
 from PIL import Image, ImageDraw
 
 from gsuid_core.logger import logger
-from gsuid_core.utils.image.convert import convert_img
 
 from ..utils.image import (
     SPECIAL_GOLD,
@@ -15,6 +14,7 @@ from ..utils.image import (
     get_square_weapon,
     get_attribute_effect,
 )
+from ..utils.render_executor import convert_img
 from ..wutheringwaves_config import PREFIX
 from ..utils.ascension.sonata import sonata_id_data
 from ..utils.ascension.weapon import weapon_id_data
@@ -9,13 +9,13 @@ from PIL import Image, ImageDraw
 
 from gsuid_core.logger import logger
 from gsuid_core.models import Event
-from gsuid_core.utils.image.convert import convert_img
 
 from ..utils.image import (
     add_footer,
     get_waves_bg,
     draw_text_with_shadow,
 )
+from ..utils.render_executor import convert_img
 from ..utils.fonts.waves_fonts import (
     waves_font_14,
     waves_font_16,
@@ -4,7 +4,6 @@ from pathlib import Path
 
 from PIL import Image, ImageDraw
 
-from gsuid_core.utils.image.convert import convert_img
 from gsuid_core.utils.image.image_tools import crop_center_img
 
 from ..utils.image import (
@@ -17,6 +16,7 @@ from ..utils.image import (
 )
 from ..utils.name_convert import alias_to_weapon_name
 from ..utils.ascension.model import WeaponModel
+from ..utils.render_executor import convert_img
 from ..utils.ascension.weapon import (
     get_weapon_id,
     get_weapon_star,
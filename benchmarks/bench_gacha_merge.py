@@ -0,0 +1,65 @@
+"""抽卡记录合并耗时对比
+
+在仓库根目录运行：python -m benchmarks.bench_gacha_merge [新实现条数] [原实现条数]
+"""
+
+import sys
+import time
+import random
+from datetime import datetime, timedelta
+
+from XutheringWavesUID.utils.api.model import GachaLog
+from XutheringWavesUID.wutheringwaves_gachalog.get_gachalogs import (
+    merge_gacha_logs,
+    merge_gacha_logs_by_common_subarray,
+)
+
+NAMES = ["今汐", "长离", "维里奈", "渊武", "远行者长刃·辟路", "暗夜矩阵·暝光"]
+
+
+def random_history(rng: random.Random, pulls: int) -> list[GachaLog]:
+    """按时间降序的抽卡记录，单抽和十连混合，名称取自很小的集合以制造重复记录"""
+    logs = []
+    now = datetime(2025, 1, 1)
+    while len(logs) < pulls:
+        now -= timedelta(seconds=rng.randint(1, 3600))
+        pull_time = now.strftime("%Y-%m-%d %H:%M:%S")
+        for _ in range(10 if rng.random() < 0.6 else 1):
+            name = rng.choice(NAMES)
+            logs.append(
+                GachaLog(
+                    cardPoolType="角色精准调谐",
+                    resourceId=NAMES.index(name),
+                    qualityLevel=5 if name == "今汐" else 3,
+                    resourceType="角色",
+                    name=name,
+                    count=1,
+                    time=pull_time,
+                )
+            )
+    return logs
+
+
+def bench(func, size: int) -> float:
+    rng = random.Random(size)
+    history = random_history(rng, size)
+    # 两份记录各缺一段，合并后覆盖完整历史
+    a, b = history[: size * 9 // 10], history[size // 10 :]
+    start = time.perf_counter()
+    func(a, b)
+    return time.perf_counter() - start
+
+
+def main():
+    new_size = int(sys.argv[1]) if len(sys.argv) > 1 else 15000
+    old_size = int(sys.argv[2]) if len(sys.argv) > 2 else 1500
+    print(f"merge_gacha_logs {new_size} 条: {bench(merge_gacha_logs, new_size):.3f}s")
+    print(f"merge_gacha_logs {old_size} 条: {bench(merge_gacha_logs, old_size):.3f}s")
+    print(
+        f"merge_gacha_logs_by_common_subarray {old_size} 条: "
+        f"{bench(merge_gacha_logs_by_common_subarray, old_size):.3f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""WuWaCalc 声骸、面板属性汇总耗时
+
+需要已下载的资源和本地面板数据，在仓库根目录（gsuid_core 环境中）运行：
+python -m benchmarks.bench_wuwacalc [uid ...] [--repeat 次数]
+
+不指定 uid 时使用 players 目录下的全部 uid。对比优化前后时在两个提交上分别运行，
+同一份面板数据下每个角色的平均耗时可以直接比较。
+"""
+
+import sys
+import time
+import asyncio
+from typing import List
+
+from XutheringWavesUID.utils.calc import WuWaCalc
+from XutheringWavesUID.utils.api.model import RoleDetailData
+from XutheringWavesUID.utils.player_store import get_player_store
+from XutheringWavesUID.utils.resource.RESOURCE_PATH import PLAYER_PATH
+
+
+async def load_roles(uids: List[str]) -> List[RoleDetailData]:
+    roles = []
+    for datas in (await get_player_store().load_many(uids)).values():
+        for data in datas:
+            role_detail = RoleDetailData(**data)
+            if role_detail.phantomData and role_detail.phantomData.equipPhantomList:
+                roles.append(role_detail)
+    return roles
+
+
+def aggregate(role_detail: RoleDetailData):
+    """与面板、评分相同的汇总步骤，不包含评分和伤害计算"""
+    calc = WuWaCalc(role_detail)
+    calc.phantom_pre = calc.prepare_phantom()
+    calc.phantom_card = calc.enhance_summation_phantom_value(calc.phantom_pre)
+    calc.role_card = calc.enhance_summation_card_value(calc.phantom_card)
+    return calc.role_card
+
+
+def main():
+    args = sys.argv[1:]
+    repeat = 20
+    if "--repeat" in args:
+        index = args.index("--repeat")
+        repeat = int(args[index + 1])
+        del args[index : index + 2]
+    uids = args
+    if not uids and PLAYER_PATH.exists():
+        uids = [p.name for p in PLAYER_PATH.iterdir() if p.is_dir()]
+
+    roles = asyncio.run(load_roles(uids))
+    if not roles:
+        print("没有可用的面板数据")
+        return
+
+    # 预热，角色、武器、套装数据在首次使用时加载
+    for role_detail in roles:
+        aggregate(role_detail)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for role_detail in roles:
+            aggregate(role_detail)
+    cost = time.perf_counter() - start
+    print(f"{len(roles)} 个角色 x {repeat} 次: 平均每个角色 {cost / (len(roles) * repeat) * 1e6:.1f}us")
+
+
+if __name__ == "__main__":
+    main()
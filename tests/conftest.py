@@ -0,0 +1,10 @@
+import pytest
+
+from XutheringWavesUID.wutheringwaves_gachalog import gacha_store
+
+
+@pytest.fixture
+def player_path(tmp_path, monkeypatch):
+    """抽卡记录存储写到临时目录"""
+    monkeypatch.setattr(gacha_store, "PLAYER_PATH", tmp_path)
+    return tmp_path
@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+
+from XutheringWavesUID.utils import util
+from XutheringWavesUID.utils.util import async_cache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(util.time, "time", clock)
+    return clock
+
+
+def test_ttl(clock):
+    calls = []
+
+    @async_cache(ttl=10)
+    async def get(uid: str):
+        calls.append(uid)
+        return f"{uid}-{len(calls)}"
+
+    async def main():
+        assert await get("1") == "1-1"
+        assert await get("1") == "1-1"
+        assert await get("2") == "2-2"
+        clock.now += 11
+        assert await get("1") == "1-3"
+
+    asyncio.run(main())
+    assert get.cache_stats() == {"hits": 1, "stale_hits": 0, "misses": 3, "evictions": 0}
+
+
+def test_ignore_self_and_kwargs(clock):
+    calls = []
+
+    class Api:
+        @async_cache(ttl=10)
+        async def get(self, uid: str, game_id: int = 3):
+            calls.append((uid, game_id))
+            return uid
+
+    async def main():
+        await Api().get("1")
+        await Api().get("1")
+        await Api().get("1", game_id=2)
+        await Api().get("1", game_id=2)
+
+    asyncio.run(main())
+    assert calls == [("1", 3), ("1", 2)]
+
+
+def test_stale_while_revalidate(clock):
+    calls = []
+
+    @async_cache(ttl=10, stale_ttl=20)
+    async def get():
+        calls.append(clock.now)
+        return len(calls)
+
+    async def main():
+        assert await get() == 1
+        clock.now += 15
+        # 过期但在 stale_ttl 内，先返回旧值，后台刷新
+        assert await get() == 1
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert await get() == 2
+        clock.now += 31
+        # 超出 stale_ttl，同步重新获取
+        assert await get() == 3
+
+    asyncio.run(main())
+    assert get.cache_stats()["stale_hits"] == 1
+
+
+def test_stale_refresh_failure_keeps_value(clock):
+    results = [1, RuntimeError("boom")]
+
+    @async_cache(ttl=10, stale_ttl=20)
+    async def get():
+        result = results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def main():
+        assert await get() == 1
+        clock.now += 15
+        assert await get() == 1
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert await get() == 1
+
+    asyncio.run(main())
+
+
+def test_single_flight(clock):
+    calls = []
+
+    @async_cache(ttl=10)
+    async def get(uid: str):
+        calls.append(uid)
+        await asyncio.sleep(0.01)
+        return uid
+
+    async def main():
+        return await asyncio.gather(*[get("1") for _ in range(10)], get("2"))
+
+    assert asyncio.run(main()) == ["1"] * 10 + ["2"]
+    assert calls == ["1", "2"]
+
+
+def test_condition_and_maxsize(clock):
+    calls = []
+
+    @async_cache(ttl=10, condition=lambda x: x is not None, maxsize=2)
+    async def get(uid: str):
+        calls.append(uid)
+        return None if uid == "none" else uid
+
+    async def main():
+        await get("none")
+        await get("none")
+        for uid in ("1", "2", "3", "1"):
+            await get(uid)
+
+    asyncio.run(main())
+    assert calls == ["none", "none", "1", "2", "3", "1"]
+    assert get.cache_stats()["evictions"] == 2
@@ -0,0 +1,98 @@
+import base64
+import random
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from test_gacha_merge import random_history
+
+from XutheringWavesUID import wutheringwaves_gachalog as gachalog
+from XutheringWavesUID.wutheringwaves_gachalog import get_gachalogs
+from XutheringWavesUID.wutheringwaves_gachalog.gacha_store import GachaStore
+from XutheringWavesUID.wutheringwaves_gachalog.get_gachalogs import (
+    get_import_info,
+    load_import_data,
+    write_gacha_export,
+    iter_import_gachalogs,
+)
+
+UID = "100000001"
+POOL = "角色精准调谐"
+
+
+def export_file(player_path, compress: bool):
+    logs = random_history(random.Random(0), 50)
+    store = GachaStore(UID)
+    store.write(POOL, logs)
+    store.save_meta("2025-01-01 00:00:00")
+
+    path = player_path / (f"export_{UID}.json.gz" if compress else f"export_{UID}.json")
+    info = {
+        "export_time": "2025-01-01 00:00:00",
+        "export_app": "XutheringWavesUID",
+        "export_app_version": "1.0.0",
+        "export_timestamp": 1735660800,
+        "version": "v2.0",
+        "uid": UID,
+    }
+    write_gacha_export(store, path, info, compress)
+    return logs, path
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_export_import_round_trip(player_path, compress: bool):
+    logs, path = export_file(player_path, compress)
+
+    history_data = load_import_data(base64.b64encode(path.read_bytes()).decode(), "base64")
+    assert get_import_info(history_data).uid == UID
+    imported = [log for gacha_name, log in iter_import_gachalogs(history_data) if gacha_name == POOL]
+    assert [(log.name, log.time) for log in imported] == [(log.name, log.time) for log in logs]
+
+
+class FakeBot:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, message, *args, **kwargs):
+        self.sent.append(message)
+
+
+@pytest.mark.parametrize(
+    "compress, handler",
+    [
+        (False, gachalog.get_gacha_log_by_file),
+        (True, gachalog.get_gacha_log_by_gz_file),
+    ],
+)
+def test_import_handler(player_path, monkeypatch, compress: bool, handler):
+    """上传导出的文件（.json 和 .json.gz）走同一个导入流程"""
+    logs, path = export_file(player_path, compress)
+
+    async def get_uid_by_game(user_id, bot_id):
+        return UID
+
+    async def get_ck_result(uid, user_id, bot_id):
+        return True, "token"
+
+    saved = {}
+
+    async def save_gachalogs(ev, uid, record_id, import_data=None, force_overwrite=False):
+        saved.update(import_data)
+        return "导入成功"
+
+    monkeypatch.setattr(gachalog, "WavesBind", SimpleNamespace(get_uid_by_game=get_uid_by_game))
+    monkeypatch.setattr(gachalog, "waves_api", SimpleNamespace(get_ck_result=get_ck_result))
+    monkeypatch.setattr(get_gachalogs, "save_gachalogs", save_gachalogs)
+
+    bot = FakeBot()
+    ev = SimpleNamespace(
+        user_id=f"user_{compress}",
+        bot_id="onebot",
+        file_name=path.name,
+        file_type="base64",
+        file=base64.b64encode(path.read_bytes()).decode(),
+    )
+    asyncio.run(handler(bot, ev))
+
+    assert bot.sent == ["导入成功"]
+    assert [(log.name, log.time) for log in saved[POOL]] == [(log.name, log.time) for log in logs]
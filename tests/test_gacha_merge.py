@@ -0,0 +1,86 @@
+"""merge_gacha_logs / count_new_gachalogs 与原最长公共子串实现的对拍"""
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from XutheringWavesUID.utils.api.model import GachaLog
+from XutheringWavesUID.wutheringwaves_gachalog.get_gachalogs import (
+    merge_gacha_logs,
+    count_new_gachalogs,
+    merge_gacha_logs_by_common_subarray,
+    find_longest_common_subarray_indices,
+)
+
+NAMES = ["今汐", "长离", "维里奈", "渊武", "远行者长刃·辟路", "暗夜矩阵·暝光"]
+
+
+def random_history(rng: random.Random, pulls: int) -> list[GachaLog]:
+    """按时间降序的抽卡记录，单抽和十连混合，名称取自很小的集合以制造重复记录"""
+    logs = []
+    now = datetime(2025, 1, 1)
+    while len(logs) < pulls:
+        now -= timedelta(seconds=rng.randint(1, 3600))
+        time = now.strftime("%Y-%m-%d %H:%M:%S")
+        for _ in range(10 if rng.random() < 0.6 else 1):
+            name = rng.choice(NAMES)
+            logs.append(
+                GachaLog(
+                    cardPoolType="角色精准调谐",
+                    resourceId=NAMES.index(name),
+                    qualityLevel=5 if name == "今汐" else 3,
+                    resourceType="角色",
+                    name=name,
+                    count=1,
+                    time=time,
+                )
+            )
+    return logs
+
+
+def group_bounds(logs: list[GachaLog]) -> list[int]:
+    bounds = [0]
+    for i in range(1, len(logs)):
+        if logs[i].time != logs[i - 1].time:
+            bounds.append(i)
+    bounds.append(len(logs))
+    return bounds
+
+
+def random_window(rng: random.Random, logs: list[GachaLog]) -> list[GachaLog]:
+    """按一次抽卡为单位截取连续的一段"""
+    bounds = group_bounds(logs)
+    start, end = sorted(rng.sample(bounds, 2))
+    return logs[start:end]
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_merge_matches_common_subarray(seed: int):
+    rng = random.Random(seed)
+    history = random_history(rng, rng.randint(1, 60))
+    a, b = random_window(rng, history), random_window(rng, history)
+    assert merge_gacha_logs(a, b) == merge_gacha_logs_by_common_subarray(a, b)
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_count_new_matches_common_subarray(seed: int):
+    rng = random.Random(seed)
+    history = random_history(rng, rng.randint(1, 60))
+    bounds = group_bounds(history)
+    # 接口返回最新的一段，已保存的记录是其中较早的连续一段
+    new = history[: rng.choice(bounds[1:])]
+    old = history[rng.choice([i for i in bounds if i <= len(new)]) :]
+
+    common_indices = find_longest_common_subarray_indices(old, new)
+    expected = common_indices[1][0] if common_indices else len(new)
+    assert count_new_gachalogs(old, new) == expected
+
+
+def test_merge_unsorted_input():
+    rng = random.Random(0)
+    history = random_history(rng, 40)
+    shuffled = history[:]
+    rng.shuffle(shuffled)
+    merged = merge_gacha_logs(shuffled, [])
+    assert [log.time for log in merged] == [log.time for log in history]
@@ -0,0 +1,158 @@
+import json
+import random
+
+from test_gacha_merge import random_history
+
+from XutheringWavesUID.wutheringwaves_gachalog.gacha_stats import GACHA_STATS_FILE, update_gacha_state
+from XutheringWavesUID.wutheringwaves_gachalog.gacha_store import RECORD, GachaStore
+
+UID = "100000001"
+POOL = "角色精准调谐"
+
+
+def as_tuples(logs):
+    return [(log.name, log.resourceType, log.qualityLevel, log.time) for log in logs]
+
+
+def test_append_only_new_records(player_path):
+    logs = random_history(random.Random(0), 60)
+    store = GachaStore(UID)
+    old, new = logs[20:], logs[:20]
+
+    assert store.write(POOL, old) == len(old)
+    size = store.pool_path(POOL).stat().st_size
+    store.write(POOL, new + old)
+
+    assert store.pool_path(POOL).stat().st_size == size + len(new) * RECORD.size
+    assert as_tuples(store.read_logs(POOL)) == as_tuples(logs)
+    assert store.count(POOL) == len(logs)
+    # 降序读取与接口顺序一致，since 只读取该时间及之后的记录
+    since = logs[10].time
+    assert as_tuples(store.read_logs(POOL, since=since)) == as_tuples([log for log in logs if log.time >= since])
+
+
+def test_rewrite_bumps_generation(player_path):
+    logs = random_history(random.Random(1), 40)
+    store = GachaStore(UID)
+    store.write(POOL, logs)
+    store.save_meta("2025-01-01 00:00:00")
+    assert store.generation(POOL) == 0
+
+    # 已保存的记录被改写（比如导入时修正）需要整体重写
+    changed = logs[:10] + logs[11:]
+    store.write(POOL, changed)
+    assert as_tuples(store.read_logs(POOL)) == as_tuples(changed)
+    assert store.generation(POOL) == 1
+
+
+def test_torn_record_recovery(player_path):
+    logs = random_history(random.Random(2), 30)
+    store = GachaStore(UID)
+    store.write(POOL, logs[10:])
+
+    # 模拟写入中断留下的半条记录
+    with open(store.pool_path(POOL), "ab") as f:
+        f.write(b"\x01\x02\x03")
+    assert store.count(POOL) == len(logs) - 10
+    assert as_tuples(store.read_logs(POOL)) == as_tuples(logs[10:])
+
+    store.append(POOL, logs[:10])
+    assert store.pool_path(POOL).stat().st_size == len(logs) * RECORD.size
+    assert as_tuples(store.read_logs(POOL)) == as_tuples(logs)
+
+
+def test_string_table_shared_between_instances(player_path):
+    logs = random_history(random.Random(3), 10)
+    a, b = GachaStore(UID), GachaStore(UID)
+    a.write(POOL, logs)
+    # a 已经读取过字符串表，b 之后追加了新的名称
+    assert as_tuples(a.read_logs(POOL))
+
+    new_b = logs[0].model_copy(update={"name": "newA", "time": "2030-01-01 00:00:00"})
+    b.write(POOL, [new_b] + logs)
+    new_a = logs[0].model_copy(update={"name": "newB", "time": "2030-01-02 00:00:00"})
+    a.write(POOL, [new_a, new_b] + logs)
+
+    expected = as_tuples([new_a, new_b] + logs)
+    assert as_tuples(a.read_logs(POOL)) == expected
+    assert as_tuples(GachaStore(UID).read_logs(POOL)) == expected
+
+
+def test_string_table_escapes_newlines(player_path):
+    logs = random_history(random.Random(5), 10)
+    store = GachaStore(UID)
+    odd = [
+        logs[0].model_copy(update={"name": "a\nb", "time": "2030-01-01 00:00:00"}),
+        logs[0].model_copy(update={"name": "c\r", "time": "2030-01-02 00:00:00"}),
+    ]
+    store.write(POOL, odd[::-1] + logs)
+
+    assert as_tuples(GachaStore(UID).read_logs(POOL)) == as_tuples(odd[::-1] + logs)
+
+
+def test_string_table_legacy_lines(player_path):
+    logs = random_history(random.Random(6), 10)
+    store = GachaStore(UID)
+    store.write(POOL, logs)
+    strings = store._load_strings()
+    # 旧版本每行一个原始字符串
+    store.strings_path.unlink()
+    store.legacy_strings_path.write_bytes("".join(f"{value}\r\n" for value in strings).encode("UTF-8"))
+
+    assert as_tuples(GachaStore(UID).read_logs(POOL)) == as_tuples(logs)
+    assert not store.legacy_strings_path.exists()
+
+
+def test_migrate_legacy_json(player_path):
+    logs = random_history(random.Random(4), 30)
+    legacy = player_path / UID / "gacha_logs.json"
+    legacy.parent.mkdir(parents=True)
+    legacy.write_text(
+        json.dumps(
+            {"uid": UID, "data_time": "2025-01-01 00:00:00", "data": {POOL: [log.model_dump() for log in logs]}},
+            ensure_ascii=False,
+        ),
+        encoding="UTF-8",
+    )
+
+    store = GachaStore(UID)
+    assert as_tuples(store.read_logs(POOL)) == as_tuples(logs)
+    assert not legacy.exists()
+    assert list((player_path / UID).glob("migrate_gacha_logs_*.json"))
+
+
+def recompute(store: GachaStore):
+    (store.path / GACHA_STATS_FILE).unlink()
+    return update_gacha_state(store.uid)
+
+
+def test_stats_fold_matches_recompute(player_path):
+    logs = random_history(random.Random(5), 300)
+    store = GachaStore(UID)
+
+    # 分多次保存，每次只累加新增部分
+    for end in (250, 180, 90, 0):
+        store.write(POOL, logs[end:])
+        store.save_meta("")
+        state = update_gacha_state(UID)
+    assert state == recompute(store)
+
+    pool = state["pools"][POOL]
+    assert pool["count"] == len(logs)
+    assert len(pool["rank_s_list"]) == sum(1 for log in logs if log.qualityLevel == 5)
+    assert pool["first_time"] == logs[-1].time
+    assert pool["last_time"] == logs[0].time
+
+
+def test_stats_reset_after_rewrite(player_path):
+    logs = random_history(random.Random(6), 100)
+    store = GachaStore(UID)
+    store.write(POOL, logs)
+    store.save_meta("")
+    update_gacha_state(UID)
+
+    changed = [log for log in logs if log.qualityLevel != 5]
+    store.write(POOL, changed)
+    state = update_gacha_state(UID)
+    assert state == recompute(store)
+    assert state["pools"][POOL]["rank_s_list"] == []
@@ -0,0 +1,64 @@
+import asyncio
+import threading
+
+import pytest
+
+from XutheringWavesUID.utils.api import http_client as http_client_module
+from XutheringWavesUID.utils.api.http_client import HttpClientRegistry
+
+URL = "https://example.com/api"
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(http_client_module, "get_http_host_concurrency", lambda: 2)
+    registry = HttpClientRegistry()
+    monkeypatch.setattr(http_client_module, "http_clients", registry)
+    return registry
+
+
+def test_burst_waits_for_slot(registry):
+    active = 0
+    peak = 0
+
+    async def request():
+        nonlocal active, peak
+        async with http_client_module.http_client(URL):
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+        return True
+
+    async def main():
+        # 超过并发上限的请求排队等待，而不是报 PoolTimeout
+        results = await asyncio.gather(*[request() for _ in range(10)])
+        await registry.close()
+        return results
+
+    assert asyncio.run(main()) == [True] * 10
+    assert peak == 2
+
+
+def test_close_clients_from_other_loops(registry):
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    async def get_client():
+        return registry.get(URL)[0]
+
+    other = asyncio.run_coroutine_threadsafe(get_client(), loop).result()
+
+    async def main():
+        current = registry.get(URL)[0]
+        await registry.close()
+        return current
+
+    current = asyncio.run(main())
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+    assert current is not other
+    assert current.is_closed and other.is_closed
@@ -0,0 +1,98 @@
+import json
+import asyncio
+
+import pytest
+
+from XutheringWavesUID.utils import player_store
+from XutheringWavesUID.utils.player_store import JsonPlayerStore, SqlitePlayerStore
+
+
+def make_role(role_id: int, level: int = 90):
+    return {"role": {"roleId": role_id, "level": level}, "chainList": [], "phantomData": None}
+
+
+@pytest.fixture
+def players(tmp_path, monkeypatch):
+    monkeypatch.setattr(player_store, "PLAYER_PATH", tmp_path / "players")
+    return tmp_path / "players"
+
+
+def write_raw(players, uid: str, roles):
+    path = players / uid / "rawData.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(roles, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+def test_migrate_json_to_sqlite(players, tmp_path):
+    roles = [make_role(1102), make_role(1205, 80), make_role(1304)]
+    path = write_raw(players, "100000001", roles)
+
+    store = SqlitePlayerStore(tmp_path / "player_data.db")
+    assert asyncio.run(store.load_roles("100000001")) == roles
+    assert json.loads(asyncio.run(store.load_raw("100000001"))) == roles
+    # 原文件保留作备份
+    assert path.exists()
+    assert store.version("100000001") != (0, 0)
+
+    # 再次迁移不会重复导入
+    assert store.migrate_all() == 0
+    assert asyncio.run(SqlitePlayerStore(tmp_path / "player_data.db").load_roles("100000001")) == roles
+
+
+def test_migrate_all(players, tmp_path):
+    write_raw(players, "100000001", [make_role(1102)])
+    write_raw(players, "100000002", [make_role(1205)])
+
+    store = SqlitePlayerStore(tmp_path / "player_data.db")
+    assert store.migrate_all() == 2
+    result = asyncio.run(store.load_many(["100000001", "100000002", "100000003"]))
+    assert result == {"100000001": [make_role(1102)], "100000002": [make_role(1205)]}
+
+
+def test_upsert_and_delete(players, tmp_path):
+    write_raw(players, "100000001", [make_role(1102), make_role(1205)])
+    store = SqlitePlayerStore(tmp_path / "player_data.db")
+    asyncio.run(store.load_roles("100000001"))
+    version = store.version("100000001")
+
+    changed = [make_role(1102, 70), make_role(1304)]
+    asyncio.run(store.upsert_roles("100000001", [], changed, deleted=[1205]))
+
+    roles = asyncio.run(store.load_roles("100000001"))
+    assert sorted(roles, key=lambda r: r["role"]["roleId"]) == changed
+    assert store.version("100000001") != version
+
+
+def test_sqlite_version_survives_restart(players, tmp_path):
+    store = SqlitePlayerStore(tmp_path / "player_data.db")
+    assert store.version("100000001") == (0, 0)
+    asyncio.run(store.upsert_roles("100000001", [], [make_role(1102)]))
+    version = store.version("100000001")
+
+    assert SqlitePlayerStore(tmp_path / "player_data.db").version("100000001") == version
+
+
+def test_json_store_round_trip(players):
+    store = JsonPlayerStore()
+    assert store.version("100000001") is None
+    assert asyncio.run(store.load_roles("100000001")) is None
+
+    roles = [make_role(1102), make_role(1205)]
+    asyncio.run(store.upsert_roles("100000001", roles, roles))
+    assert asyncio.run(store.load_roles("100000001")) == roles
+    assert store.version("100000001") is not None
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_fingerprints_merge(players, tmp_path, backend):
+    store = JsonPlayerStore() if backend == "json" else SqlitePlayerStore(tmp_path / "player_data.db")
+    assert asyncio.run(store.load_fingerprints("100000001")) == {}
+
+    asyncio.run(store.save_fingerprints("100000001", {"1102": {"fp": [90, 6, 0, 5], "time": 1}}))
+    # 只更新本次获取过详情的角色
+    asyncio.run(store.save_fingerprints("100000001", {"1205": {"fp": [80, 5, 1, 5], "time": 2}}))
+    assert asyncio.run(store.load_fingerprints("100000001")) == {
+        "1102": {"fp": [90, 6, 0, 5], "time": 1},
+        "1205": {"fp": [80, 5, 1, 5], "time": 2},
+    }
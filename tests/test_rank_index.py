@@ -0,0 +1,99 @@
+import json
+import time
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from XutheringWavesUID.utils import rank_index
+from XutheringWavesUID.utils.resource import RESOURCE_PATH
+from XutheringWavesUID.utils.rank_index import RANK_ROLE, RANK_GACHA, RANK_SLASH, RankIndex
+from XutheringWavesUID.wutheringwaves_rank.slash_rank import get_all_slash_rank_info
+
+
+@pytest.fixture
+def index(tmp_path):
+    return RankIndex(tmp_path / "rank_index.db")
+
+
+def test_replace_and_query(index):
+    asyncio.run(index.replace(RANK_ROLE, "1", [(1102, 30.5, 1000, {"chain": 0}), (1205, 40, 2000, {"chain": 6})]))
+    asyncio.run(index.replace(RANK_ROLE, "2", [(1102, 50, 3000, {"chain": 2})]))
+    asyncio.run(index.replace(RANK_ROLE, "3", [(1102, 60, 4000, {})]))
+
+    rows = asyncio.run(index.query(RANK_ROLE, ["1", "2"], keys=[1102]))
+    assert sorted((r.uid, r.value, r.extra, r.payload["chain"]) for r in rows) == [
+        ("1", 30.5, 1000, 0),
+        ("2", 50, 3000, 2),
+    ]
+    rows = asyncio.run(index.query(RANK_ROLE, ["1", "2", "3"], keys=[1102], min_value=45))
+    assert sorted(r.uid for r in rows) == ["2", "3"]
+    assert len(asyncio.run(index.query(RANK_ROLE, ["1"]))) == 2
+    assert asyncio.run(index.query(RANK_GACHA, ["1"])) == []
+
+
+def test_replace_drops_old_rows(index):
+    asyncio.run(index.replace(RANK_ROLE, "1", [(1102, 30, 0, {}), (1205, 40, 0, {})]))
+    asyncio.run(index.replace(RANK_ROLE, "1", [(1304, 50, 0, {})]))
+    assert [r.key for r in asyncio.run(index.query(RANK_ROLE, ["1"]))] == [1304]
+
+
+def test_missing_by_version(index):
+    asyncio.run(index.replace(RANK_ROLE, "1", [], "v1"))
+    asyncio.run(index.replace(RANK_ROLE, "2", [(1102, 30, 0, {})], "v2"))
+
+    assert asyncio.run(index.missing(RANK_ROLE, ["1", "2", "3"], "v1")) == ["2", "3"]
+    assert asyncio.run(index.missing(RANK_ROLE, ["1", "2", "3"], "v2")) == ["1", "3"]
+    assert asyncio.run(index.missing(RANK_GACHA, ["1"])) == ["1"]
+
+
+def test_generation(index):
+    generation = index.generation
+    asyncio.run(index.replace(RANK_ROLE, "1", []))
+    asyncio.run(index.replace(RANK_ROLE, "1", [(1102, 30, 0, {})]))
+    assert index.generation == generation + 2
+
+
+def test_query_many_uids(index):
+    # 超过单条语句的参数上限时分批查询
+    for uid in range(1200):
+        index._replace(RANK_GACHA, str(uid), [(0, uid, 0, {})], "")
+    rows = asyncio.run(index.query(RANK_GACHA, [str(uid) for uid in range(1200)], min_value=1000))
+    assert sorted(r.uid for r in rows) == [str(uid) for uid in range(1000, 1200)]
+
+
+def slash_raw(score: int, record_time: int):
+    half = {"buffDescription": "", "buffIcon": "", "buffName": "", "buffQuality": 5, "roleList": [], "score": score}
+    challenge = {"challengeId": 1, "challengeName": "", "halfList": [half], "score": score}
+    difficulty = {
+        "allScore": score,
+        "challengeList": [challenge],
+        "difficulty": 2,
+        "difficultyName": "",
+        "homePageBG": "",
+        "maxScore": 0,
+        "teamIcon": "",
+    }
+    slash_data = {"isUnlock": True, "seasonEndTime": 0, "difficultyList": [difficulty]}
+    return {"record_time": record_time, "slash_data": slash_data}
+
+
+def test_slash_rank_served_from_index(index, tmp_path, monkeypatch):
+    monkeypatch.setattr(rank_index, "_rank_index", index)
+    monkeypatch.setattr(RESOURCE_PATH, "PLAYER_PATH", tmp_path)
+    now = int(time.time())
+    path = tmp_path / "1" / "slashData.json"
+    path.parent.mkdir()
+    path.write_text(json.dumps(slash_raw(30000, now)), encoding="utf-8")
+    asyncio.run(index.replace(RANK_SLASH, "2", [(0, 20000, now, {})]))
+    # 上一期的记录
+    asyncio.run(index.replace(RANK_SLASH, "3", [(0, 40000, now - 60 * 24 * 3600, {})]))
+
+    users = [SimpleNamespace(user_id="u1", uid="1_2"), SimpleNamespace(user_id="u3", uid="3")]
+    ranked = asyncio.run(get_all_slash_rank_info(users))
+    assert sorted((r.uid, r.score) for r in ranked) == [("1", 30000), ("2", 20000)]
+
+    # 建好索引后不再读取文件
+    path.unlink()
+    ranked = asyncio.run(get_all_slash_rank_info(users))
+    assert sorted((r.uid, r.score) for r in ranked) == [("1", 30000), ("2", 20000)]
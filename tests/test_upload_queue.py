@@ -0,0 +1,148 @@
+import time
+import asyncio
+import importlib
+
+import pytest
+
+from XutheringWavesUID.utils.queues.upload_queue import MAX_ATTEMPTS, UploadQueue
+
+# 包的 __init__ 导出了同名的 upload_queue 实例
+upload_queue_module = importlib.import_module("XutheringWavesUID.utils.queues.upload_queue")
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    monkeypatch.setattr(upload_queue_module, "get_upload_batch_size", lambda: 10)
+    monkeypatch.setattr(upload_queue_module, "get_upload_max_inflight", lambda: 2)
+    monkeypatch.setattr(upload_queue_module, "get_upload_queue_max_size", lambda: 0)
+    return UploadQueue(tmp_path / "upload_queue.db")
+
+
+def rows(queue: UploadQueue):
+    return queue._connect().execute("SELECT queue, dedup_key, data, attempts, next_at FROM upload_queue").fetchall()
+
+
+def make_due(queue: UploadQueue):
+    with queue._connect() as conn:
+        conn.execute("UPDATE upload_queue SET next_at = 0")
+
+
+def test_dedup_keeps_latest(queue):
+    sent = []
+
+    async def handler(item):
+        sent.append(item)
+        return True
+
+    queue.register("role", handler, lambda item: item["uid"], lambda: True)
+    assert asyncio.run(queue.put("role", {"uid": "1", "score": 10}))
+    assert asyncio.run(queue.put("role", {"uid": "2", "score": 20}))
+    assert asyncio.run(queue.put("role", {"uid": "1", "score": 30}))
+    assert not asyncio.run(queue.put("unknown", {"uid": "1"}))
+    assert asyncio.run(queue.stats())["depth"] == {"role": 2}
+
+    assert asyncio.run(queue._process_batch()) == 2
+    assert sorted(sent, key=lambda item: item["uid"]) == [{"uid": "1", "score": 30}, {"uid": "2", "score": 20}]
+    assert rows(queue) == []
+    assert queue.sent == 2
+
+
+def test_disabled_queue(queue):
+    async def handler(item):
+        return True
+
+    queue.register("role", handler, lambda item: item["uid"], lambda: False)
+    assert not asyncio.run(queue.put("role", {"uid": "1"}))
+    assert rows(queue) == []
+
+
+def test_retry_backoff(queue):
+    async def handler(item):
+        raise RuntimeError("upstream down")
+
+    queue.register("role", handler, lambda item: item["uid"], lambda: True)
+    asyncio.run(queue.put("role", {"uid": "1"}))
+
+    before = time.time()
+    assert asyncio.run(queue._process_batch()) == 1
+    [(_, _, _, attempts, next_at)] = rows(queue)
+    assert attempts == 1
+    assert next_at > before
+    # 还没到重试时间不会再取出
+    assert asyncio.run(queue._process_batch()) == 0
+
+    delays = []
+    for attempt in range(2, MAX_ATTEMPTS):
+        make_due(queue)
+        now = time.time()
+        assert asyncio.run(queue._process_batch()) == 1
+        [(_, _, _, attempts, next_at)] = rows(queue)
+        assert attempts == attempt
+        delays.append(next_at - now)
+    # 指数退避（带抖动），后面的间隔明显更长
+    assert delays[-1] > delays[0]
+
+    make_due(queue)
+    assert asyncio.run(queue._process_batch()) == 1
+    assert rows(queue) == []
+    assert queue.dropped == 1
+
+
+def test_persist_across_restart(queue, tmp_path):
+    async def handler(item):
+        return True
+
+    queue.register("role", handler, lambda item: item["uid"], lambda: True)
+    asyncio.run(queue.put("role", {"uid": "1"}))
+
+    restarted = UploadQueue(tmp_path / "upload_queue.db")
+    sent = []
+
+    async def handler2(item):
+        sent.append(item)
+        return True
+
+    restarted.register("role", handler2, lambda item: item["uid"], lambda: True)
+    assert asyncio.run(restarted._process_batch()) == 1
+    assert sent == [{"uid": "1"}]
+
+
+def test_dedup_keeps_enqueue_time(queue, monkeypatch):
+    async def handler(item):
+        return True
+
+    queue.register("role", handler, lambda item: item["uid"], lambda: True)
+    monkeypatch.setattr(upload_queue_module.time, "time", lambda: 1000.0)
+    asyncio.run(queue.put("role", {"uid": "1", "score": 10}))
+    monkeypatch.setattr(upload_queue_module.time, "time", lambda: 1060.0)
+    asyncio.run(queue.put("role", {"uid": "1", "score": 30}))
+
+    # 一直被替换的数据也能反映出积压时间
+    assert queue._connect().execute("SELECT created_at, data FROM upload_queue").fetchall() == [
+        (1000.0, '{"uid": "1", "score": 30}')
+    ]
+    assert asyncio.run(queue.stats())["lag"] == 60
+
+
+def test_stop_waits_for_worker(queue):
+    sent = []
+
+    async def handler(item):
+        sent.append(item)
+        return True
+
+    queue.register("role", handler, lambda item: item["uid"], lambda: True)
+    queue.start()
+
+    async def main():
+        await queue.put("role", {"uid": "1"})
+        for _ in range(100):
+            if sent:
+                break
+            await asyncio.sleep(0.01)
+        await queue.stop()
+
+    asyncio.run(main())
+    assert sent == [{"uid": "1"}]
+    assert not queue.running
+    assert rows(queue) == []